@@ -1,10 +1,12 @@
 import cv2
+import numpy
 import tensorflow_hub as hub
 import tensorflow as tf
 
 from cv2wrapper.Frame import Frame
+from util import Suppression
+from util.ArrayBoxList import ArrayBoxList
 from util.BoxList import BoxList
-from util.Box import Box
 
 
 class Detector:
@@ -31,6 +33,8 @@ class Detector:
         self.__nms_overlap_threshold__: float = 0.1
         self.__nms_eta__: float | None = None
         self.__nms_keep_top_k_indices__: float | None = None
+        self.__nms_per_label__: bool = False
+        self.__soft_nms_sigma__: float | None = None
 
     def try_loading_next_frame(self) -> bool:
         """
@@ -78,24 +82,15 @@ class Detector:
     @staticmethod
     def __convert_cv2_results_to_bounding_box_collection__(detection_results: dict) -> BoxList:
         """
-        Converts the CV2 format detection results into an easier to use form.
+        Converts the CV2 format detection results into an easier to use form.  The result arrays are wrapped rather than
+        copied, and no Box objects are created until they are needed.
 
         @param detection_results: A dict which is the CV2 format detection results to be converted.
         @return: A BoxList which is the reformatted detection results.
         """
-
-        boxes = BoxList()
-
-        for i in range(len(detection_results["detection_boxes"])):
-            new_box = Box(left_edge=detection_results["detection_boxes"][i][1],
-                          right_edge=detection_results["detection_boxes"][i][3],
-                          lower_edge=detection_results["detection_boxes"][i][0],
-                          upper_edge=detection_results["detection_boxes"][i][2],
-                          confidence=detection_results["detection_scores"][i],
-                          label=detection_results["detection_class_entities"][i])
-            boxes.add(new_box)
-
-        return boxes
+        return ArrayBoxList.from_arrays(boxes=detection_results["detection_boxes"],
+                                        scores=detection_results["detection_scores"],
+                                        labels=detection_results["detection_class_entities"])
 
     def get_frame(self) -> Frame:
         """
@@ -213,6 +208,30 @@ class Detector:
         """
         self.__nms_keep_top_k_indices__ = top_k
 
+    def set_nms_per_label(self, per_label: bool):
+        """
+        A setter for whether Non-Maximum Suppression is done separately for each label.  When this is set to True,
+        detections can only be suppressed by detections with the same label, so (for example) items on a table are not
+        suppressed by the table.
+
+        @param per_label:   A bool which states whether or not to perform NMS separately for each label.
+        @return:
+        """
+        self.__nms_per_label__ = per_label
+
+    def set_soft_nms_sigma(self, sigma: float | None):
+        """
+        A setter for the 'Sigma' parameter of Soft Non-Maximum Suppression.  When this is set, the scores of overlapping
+        detections are reduced rather than the detections being removed, and a detection is only removed once its score
+        falls below the detection confidence threshold.  The overlap threshold and the Eta parameter are not used.
+
+        @param sigma:   A float which is the width of the Gaussian penalty of Soft-NMS, or None to use normal NMS.
+        @return:
+        """
+        if sigma is not None and sigma <= 0.0:
+            raise ValueError("The Soft-NMS sigma must be above 0.")
+        self.__soft_nms_sigma__ = sigma
+
     def set_perform_nms(self, perform_nms: bool):
         """
         A setter for the perform_nms flag.  When this is set to false, Non-Maximum Suppression is not performed on the
@@ -226,41 +245,30 @@ class Detector:
     def __perform_nms__(self, detection_results: dict) -> dict:
         """
         Performs Non-Maximum Suppression of overlapping detection results.  Takes, and returns, data in the OpenCV2
-        results format.
+        results format.  The suppression works on the float arrays of the results, and the detections which are kept
+        stay in their original order.
 
         @param detection_results: A dict which is the detection results to perform NMS on.  Should be in CV2 format.
         @return: A dict which is the results (in CV2 format), which have had NMS performed on them.
         """
-        integer_bboxes = list()
-        for i in detection_results["detection_boxes"]:
-            a = int(i[0] * 1000)
-            b = int(i[1] * 1000)
-            c = int(i[2] * 1000) - a
-            d = int(i[3] * 1000) - b
-            integer_bboxes.append([a, b, c, d])
-
-        indexes = cv2.dnn.NMSBoxes(integer_bboxes, detection_results["detection_scores"],
-                                   self.__detection_confidence_threshold__,
-                                   self.__nms_overlap_threshold__,
-                                   self.__nms_eta__,
-                                   self.__nms_keep_top_k_indices__)
-
-        indexes = list(indexes)
-
-        new_results: dict = dict()
-        new_results["detection_boxes"] = list()
-        new_results["detection_scores"] = list()
-        new_results["detection_class_entities"] = list()
-        new_results["detection_class_names"] = list()
-        new_results["detection_class_labels"] = list()
-
-        for i in reversed(range(len(detection_results["detection_boxes"]))):
-            if i == indexes[-1]:
-                new_results["detection_boxes"].append(detection_results["detection_boxes"][i])
-                new_results["detection_scores"].append(detection_results["detection_scores"][i])
-                new_results["detection_class_entities"].append(detection_results["detection_class_entities"][i])
-                new_results["detection_class_names"].append(detection_results["detection_class_names"][i])
-                new_results["detection_class_labels"].append(detection_results["detection_class_labels"][i])
-
-                del indexes[-1]
+        boxes = numpy.asarray(detection_results["detection_boxes"]).reshape(-1, 4)
+        edges = (boxes[:, 1], boxes[:, 3], boxes[:, 0], boxes[:, 2])
+        scores = detection_results["detection_scores"]
+        groups = None
+        if self.__nms_per_label__:
+            _, groups = numpy.unique(detection_results["detection_class_entities"], return_inverse=True)
+        top_k = None if self.__nms_keep_top_k_indices__ is None else int(self.__nms_keep_top_k_indices__)
+
+        new_results = dict(detection_results)
+        if self.__soft_nms_sigma__ is None:
+            keep_mask = Suppression.get_nms_keep_mask(edges, scores, groups, self.__nms_overlap_threshold__,
+                                                      self.__detection_confidence_threshold__, self.__nms_eta__, top_k)
+        else:
+            keep_mask, new_scores = Suppression.get_soft_nms_scores(edges, scores, groups, self.__soft_nms_sigma__,
+                                                                    self.__detection_confidence_threshold__, top_k)
+            new_results["detection_scores"] = new_scores.astype(numpy.asarray(scores).dtype)
+
+        for key in ("detection_boxes", "detection_scores", "detection_class_entities", "detection_class_names",
+                    "detection_class_labels"):
+            new_results[key] = numpy.asarray(new_results[key])[keep_mask]
         return new_results
@@ -2,6 +2,7 @@ from PIL import Image, ImageColor, ImageFont, ImageDraw
 import cv2
 import numpy
 
+from util import Appearance
 from util.BoxList import BoxList
 from util.Box import Box
 
@@ -25,6 +26,10 @@ class Frame:
         """
         self.__cv2_img__: numpy.ndarray = cv2_image
         self.__pil_img__: Image = pil_image
+        # The picture as it was captured, before any bounding boxes are drawn on it, which is used for image analysis.
+        self.__source_img__: numpy.ndarray = cv2_image
+        self.__hsv_img__: numpy.ndarray | None = None
+        self.__grey_img__: numpy.ndarray | None = None
 
     @classmethod
     def new_from_pil(cls, pil_image: Image):
@@ -62,6 +67,75 @@ class Frame:
         """
         return self.__cv2_img__
 
+    def get_hsv_img(self) -> numpy.ndarray:
+        """
+        A getter for the picture in this frame in HSV format, as used for colour histograms.  It is only converted the
+        first time it is needed, and never includes any bounding boxes drawn onto the frame.
+
+        @return: A numpy.ndarray object which is the picture in this Frame, in OpenCV's 8-bit HSV format.
+        """
+        if self.__hsv_img__ is None:
+            self.__hsv_img__ = cv2.cvtColor(self.__source_img__, cv2.COLOR_BGR2HSV)
+        return self.__hsv_img__
+
+    def get_grey_img(self) -> numpy.ndarray:
+        """
+        A getter for the picture in this frame in greyscale, as used for optical flow.  It is only converted the first
+        time it is needed, and never includes any bounding boxes drawn onto the frame.
+
+        @return: A numpy.ndarray object which is the picture in this Frame, as an 8-bit greyscale image.
+        """
+        if self.__grey_img__ is None:
+            self.__grey_img__ = cv2.cvtColor(self.__source_img__, cv2.COLOR_BGR2GRAY)
+        return self.__grey_img__
+
+    def get_appearances(self, box_collection: BoxList) -> numpy.ndarray:
+        """
+        Gets a colour histogram of the part of the picture inside each of the given bounding boxes, which the Tracker
+        can use to recognise items that come back into view.  This should be called before any bounding boxes are drawn
+        onto the picture.
+
+        @param box_collection:  A BoxList object which contains the bounding boxes.
+        @return:                A numpy.ndarray where each row is the normalised HSV histogram of one box, in collection
+                                order.
+        """
+        return Appearance.get_hsv_histograms(self.get_hsv_img(), box_collection.views()[:4])
+
+    def get_optical_flow_shifts(self, previous_frame, box_collection: BoxList, max_points: int = 400) -> numpy.ndarray:
+        """
+        Measures how far the contents of each of the given bounding boxes have moved since the previous frame, so that
+        tracks can be moved on without running object detection.  Corner points are found in the previous frame, and
+        followed into this frame with sparse Lucas-Kanade optical flow.  The shift of each box is the median movement of
+        the points which were inside it.
+
+        @param previous_frame:  A Frame object which is the frame before this one.
+        @param box_collection:  A BoxList object which contains the bounding boxes in the previous frame.
+        @param max_points:      An int which is the largest number of corner points to follow.
+        @return:                A numpy.ndarray of shape (N, 2), where each row is how far one box has moved
+                                horizontally and vertically, as decimals of the width and height of the frame, in
+                                collection order.  Boxes which no points could be followed in have a row of NaN values.
+        """
+        shifts = numpy.full((box_collection.size(), 2), numpy.nan)
+        previous_grey = previous_frame.get_grey_img()
+        points = cv2.goodFeaturesToTrack(previous_grey, maxCorners=max_points, qualityLevel=0.01, minDistance=7)
+        if points is None or box_collection.size() == 0:
+            return shifts
+
+        new_points, status, _ = cv2.calcOpticalFlowPyrLK(previous_grey, self.get_grey_img(), points, None)
+        followed = status.ravel() == 1
+        height, width = previous_grey.shape
+        scale = numpy.array([width, height], dtype=numpy.float64)
+        starts = points.reshape(-1, 2)[followed] / scale
+        movements = new_points.reshape(-1, 2)[followed] / scale - starts
+
+        left, right, lower, upper = box_collection.views()[:4]
+        inside = ((starts[:, 0] >= left[:, None]) & (starts[:, 0] <= right[:, None])
+                  & (starts[:, 1] >= lower[:, None]) & (starts[:, 1] <= upper[:, None]))
+        for box in range(box_collection.size()):
+            if inside[box].any():
+                shifts[box] = numpy.median(movements[inside[box]], axis=0)
+        return shifts
+
     def draw_bounding_boxes(self, box_collection: BoxList):
         """
         Draw the given set of bounding boxes onto the picture in this frame.
@@ -76,7 +150,7 @@ class Frame:
         for i in range(box_collection.size()):
             box: Box = box_collection.get(i)
             display_str = box.label + ": " + str(round(box.confidence * 100, 1)) + "%"
-            color = colors[hash(box.label) % len(colors)]
+            color = colors[box.label_id % len(colors)]
 
             self.__draw_bounding_box_on_image__(y_min=box.lower_edge, x_min=box.left_edge, y_max=box.upper_edge,
                                                 x_max=box.right_edge, color=color, font=font,
@@ -1,6 +1,8 @@
 import sys
 
 from cv2wrapper.Frame import Frame
+from model.Checkpointer import Checkpointer
+from model.DetectionScheduler import DetectionScheduler
 from model.KnowledgeUnit import KnowledgeUnit
 from model.SubsumptionUnit import SubsumptionUnit
 from model.Tracker import Tracker
@@ -12,8 +14,10 @@ from util.Debugging import display_progress_percent
 
 class MainClass:
     if __name__ == "__main__":
-        # Set up Tracker
-        tracker = Tracker(min_frames=20, allowed_absence=20, iou_threshold=0.7)
+        # Set up Tracker.  min_frames and allowed_absence only count frames that object detection is run on, which is
+        # every third frame with the Detection Scheduler below, so 7 of them is still about 20 frames of video.
+        tracker = Tracker(min_frames=7, allowed_absence=7, iou_threshold=0.7, motion_model=True, reidentify=True)
+        tracker.match_across_labels(["Table", "Desk", "Coffee table", "Kitchen & dining room table"])
 
         # Set up Knowledge Unit
         knowledge = KnowledgeUnit()
@@ -26,6 +30,17 @@ class MainClass:
         sub_unit.add_list(["Chair", "Table", "Shelf", "Footwear"])
         sub_unit.add_list(["Person", "Clothing", "Human face", "Human leg"])
         sub_unit.add_list(["Clothing", "Footwear"])
+        # Uncomment to also subsume every OpenImages class into the classes above it in the class hierarchy.
+        # sub_unit.load_hierarchy("bbox_labels_600_hierarchy.json", "oidv6-class-descriptions.csv")
+        sub_unit.compile()
+
+        # Set up Detection Scheduler.  Object detection is run on every third frame, or every frame when items are
+        # moving quickly, and the tracks are moved on with optical flow in between.
+        scheduler = DetectionScheduler(interval=3, max_speed=0.02)
+
+        # Set up Checkpointer
+        checkpointer = Checkpointer("ailsa_checkpoint.npz", tracker=tracker, knowledge=knowledge, interval=300)
+        # checkpointer.restore()  # Uncomment to carry on from the last checkpoint after a restart.
 
         # Set up CV2 Wrapper classes.
         detector_model = "https://tfhub.dev/google/openimages_v4/ssd/mobilenet_v2/1"
@@ -37,9 +52,12 @@ class MainClass:
         # webcam_detector = Detector("https://tfhub.dev/google/openimages_v4/ssd/mobilenet_v2/1")
         file_detector = Detector(detector_model, video_file + file_extension)
         detector = file_detector
-        detector.set_perform_nms(False)  # Set to not perform NMS so as not to interfere with the Subsumption Unit
+        # NMS is done separately for each label, so as not to interfere with the Subsumption Unit, which handles boxes
+        # of different labels.  This removes duplicate boxes before the slower stages.
+        detector.set_perform_nms(True)
+        detector.set_nms_per_label(True)
         detector.set_detection_confidence_threshold(0.1)
-        detector.set_nms_overlap_threshold(0.1)
+        detector.set_nms_overlap_threshold(0.7)
         detector.set_nms_eta_parameter(None)
         detector.set_nms_top_k_parameter(None)
 
@@ -53,25 +71,37 @@ class MainClass:
         key_pressed: str | None = None
         frames_per_sec = detector.get_fps()
         secs_per_frame = 1 / frames_per_sec
+        previous_frame: Frame | None = None
+        current_tracks, track_ids = tracker.get_current_tracks()
         while keep_going:
             if not paused:
                 if detector.try_loading_next_frame():
                     # Calculate video time.
                     time: int = round(detector.get_current_frame_number() * secs_per_frame)
 
-                    # Get all data from the Detector.
-                    detector.run_detection_on_current_frame()
-                    frame: Frame = detector.get_frame()
-                    detected_items = detector.get_bounding_boxes()
-
-                    # Process the data before handing over to the logic units.
-                    detected_items.trim_by_confidence(min_confidence=0.1)
-                    detected_items = sub_unit.subsume_bboxes(detected_items)
-
-                    # Generate tracks and pass them to the Knowledge Unit.
-                    tracker.add_new_frame(detected_items)
+                    if scheduler.should_detect(tracker):
+                        # Get all data from the Detector.
+                        detector.run_detection_on_current_frame()
+                        frame: Frame = detector.get_frame()
+                        detected_items = detector.get_bounding_boxes()
+
+                        # Process the data before handing over to the logic units.
+                        detected_items.trim_by_confidence(min_confidence=0.1)
+                        detected_items = sub_unit.subsume_bboxes(detected_items)
+
+                        # Generate tracks.
+                        tracker.add_new_frame(detected_items, frame.get_appearances(detected_items))
+                    else:
+                        # Move the tracks on with optical flow rather than running object detection.
+                        frame: Frame = detector.get_frame()
+                        shifts = frame.get_optical_flow_shifts(previous_frame, current_tracks)
+                        tracker.propagate_frame(dict(zip(track_ids, shifts)))
+
+                    # Pass the tracks to the Knowledge Unit.
+                    previous_frame = frame
                     current_tracks, track_ids = tracker.get_current_tracks()
                     knowledge.add_frame(current_tracks, time)
+                    checkpointer.add_frame()
 
                     # Housekeeping Functions.
                     frame.draw_bounding_boxes(current_tracks)  # Show items being tracked.
@@ -0,0 +1,104 @@
+import os
+
+import numpy
+
+from model.KnowledgeUnit import KnowledgeUnit
+from model.Tracker import Tracker
+
+
+class Checkpointer:
+    """
+    A class to save the state of a Tracker and a KnowledgeUnit to a file every few frames, so that if the program is
+    restarted it can carry on from where it was, rather than starting every track from scratch.  The checkpoint can
+    also be used to replay part of a session when debugging.
+
+    The state of each unit is a handful of numpy arrays, which are written into a single uncompressed .npz file.  The
+    file is written to a temporary file first and then moved into place, so a crash while saving never leaves a broken
+    checkpoint behind.
+    """
+    __tracker_prefix__: str = "tracker."
+    __knowledge_prefix__: str = "knowledge."
+
+    def __init__(self, file_name: str, tracker: Tracker | None = None, knowledge: KnowledgeUnit | None = None,
+                 interval: int = 100):
+        """
+        The constructor.
+
+        @param file_name:   A str which is the name of the checkpoint file.  It should end in ".npz".
+        @param tracker:     A Tracker object whose state is saved, or None.
+        @param knowledge:   A KnowledgeUnit object whose state is saved, or None.
+        @param interval:    An int which is the number of frames between each checkpoint.
+        """
+        if interval < 1:
+            raise ValueError("The checkpoint interval must be at least 1 frame.")
+
+        self.__file_name__: str = file_name
+        self.__tracker__: Tracker | None = tracker
+        self.__knowledge__: KnowledgeUnit | None = knowledge
+        self.__interval__: int = interval
+        self.__frames_since_checkpoint__: int = 0
+
+    def add_frame(self) -> bool:
+        """
+        Tells the Checkpointer that a frame has been processed.  A checkpoint is saved once every few frames, as set in
+        the constructor.
+
+        @return: A bool which is True if a checkpoint was saved.
+        """
+        self.__frames_since_checkpoint__ += 1
+        if self.__frames_since_checkpoint__ < self.__interval__:
+            return False
+
+        self.save()
+        return True
+
+    def save(self):
+        """
+        Saves a checkpoint now.
+
+        @return:
+        """
+        arrays = dict()
+        if self.__tracker__ is not None:
+            for key, array in self.__tracker__.get_state().items():
+                arrays[Checkpointer.__tracker_prefix__ + key] = array
+        if self.__knowledge__ is not None:
+            for key, array in self.__knowledge__.get_state().items():
+                arrays[Checkpointer.__knowledge_prefix__ + key] = array
+
+        temporary_file_name = self.__file_name__ + ".tmp"
+        with open(temporary_file_name, "wb") as file:
+            numpy.savez(file, **arrays)
+        os.replace(temporary_file_name, self.__file_name__)
+        self.__frames_since_checkpoint__ = 0
+
+    def restore(self) -> bool:
+        """
+        Restores the Tracker and KnowledgeUnit from the checkpoint file, if there is one.
+
+        @return: A bool which is True if a checkpoint was found and restored.
+        """
+        if not os.path.exists(self.__file_name__):
+            return False
+
+        with numpy.load(self.__file_name__, allow_pickle=False) as checkpoint:
+            tracker_state = self.__get_unit_state__(checkpoint, Checkpointer.__tracker_prefix__)
+            knowledge_state = self.__get_unit_state__(checkpoint, Checkpointer.__knowledge_prefix__)
+
+        if self.__tracker__ is not None and tracker_state:
+            self.__tracker__.set_state(tracker_state)
+        if self.__knowledge__ is not None and knowledge_state:
+            self.__knowledge__.set_state(knowledge_state)
+        self.__frames_since_checkpoint__ = 0
+        return True
+
+    @staticmethod
+    def __get_unit_state__(checkpoint, prefix: str) -> dict:
+        """
+        Gets the arrays saved for one unit from a loaded checkpoint file.
+
+        @param checkpoint:  The loaded checkpoint file, as returned by numpy.load().
+        @param prefix:      A str which is the prefix added to the keys of the unit.
+        @return:            A dict where each key is a str, and each value is a numpy.ndarray.
+        """
+        return {key[len(prefix):]: checkpoint[key] for key in checkpoint.files if key.startswith(prefix)}
@@ -0,0 +1,47 @@
+from model.Tracker import Tracker
+
+
+class DetectionScheduler:
+    """
+    A class to decide which frames object detection should be run on.  Object detection is by far the slowest part of
+    each frame, so rather than running it on every frame it is run on every Nth frame, and the tracks are moved on in
+    the frames between with Tracker.propagate_frame().
+
+    Items which move a long way between detections may not be matched with their tracks, so if a Tracker is given,
+    detection is also run whenever the fastest track is moving faster than a set speed.
+    """
+
+    def __init__(self, interval: int = 1, max_speed: float | None = None):
+        """
+        The constructor.
+
+        @param interval:    An int which is the number of frames between each frame that object detection is run on.  1
+                            runs object detection on every frame.
+        @param max_speed:   A float which is the fastest a track may move, in decimals of the size of the frame per
+                            frame, before object detection is run on every frame.  If None, the speed of the tracks is
+                            not checked.
+        """
+        if interval < 1:
+            raise ValueError("The detection interval must be at least 1 frame.")
+        if max_speed is not None and max_speed < 0.0:
+            raise ValueError("The maximum speed cannot be negative.")
+
+        self.__interval__: int = interval
+        self.__max_speed__: float | None = max_speed
+        # Starting at the interval makes object detection run on the first frame.
+        self.__frames_since_detection__: int = interval
+
+    def should_detect(self, tracker: Tracker | None = None) -> bool:
+        """
+        Decides whether object detection should be run on the next frame.  This should be called once for every frame.
+
+        @param tracker: A Tracker object, whose tracks are checked against the maximum speed, or None.
+        @return:        A bool which is True if object detection should be run on the frame, or False if the tracks
+                        should be propagated instead.
+        """
+        detect = self.__frames_since_detection__ + 1 >= self.__interval__
+        if not detect and self.__max_speed__ is not None and tracker is not None:
+            detect = tracker.get_max_speed() > self.__max_speed__
+
+        self.__frames_since_detection__ = 0 if detect else self.__frames_since_detection__ + 1
+        return detect
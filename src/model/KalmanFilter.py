@@ -0,0 +1,224 @@
+import numpy
+
+
+class KalmanFilter:
+    """
+    A constant-velocity Kalman filter for a series of bounding boxes, which predicts where each box will be in the next
+    frame.  Each box is described by its centre, width and height, along with the rate of change of each of these.
+
+    The four measured values are treated as independent of each other, so the covariance of each one is a 2x2 matrix
+    (of the value and its rate of change), which is stored as three arrays.  This keeps every step a handful of
+    vectorised array operations across all the boxes, rather than one matrix calculation per box.  The noise levels
+    scale with the size of each box, so that large and small boxes are treated alike.
+
+    Each box keeps the same row for as long as it is in the filter, so the owner of the filter can hold on to the row
+    numbers.  Removed rows are not compacted away, but are reused by later calls to append(), so removing a box does
+    not move any other box.  The arrays returned by predict() and get_edges() include the unused rows, which should
+    simply be ignored.
+    """
+    def __init__(self, position_noise: float = 1.0 / 20.0, velocity_noise: float = 1.0 / 160.0):
+        """
+        The constructor.  Initialises the filter with no boxes.
+
+        @param position_noise:  A float which is the standard deviation of the measured position and size of a box, as
+                                a decimal of the size of the box.
+        @param velocity_noise:  A float which is the standard deviation of the change in velocity of a box in each
+                                frame, as a decimal of the size of the box.
+        """
+        self.__position_noise__: float = position_noise
+        self.__velocity_noise__: float = velocity_noise
+        self.__position__: numpy.ndarray = numpy.empty((0, 4))
+        self.__velocity__: numpy.ndarray = numpy.empty((0, 4))
+        self.__position_variance__: numpy.ndarray = numpy.empty((0, 4))
+        self.__covariance__: numpy.ndarray = numpy.empty((0, 4))
+        self.__velocity_variance__: numpy.ndarray = numpy.empty((0, 4))
+        self.__free_rows__: list = list()
+
+    def append(self, edges: tuple) -> numpy.ndarray:
+        """
+        Adds new boxes to the filter.  They start with no velocity, and a high uncertainty in their velocity.  Rows
+        freed by remove() are used first, and the filter only grows if there are not enough of them.
+
+        @param edges:   A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        boxes to add.
+        @return:        A numpy.ndarray of int values, which are the rows given to the new boxes, in the same order as
+                        the boxes.
+        """
+        measurement = self.__get_measurement__(edges)
+        scale = self.__get_scale__(measurement)
+        rows = self.__get_unused_rows__(len(measurement))
+
+        self.__position__[rows] = measurement
+        self.__velocity__[rows] = 0.0
+        self.__position_variance__[rows] = (2.0 * self.__position_noise__ * scale) ** 2
+        self.__covariance__[rows] = 0.0
+        self.__velocity_variance__[rows] = (10.0 * self.__velocity_noise__ * scale) ** 2
+        return rows
+
+    def remove(self, rows):
+        """
+        Removes the given rows from the filter.  The other rows keep their row numbers, and the removed rows will be
+        reused by later boxes.
+
+        @param rows:    A sequence of int values, which are the rows to remove.
+        @return:
+        """
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        self.__velocity__[rows] = 0.0
+        self.__covariance__[rows] = 0.0
+        self.__free_rows__.extend(rows.tolist())
+
+    def __get_unused_rows__(self, count: int) -> numpy.ndarray:
+        """
+        Takes the given number of unused rows, from the freed rows first, and then by adding new rows to the end of
+        each array.
+
+        @param count:   An int which is the number of rows needed.
+        @return:        A numpy.ndarray of int values, which are the rows that have been taken.
+        """
+        split = max(len(self.__free_rows__) - count, 0)
+        reused = self.__free_rows__[split:]
+        del self.__free_rows__[split:]
+
+        first_new_row = len(self.__position__)
+        new_rows = count - len(reused)
+        if new_rows > 0:
+            padding = numpy.zeros((new_rows, 4))
+            self.__position__ = numpy.concatenate((self.__position__, padding))
+            self.__velocity__ = numpy.concatenate((self.__velocity__, padding))
+            self.__position_variance__ = numpy.concatenate((self.__position_variance__, padding))
+            self.__covariance__ = numpy.concatenate((self.__covariance__, padding))
+            self.__velocity_variance__ = numpy.concatenate((self.__velocity_variance__, padding))
+
+        return numpy.concatenate((numpy.array(reused, dtype=numpy.intp),
+                                  numpy.arange(first_new_row, first_new_row + max(new_rows, 0), dtype=numpy.intp)))
+
+    def get_state(self, rows) -> numpy.ndarray:
+        """
+        Gets everything the filter knows about the given rows, so that they can be saved and later added back to a
+        filter with append_state().
+
+        @param rows:    A sequence of int values, which are the rows to get.
+        @return:        A numpy.ndarray of shape (N, 5, 4), where each row holds the position, velocity, position
+                        variance, covariance and velocity variance of a box.
+        """
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        return numpy.stack((self.__position__[rows], self.__velocity__[rows], self.__position_variance__[rows],
+                            self.__covariance__[rows], self.__velocity_variance__[rows]), axis=1)
+
+    def append_state(self, state: numpy.ndarray) -> numpy.ndarray:
+        """
+        Adds boxes to the filter with the state returned by get_state(), rather than starting them from scratch.
+
+        @param state:   A numpy.ndarray of shape (N, 5, 4), as returned by get_state().
+        @return:        A numpy.ndarray of int values, which are the rows given to the boxes, in the same order as the
+                        given state.
+        """
+        state = numpy.asarray(state, dtype=numpy.float64).reshape(-1, 5, 4)
+        rows = self.__get_unused_rows__(len(state))
+
+        self.__position__[rows] = state[:, 0]
+        self.__velocity__[rows] = state[:, 1]
+        self.__position_variance__[rows] = state[:, 2]
+        self.__covariance__[rows] = state[:, 3]
+        self.__velocity_variance__[rows] = state[:, 4]
+        return rows
+
+    def predict(self) -> tuple:
+        """
+        Moves every box on by one frame, at its current velocity.
+
+        @return:    A tuple of four numpy.ndarray objects, which are the predicted left, right, lower and upper edges of
+                    every row.
+        """
+        scale = self.__get_scale__(self.__position__)
+
+        self.__position__ = self.__position__ + self.__velocity__
+        self.__position_variance__ = self.__position_variance__ + 2.0 * self.__covariance__ \
+            + self.__velocity_variance__ + (self.__position_noise__ * scale) ** 2
+        self.__covariance__ = self.__covariance__ + self.__velocity_variance__
+        self.__velocity_variance__ = self.__velocity_variance__ + (self.__velocity_noise__ * scale) ** 2
+
+        return self.get_edges()
+
+    def update(self, rows, edges: tuple):
+        """
+        Corrects the given rows with the boxes that were actually measured for them.
+
+        @param rows:    A sequence of int values, which are the rows that have been measured.
+        @param edges:   A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        measured boxes, in the same order as the rows.
+        @return:
+        """
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        measurement = self.__get_measurement__(edges)
+        position = self.__position__[rows]
+        position_variance = self.__position_variance__[rows]
+        covariance = self.__covariance__[rows]
+
+        innovation_variance = position_variance + (self.__position_noise__ * self.__get_scale__(position)) ** 2
+        position_gain = position_variance / innovation_variance
+        velocity_gain = covariance / innovation_variance
+        innovation = measurement - position
+
+        self.__position__[rows] = position + position_gain * innovation
+        self.__velocity__[rows] += velocity_gain * innovation
+        self.__velocity_variance__[rows] -= velocity_gain * covariance
+        self.__position_variance__[rows] = (1.0 - position_gain) * position_variance
+        self.__covariance__[rows] = (1.0 - position_gain) * covariance
+
+    def get_edges(self) -> tuple:
+        """
+        Gets the current estimate of the edges of every box.
+
+        @return:    A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of every
+                    row.
+        """
+        centre_x, centre_y, width, height = self.__position__.T
+        half_width = numpy.maximum(width, 0.0) / 2.0
+        half_height = numpy.maximum(height, 0.0) / 2.0
+
+        return centre_x - half_width, centre_x + half_width, centre_y - half_height, centre_y + half_height
+
+    def get_velocities(self) -> numpy.ndarray:
+        """
+        A getter for the estimated velocity of every box.
+
+        @return:    A numpy.ndarray of shape (N, 4), where each row is the change in the horizontal and vertical centre,
+                    the width and the height of the box in that row in each frame.
+        """
+        return self.__velocity__.copy()
+
+    def __len__(self) -> int:
+        """
+        An override of the len function.
+
+        @return: An int which is the number of boxes in the filter.
+        """
+        return len(self.__position__) - len(self.__free_rows__)
+
+    @staticmethod
+    def __get_measurement__(edges: tuple) -> numpy.ndarray:
+        """
+        Converts box edges into the values used by the filter.
+
+        @param edges:   A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        boxes.
+        @return:        A numpy.ndarray of shape (N, 4), where each row is the horizontal and vertical centre, the width
+                        and the height of a box.
+        """
+        left, right, lower, upper = (numpy.asarray(edge, dtype=numpy.float64) for edge in edges)
+        return numpy.stack(((left + right) / 2.0, (lower + upper) / 2.0, right - left, upper - lower), axis=1)
+
+    @staticmethod
+    def __get_scale__(position: numpy.ndarray) -> numpy.ndarray:
+        """
+        Gets the size used to scale the noise of each value.  The horizontal values are scaled by the width of the box,
+        and the vertical values by its height.  A small minimum stops the noise from vanishing for tiny boxes.
+
+        @param position:    A numpy.ndarray of shape (N, 4), which is the centre, width and height of each box.
+        @return:            A numpy.ndarray of shape (N, 4), which is the scale of each value.
+        """
+        width = numpy.maximum(position[:, 2], 0.001)
+        height = numpy.maximum(position[:, 3], 0.001)
+        return numpy.stack((width, height, width, height), axis=1)
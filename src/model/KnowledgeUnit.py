@@ -1,6 +1,9 @@
+import numpy
+
 from util.BoxList import BoxList
 from util.Box import Box
 from util.Debugging import debug_print
+from util.LabelRegistry import get_label_registry
 
 
 class KnowledgeUnit:
@@ -53,6 +56,52 @@ class KnowledgeUnit:
 
         self.__last_frame_time__ = time
 
+    def get_state(self) -> dict:
+        """
+        Gathers the history of the Unit (the items that have been seen, when they were seen, and the most recent frame)
+        into a dict of numpy arrays, which can be saved with numpy.savez() and later restored with set_state().  The
+        facts and settings given to the Unit (such as the impossible items) are not included.
+
+        @return: A dict where each key is a str, and each value is a numpy.ndarray.
+        """
+        item_names = list(self.__recorded_items__.keys())
+        records = list(self.__recorded_items__.values())
+        frame_boxes = list(self.__current_frame__.bboxes) if self.__current_frame__ is not None else list()
+
+        return {"item_names": numpy.array(item_names, dtype=str),
+                "item_counts": numpy.array([count for count, _ in records], dtype=numpy.int64),
+                "time_offsets": numpy.cumsum([0] + [len(times) for _, times in records], dtype=numpy.int64),
+                "times": numpy.array([time for _, times in records for time in times], dtype=numpy.int64),
+                "last_frame_time": numpy.array(self.__last_frame_time__, dtype=numpy.int64),
+                "has_frame": numpy.array(self.__current_frame__ is not None),
+                "frame_boxes": numpy.array([(box.left_edge, box.right_edge, box.lower_edge, box.upper_edge,
+                                             box.confidence) for box in frame_boxes],
+                                           dtype=numpy.float64).reshape(-1, 5),
+                "frame_labels": numpy.array([box.label for box in frame_boxes], dtype=str)}
+
+    def set_state(self, state: dict):
+        """
+        Replaces the history of the Unit with a state returned by get_state(), such as one loaded from a checkpoint.
+        The facts and settings should be given to the Unit as usual, before the state is restored.
+
+        @param state:   A dict (or other mapping, such as the result of numpy.load()) of the arrays returned by
+                        get_state().
+        @return:
+        """
+        offsets = state["time_offsets"].tolist()
+        times = state["times"].tolist()
+        self.__recorded_items__ = {name: (count, times[offsets[i]:offsets[i + 1]]) for i, (name, count) in
+                                   enumerate(zip(state["item_names"].tolist(), state["item_counts"].tolist()))}
+        self.__last_frame_time__ = int(state["last_frame_time"])
+
+        self.__current_frame__ = None
+        if bool(state["has_frame"]):
+            frame_boxes = BoxList()
+            for fields, label in zip(state["frame_boxes"].tolist(), state["frame_labels"].tolist()):
+                frame_boxes.add(Box(*fields, label))
+            self.__current_frame__ = KnowledgeUnit.Frame(frame_boxes)
+            self.__rename_impossible_items_in_frame__(self.__current_frame__)
+
     def __update_existing_item_record__(self, item_name: str, item_count_in_frame: int, time: int):
         """
         Updates the record of an item type which has already been seen.
@@ -188,8 +237,9 @@ class KnowledgeUnit:
 
         for custom_category in self.__facts__.custom_categories.keys():
             category_items: list = list()
+            category_ids: frozenset = self.__facts__.custom_category_ids[custom_category]
             for item in items:
-                if item.label in self.__facts__.custom_categories[custom_category]:
+                if item.label_id in category_ids:
                     category_items.append(item.label)
             description[custom_category] = sorted(category_items)
 
@@ -245,6 +295,7 @@ class KnowledgeUnit:
         @return:
         """
         self.__facts__.custom_categories[name] = items
+        self.__facts__.custom_category_ids[name] = get_label_registry().get_ids(items)
 
     def get_list_of_seen_items_in_category(self, category: str) -> list:
         """
@@ -271,9 +322,10 @@ class KnowledgeUnit:
         """
         item_location: dict = dict()
         frame_bboxes: BoxList = self.__current_frame__.bboxes
+        item_id = get_label_registry().find_id(item_name)
 
         for item in frame_bboxes:
-            if item.label == item_name:
+            if item.label_id == item_id:
                 item_location[self.__strs__.direction] = self.__get_direction_list__(item)
                 item_location[self.__strs__.beneath] = self.__get_list_of_items_above_this__(item)
                 item_location[self.__strs__.on_top_of] = self.__get_on_top_of__(item)
@@ -290,20 +342,21 @@ class KnowledgeUnit:
         @return:            A str which is the name ("" if none) of the item the given item is on top of.
         """
         object_item_is_on_top_of = self.__strs__.empty_str
-        if item_on_top.label in self.__facts__.furniture_items:
+        if item_on_top.label_id in self.__facts__.furniture_item_ids:
             return object_item_is_on_top_of
 
         max_area_below: float = 0.0
         frame_items: BoxList = self.__current_frame__.bboxes
-        for item_below in frame_items:
+        index = frame_items.get_spatial_index()
+        for item_index in index.get_horizontally_intersecting(item_on_top.left_edge, item_on_top.right_edge):
+            item_below = frame_items[item_index]
             high_enough_to_sit_on = item_below.upper_edge + self.__facts__.max_gap_for_item_on_top_of_another
             if high_enough_to_sit_on > item_on_top.lower_edge:
-                if item_below.left_edge < item_on_top.right_edge and item_below.right_edge > item_on_top.left_edge:
-                    if item_below is not item_on_top:
-                        area_below = item_below.get_overlap_area(Box(0.0, 1.0, 0.0, item_on_top.lower_edge, 1.0, ""))
-                        if area_below > max_area_below:
-                            max_area_below = area_below
-                            object_item_is_on_top_of = item_below.label
+                if item_below is not item_on_top:
+                    area_below = item_below.get_overlap_area(Box(0.0, 1.0, 0.0, item_on_top.lower_edge, 1.0, ""))
+                    if area_below > max_area_below:
+                        max_area_below = area_below
+                        object_item_is_on_top_of = item_below.label
 
         return object_item_is_on_top_of
 
@@ -320,12 +373,14 @@ class KnowledgeUnit:
         item_beneath_these_objects: list = list()
 
         frame_items: BoxList = self.__current_frame__.bboxes
-        for item_above in frame_items:
-            if item_above.label in self.__facts__.wall_and_ceiling_items:
-                if item_above.lower_edge > item_beneath.lower_edge:
-                    if item_above.right_edge > item_beneath.left_edge \
-                            and item_above.left_edge < item_beneath.right_edge:
-                        item_beneath_these_objects.append(item_above.label)
+        index = frame_items.get_spatial_index()
+        items_above = numpy.intersect1d(index.get_above(item_beneath.lower_edge),
+                                        index.get_horizontally_intersecting(item_beneath.left_edge,
+                                                                            item_beneath.right_edge))
+        for item_index in items_above:
+            item_above = frame_items[item_index]
+            if item_above.label_id in self.__facts__.wall_and_ceiling_item_ids:
+                item_beneath_these_objects.append(item_above.label)
 
         return sorted(item_beneath_these_objects)
 
@@ -350,6 +405,7 @@ class KnowledgeUnit:
         @return:
         """
         self.__facts__.wall_and_ceiling_items = items
+        self.__facts__.wall_and_ceiling_item_ids = get_label_registry().get_ids(items)
 
     def __get_direction_list__(self, item: Box) -> list:
         """
@@ -378,6 +434,7 @@ class KnowledgeUnit:
         @return:
         """
         self.__facts__.furniture_items = furniture_items
+        self.__facts__.furniture_item_ids = get_label_registry().get_ids(furniture_items)
 
     def items_between_user_and(self, item_name: str) -> list:
         """
@@ -392,8 +449,9 @@ class KnowledgeUnit:
         @return:            A list of str values which are the names of items which may be in-between the user and the
                             target.
         """
+        item_id = get_label_registry().find_id(item_name)
         for item in self.__current_frame__.bboxes:
-            if item.label == item_name:
+            if item.label_id == item_id:
                 return self.__get_intervening_items__(item)
 
         return list()
@@ -408,10 +466,11 @@ class KnowledgeUnit:
                             target.
         """
         intervening_items: list = list()
+        frame_items: BoxList = self.__current_frame__.bboxes
 
-        for intervening_item in self.__current_frame__.bboxes:
-            if intervening_item.lower_edge < target_item.lower_edge \
-                    and intervening_item is not target_item:
+        for item_index in frame_items.get_spatial_index().get_below(target_item.lower_edge):
+            intervening_item = frame_items[item_index]
+            if intervening_item is not target_item:
                 intervening_items.append(intervening_item.label)
 
         return intervening_items
@@ -449,17 +508,15 @@ class KnowledgeUnit:
             @param bboxes:  A BoxList object which contains the bounding boxes identified in the frame.
             """
             self.bboxes: BoxList = bboxes
-            self.item_types: list = list()
-            self.item_counts: list = list()
 
+            counts_by_label_id: dict = dict()
             for box in bboxes:
-                label = box.label
-                if label not in self.item_types:
-                    self.item_types.append(label)
-                    self.item_counts.append(1)
-                else:
-                    index = self.item_types.index(label)
-                    self.item_counts[index] += 1
+                label_id = box.label_id
+                counts_by_label_id[label_id] = counts_by_label_id.get(label_id, 0) + 1
+
+            registry = get_label_registry()
+            self.item_types: list = [registry.get_label(label_id) for label_id in counts_by_label_id.keys()]
+            self.item_counts: list = list(counts_by_label_id.values())
 
     class Facts:
         """
@@ -472,8 +529,11 @@ class KnowledgeUnit:
             """
             self.items_not_normally_on_floor: list = list()
             self.wall_and_ceiling_items: list = list()
+            self.wall_and_ceiling_item_ids: frozenset = frozenset()
             self.furniture_items: list = list()
+            self.furniture_item_ids: frozenset = frozenset()
             self.left_frame_boundary = 0.33
             self.right_frame_boundary = 0.66
             self.custom_categories: dict = dict()
+            self.custom_category_ids: dict = dict()
             self.max_gap_for_item_on_top_of_another: float = 0.0
@@ -1,5 +1,12 @@
+import csv
+import json
+
+import numpy
+
+from util import BoxMaths
+from util.BoxBatch import BoxBatch
 from util.BoxList import BoxList
-from util.Box import Box
+from util.LabelRegistry import get_label_registry
 
 
 class SubsumptionUnit:
@@ -9,11 +16,29 @@ class SubsumptionUnit:
     subsumption list.  This is to avoid the problem with NMS where, for example, items on top of a table are suppressed
     and not reported to the user.  It should also help stop the problem of multiple overlapping bounding boxes all being
     reported for the same item.
+
+    The subsumption lists are compiled into a matrix of which labels may be subsumed into which, the first time they are
+    needed after a change.  Boxes which do not overlap cannot be subsumed, so each frame a sweep along the horizontal
+    axis (BoxMaths.get_horizontally_intersecting_pairs()) finds the pairs of boxes whose horizontal extents intersect.
+    Only the labels and overlaps of these pairs are then checked, in one vectorised pass.  If the overlap threshold is
+    negative, every pair is checked instead.  The only work done box by box is for the few boxes which have somewhere to
+    be subsumed into.
+
+    Once all the lists have been added, compile() checks them for mistakes and freezes them, after which they cannot be
+    changed.  The lists can also be saved to, and loaded from, a JSON file with export_rules() and import_rules().
+    Rather than writing the lists by hand, they can be generated from a class hierarchy (such as the OpenImages one)
+    with load_hierarchy().
     """
     def __init__(self):
         """The constructor.  Defines the default value for the overlap threshold."""
         self.__overlap_threshold__: float = 0.9
         self.__items_to_sub__: dict = dict()
+        self.__compiled__: bool = False
+        # The compiled subsumption lists.  The label ids which appear in the lists, in ascending order, and a matrix
+        # where element [i, j] is True if label i may be subsumed into label j.  The last row and column are for every
+        # other label, and are always False.
+        self.__rule_labels__: numpy.ndarray | None = None
+        self.__rule_matrix__: numpy.ndarray | None = None
 
     def add_list(self, new_list: list):
         """
@@ -22,17 +47,138 @@ class SubsumptionUnit:
         suitably large overlap with an appropriate bounding box.
 
         @param new_list:    A list of str values describing the item type to subsume into, and the item types that may
-                            be subsumed.
+                            be subsumed.  The list is not changed.
         @return:
         """
-        item = new_list.pop(0)
+        if self.__compiled__:
+            raise ValueError("The subsumption lists have been compiled, and cannot be changed.")
+        if not new_list:
+            raise ValueError("A subsumption list must contain at least one item.")
+
+        registry = get_label_registry()
+        item, *sub_able_items = new_list
 
-        can_be_substituted_for = item
-        for sub_able_item in new_list:
-            if sub_able_item not in self.__items_to_sub__:
-                self.__items_to_sub__[sub_able_item] = [can_be_substituted_for]
+        can_be_substituted_for = registry.get_id(item)
+        for sub_able_item in sub_able_items:
+            sub_able_item_id = registry.get_id(sub_able_item)
+            if sub_able_item_id not in self.__items_to_sub__:
+                self.__items_to_sub__[sub_able_item_id] = {can_be_substituted_for}
             else:
-                self.__items_to_sub__[sub_able_item].append(can_be_substituted_for)
+                self.__items_to_sub__[sub_able_item_id].add(can_be_substituted_for)
+        self.__rule_labels__ = None
+        self.__rule_matrix__ = None
+
+    def compile(self):
+        """
+        Checks the subsumption lists for mistakes, and freezes them so that they cannot be changed.  The lists must not
+        contain any cycles of different item types which may be subsumed into each other (such as "Chair" into "Table"
+        and "Table" into "Chair"), as which box is kept would then depend on the order of the boxes.
+
+        Compiling is optional, as the lists are also compiled the first time boxes are subsumed, but doing it once the
+        lists are set up finds mistakes before any frames are processed.
+
+        @return:
+        """
+        cycle = self.__find_cycle__()
+        if cycle is not None:
+            registry = get_label_registry()
+            raise ValueError("The subsumption lists contain a cycle: "
+                             + " -> ".join(registry.get_label(label_id) for label_id in cycle))
+
+        self.__items_to_sub__ = {sub_able_item: frozenset(items_can_sub_into)
+                                 for sub_able_item, items_can_sub_into in self.__items_to_sub__.items()}
+        self.__compiled__ = True
+        self.__compile_rules__()
+
+    def is_compiled(self) -> bool:
+        """
+        A getter for whether the subsumption lists have been compiled with compile().
+
+        @return: A bool which is True if the lists have been compiled, and can no longer be changed.
+        """
+        return self.__compiled__
+
+    def get_items_can_sub_into(self, item) -> frozenset:
+        """
+        Gets the item types which the given item type may be subsumed into, not including its own type.
+
+        @param item:    A str which is the item type.
+        @return:        A frozenset of str values, which are the item types.
+        """
+        registry = get_label_registry()
+        items_can_sub_into = self.__items_to_sub__.get(registry.find_id(item), ())
+        return frozenset(registry.get_label(label_id) for label_id in items_can_sub_into)
+
+    def export_rules(self, file_name: str):
+        """
+        Saves the subsumption lists to a JSON file.  The file holds an object where each key is an item type, and each
+        value is a sorted list of the item types it may be subsumed into.
+
+        @param file_name:   A str which is the name of the file to write.
+        @return:
+        """
+        registry = get_label_registry()
+        rules = {registry.get_label(sub_able_item): sorted(registry.get_label(label_id) for label_id in items)
+                 for sub_able_item, items in self.__items_to_sub__.items()}
+
+        with open(file_name, "w", encoding="utf-8") as file:
+            json.dump(dict(sorted(rules.items())), file, indent=2)
+
+    def import_rules(self, file_name: str):
+        """
+        Adds the subsumption lists saved in a JSON file by export_rules() to the lists already in the unit.
+
+        @param file_name:   A str which is the name of the file to read.
+        @return:
+        """
+        with open(file_name, encoding="utf-8") as file:
+            rules = json.load(file)
+        if not isinstance(rules, dict):
+            raise ValueError("The file " + file_name + " does not contain a table of subsumption rules.")
+
+        for sub_able_item, items_can_sub_into in rules.items():
+            for item in items_can_sub_into:
+                self.add_list([item, sub_able_item])
+
+    def load_hierarchy(self, file_name: str, descriptions_file_name: str | None = None):
+        """
+        Adds subsumption lists generated from a class hierarchy file, in the JSON format used by OpenImages.  Each class
+        in the file is an object with a "LabelName", and may have lists of "Subcategory" and "Part" classes beneath it.
+        Every class may be subsumed into all of the classes above it (its ancestors), so for example a "Human face" box
+        inside a "Person" box is removed, as if ["Person", "Human face"] had been added with add_list().  The class at
+        the top of the file is the root of the hierarchy, and is not used.
+
+        The ancestors of each class are found once, when the file is loaded, and are compiled into the same matrix as
+        the other lists, so subsuming boxes is no slower however large the hierarchy is.
+
+        @param file_name:               A str which is the name of the hierarchy file.
+        @param descriptions_file_name:  A str which is the name of a CSV file in the OpenImages format, where each row
+                                        is a LabelName and the label that the detection model uses for it, or None if
+                                        the hierarchy file uses the labels of the detection model itself.
+        @return:
+        """
+        with open(file_name, encoding="utf-8") as file:
+            hierarchy = json.load(file)
+        if not isinstance(hierarchy, dict) or "LabelName" not in hierarchy:
+            raise ValueError("The file " + file_name + " does not contain a class hierarchy.")
+
+        label_names = dict()
+        if descriptions_file_name is not None:
+            with open(descriptions_file_name, encoding="utf-8", newline="") as file:
+                label_names = {row[0]: row[1] for row in csv.reader(file) if len(row) >= 2}
+
+        # A class can appear in more than one place in the hierarchy, so its ancestors are gathered from every place.
+        ancestors = dict()
+        pending = [(child, ()) for child in self.__get_hierarchy_children__(hierarchy)]
+        while pending:
+            node, node_ancestors = pending.pop()
+            label = label_names.get(node["LabelName"], node["LabelName"])
+            ancestors.setdefault(label, set()).update(ancestor for ancestor in node_ancestors if ancestor != label)
+            pending.extend((child, node_ancestors + (label,)) for child in self.__get_hierarchy_children__(node))
+
+        for label, label_ancestors in ancestors.items():
+            for ancestor in label_ancestors:
+                self.add_list([ancestor, label])
 
     def subsume_bboxes(self, boxes: BoxList) -> BoxList:
         """
@@ -46,79 +192,185 @@ class SubsumptionUnit:
         """
         boxes_to_return: BoxList = BoxList()
         boxes.sort_by_area()
-        list_of_boxes_subbed_into_own_type: list = [False] * len(boxes)
+        boxes_to_keep = self.__find_boxes_to_keep__(boxes.views()[:4], boxes.get_label_ids())
         for index in range(len(boxes)):
-            box_subbed, subbed_into_own_type = self.__try_to_sub_box__(index, boxes, list_of_boxes_subbed_into_own_type)
-            if not box_subbed:
+            if boxes_to_keep[index]:
                 boxes_to_return.add(boxes[index])
-            if subbed_into_own_type:
-                list_of_boxes_subbed_into_own_type[index] = True
 
         return boxes_to_return
 
-    def __try_to_sub_box__(self, index_of_box_to_be_subbed: int,
-                           boxes: BoxList,
-                           list_of_boxes_subbed_into_own_type: list) -> (bool, bool):
-        """
-        Attempts to subsume a given bounding box into another, and returns a boolean describing if this could be done.
-        Also returns a bool describing if the bounding box was subsumed into a box of its own type, which is needed to
-        stop boxes of the same type "pairing up" and subsuming into each other.
-
-        @param index_of_box_to_be_subbed:           An int which is the index of the target box in the box collection.
-        @param boxes:                               A BoxList object containing the boxes to try to
-                                                    subsume the target box into.
-        @param list_of_boxes_subbed_into_own_type:  A list of bool values describing which indexes in the box collection
-                                                    have been subsumed into boxes of their own type.
-        @return:                                    A tuple of two bool values.  The first describes whether or not the
-                                                    given bounding box could be subsumed into another one, and the
-                                                    second describes whether or not it was subsumed into a bounding box
-                                                    of its own type.
-        """
-        box_to_be_subbed = boxes[index_of_box_to_be_subbed]
-        list_of_items_can_sub_into: list = self.__generate_list_of_possible_boxes_to_sub_into__(box_to_be_subbed)
-
-        for i in range(len(boxes)):
-            candidate_box = boxes[i]
-
-            candidate_can_be_subbed_into = candidate_box.label in list_of_items_can_sub_into
-            they_are_not_the_same_box = candidate_box != box_to_be_subbed
-            candidate_was_not_subbed_into_own_type = not list_of_boxes_subbed_into_own_type[i]
-            if candidate_can_be_subbed_into \
-                    and they_are_not_the_same_box \
-                    and candidate_was_not_subbed_into_own_type:
-                if self.__check_if_overlapping__(box_to_be_subbed, candidate_box):
-                    subbed_into_own_type = box_to_be_subbed.label == candidate_box.label
-                    return True, subbed_into_own_type
-        return False, False
-
-    def __check_if_overlapping__(self, overlapping_box: Box, overlapped_box: Box) -> bool:
-        """
-        Checks if two boxes have a suitably large overlap.  This is defined as whether or not the overlapping area (as a
-        decimal of the area of the given box) is larger than the overlap threshold value.
-
-        @param overlapping_box: A Box object, which may or may not overlap with another box.
-        @param overlapped_box:  A Box object, which may or may not overlap with the given box.
-        @return:                A bool, which describes if the given boxes overlap by more than the threshold.
-        """
-        overlap_area = overlapped_box.get_overlap_area(overlapping_box)
-        overlap_ratio = overlap_area / overlapping_box.get_area()
-        return overlap_ratio > self.__overlap_threshold__
-
-    def __generate_list_of_possible_boxes_to_sub_into__(self, box_to_be_subbed: Box) -> list:
-        """
-        Checks the lists of valid subsumption options and returns a list of all possible item labels that the given
-        bounding box may be subsumed into.  This list automatically includes the name of the item type of the given
-        bounding box.  I.e. bounding boxes of a given type may always be subsumed into other bounding boxes of that
-        type.
-
-        @param box_to_be_subbed:    A Box object, which is to be subsumed.
-        @return:                    A list of str values that describe which items that the current bounding box may be
-                                    subsumed into.
-        """
-        list_of_items_can_sub_into: list = [box_to_be_subbed.label]
-        if box_to_be_subbed.label in self.__items_to_sub__:
-            list_of_items_can_sub_into.extend(self.__items_to_sub__[box_to_be_subbed.label])
-        return list_of_items_can_sub_into
+    def subsume_batch(self, batch: BoxBatch) -> BoxBatch:
+        """
+        Perform subsumption on every frame of the given batch of bounding boxes.  Each frame is subsumed independently,
+        in the same way as the subsume_bboxes() function, but the candidate pairs of boxes for every frame are found in
+        one sweep, and the label and overlap checks are each done in one pass over the whole batch.
+
+        @param batch:   A BoxBatch object which contains the bounding boxes of each frame.  It is not changed.
+        @return:        A BoxBatch object, sorted by area within each frame, that has had boxes that can be subsumed
+                        into another box removed.
+        """
+        subsumed_batch = batch.copy()
+        subsumed_batch.sort_by_area()
+        boxes_to_keep = self.__find_boxes_to_keep__(subsumed_batch.views()[:4], subsumed_batch.get_label_ids(),
+                                                    subsumed_batch.get_frame_ids())
+        subsumed_batch.keep_mask(boxes_to_keep)
+
+        return subsumed_batch
+
+    def __find_boxes_to_keep__(self, edges: tuple, label_ids: numpy.ndarray,
+                               frame_ids: numpy.ndarray | None = None) -> numpy.ndarray:
+        """
+        Works out which boxes in the given collection cannot be subsumed into another box.  The boxes of each frame must
+        already be sorted by area, and be next to each other.
+
+        Each box is subsumed into the first box (in collection order) which it may be subsumed into, and which it
+        overlaps by more than the threshold.  A box which has been subsumed into a box of its own type cannot have other
+        boxes subsumed into it, which stops boxes of the same type "pairing up" and subsuming into each other.  This is
+        the only part which depends on the boxes before it, so it is the only part done box by box.
+
+        Boxes which do not overlap cannot be subsumed into each other (unless the threshold is negative), so only the
+        pairs of boxes in the same frame found by a sweep along the horizontal axis are checked, rather than every pair.
+
+        @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of
+                            the N boxes.
+        @param label_ids:   A numpy.ndarray of N int values, which are the label ids of the boxes.
+        @param frame_ids:   A numpy.ndarray of N int values, which are the frame of each box, or None if the boxes are
+                            all from one frame.
+        @return:            A numpy.ndarray of N bool values, which are True for each box that should be kept.
+        """
+        box_count = len(label_ids)
+        boxes_to_keep = numpy.ones(box_count, dtype=bool)
+        if box_count < 2:
+            return boxes_to_keep
+
+        if self.__overlap_threshold__ >= 0.0:
+            first_boxes, second_boxes = BoxMaths.get_horizontally_intersecting_pairs(edges[0], edges[1], frame_ids)
+        else:
+            # Every pair of boxes in the same frame is checked, by sweeping extents which all intersect.
+            first_boxes, second_boxes = BoxMaths.get_horizontally_intersecting_pairs(
+                numpy.zeros(box_count), numpy.ones(box_count), frame_ids)
+
+        # Each pair is checked both ways round, as either box of a pair may be subsumed into the other.
+        subbed = numpy.concatenate((first_boxes, second_boxes))
+        subbed_into = numpy.concatenate((second_boxes, first_boxes))
+        allowed = self.__get_label_compatibility__(label_ids[subbed], label_ids[subbed_into])
+        subbed, subbed_into = subbed[allowed], subbed_into[allowed]
+
+        overlap_areas = BoxMaths.get_paired_overlap_areas(tuple(edge[subbed] for edge in edges),
+                                                          tuple(edge[subbed_into] for edge in edges))
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            overlap_ratios = overlap_areas / BoxMaths.get_areas(*edges)[subbed]
+        overlapping = overlap_ratios > self.__overlap_threshold__
+        subbed, subbed_into = subbed[overlapping], subbed_into[overlapping]
+        if not subbed.size:
+            return boxes_to_keep
+
+        # Group the pairs by the box being subsumed, in collection order, with its candidates in collection order.
+        order = numpy.lexsort((subbed_into, subbed))
+        subbed, subbed_into = subbed[order], subbed_into[order]
+        group_starts = numpy.flatnonzero(numpy.diff(subbed)) + 1
+
+        subbed_into_own_type = numpy.zeros(box_count, dtype=bool)
+        for index, candidates in zip(subbed[numpy.r_[0, group_starts]], numpy.split(subbed_into, group_starts)):
+            candidates = candidates[~subbed_into_own_type[candidates]]
+            if candidates.size:
+                boxes_to_keep[index] = False
+                subbed_into_own_type[index] = label_ids[candidates[0]] == label_ids[index]
+
+        return boxes_to_keep
+
+    def __get_label_compatibility__(self, label_ids: numpy.ndarray, other_label_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Works out which pairs of labels may be subsumed into each other.  A label may always be subsumed into itself,
+        and into any label it shares a subsumption list with as the first item.
+
+        @param label_ids:       A numpy.ndarray of N int label ids, which are the labels to be subsumed.
+        @param other_label_ids: A numpy.ndarray of N int label ids, which are the labels to subsume into.
+        @return:                A numpy.ndarray of N bool values, where element i is True if a box with label i of the
+                                first series may be subsumed into a box with label i of the second series.
+        """
+        if self.__rule_matrix__ is None:
+            self.__compile_rules__()
+
+        return self.__rule_matrix__[self.__get_rule_rows__(label_ids), self.__get_rule_rows__(other_label_ids)] \
+            | (label_ids == other_label_ids)
+
+    def __get_rule_rows__(self, label_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Finds the row of the compiled subsumption matrix for each of the given labels.
+
+        @param label_ids:   A numpy.ndarray of int label ids.
+        @return:            A numpy.ndarray of int values, which are the rows.  Labels which are not on any subsumption
+                            list are given the last row.
+        """
+        rows = numpy.searchsorted(self.__rule_labels__, label_ids)
+        rows = numpy.minimum(rows, len(self.__rule_labels__))
+        known = rows < len(self.__rule_labels__)
+        known[known] = self.__rule_labels__[rows[known]] == label_ids[known]
+        rows[~known] = len(self.__rule_labels__)
+
+        return rows
+
+    def __compile_rules__(self):
+        """
+        Compiles the subsumption lists into a matrix of which labels may be subsumed into which.
+
+        @return:
+        """
+        rule_labels = set(self.__items_to_sub__)
+        for items_can_sub_into in self.__items_to_sub__.values():
+            rule_labels.update(items_can_sub_into)
+        self.__rule_labels__ = numpy.array(sorted(rule_labels), dtype=numpy.int64)
+
+        self.__rule_matrix__ = numpy.zeros((len(rule_labels) + 1, len(rule_labels) + 1), dtype=bool)
+        for sub_able_item, items_can_sub_into in self.__items_to_sub__.items():
+            row = numpy.searchsorted(self.__rule_labels__, sub_able_item)
+            columns = numpy.searchsorted(self.__rule_labels__, list(items_can_sub_into))
+            self.__rule_matrix__[row, columns] = True
+
+    @staticmethod
+    def __get_hierarchy_children__(node: dict) -> list:
+        """
+        Gets the classes directly beneath a class in a class hierarchy.
+
+        @param node:    A dict which is one class of the hierarchy, as loaded from the JSON file.
+        @return:        A list of dict objects, which are the subcategories and then the parts of the class.
+        """
+        return list(node.get("Subcategory", ())) + list(node.get("Part", ()))
+
+    def __find_cycle__(self) -> list | None:
+        """
+        Searches the subsumption lists for a cycle of different item types which may be subsumed into each other.
+
+        @return:    A list of int label ids, which are the item types in the cycle, starting and ending with the same
+                    one, or None if there are no cycles.
+        """
+        # A depth first search, where each item type is unvisited, on the current path, or finished.
+        on_path = dict()
+        finished = set()
+        for start in self.__items_to_sub__:
+            if start in finished:
+                continue
+
+            path = [start]
+            on_path[start] = 0
+            pending = [iter(self.__items_to_sub__[start])]
+            while pending:
+                next_item = next(pending[-1], None)
+                if next_item is None:
+                    finished_item = path.pop()
+                    del on_path[finished_item]
+                    finished.add(finished_item)
+                    pending.pop()
+                elif next_item == path[-1] or next_item in finished:
+                    continue
+                elif next_item in on_path:
+                    return path[on_path[next_item]:] + [next_item]
+                else:
+                    on_path[next_item] = len(path)
+                    path.append(next_item)
+                    pending.append(iter(self.__items_to_sub__.get(next_item, ())))
+        return None
 
     def set_overlap_threshold(self, allowed_overlap=0.9):
         """
@@ -0,0 +1,46 @@
+from util.CompactBox import CompactBox
+
+
+class TrackEvent:
+    """
+    A class to describe one change to the tracks held by a Tracker, so that other parts of the program can react to
+    what has changed, rather than going through every track in every frame.  The kind of change is one of the str
+    constants of this class:
+
+    BORN:           A new track has been started.  It may not yet have been seen for enough frames to be reported.
+    CONFIRMED:      A track has now been seen for enough frames to be reported by the Tracker.
+    UPDATED:        A confirmed track has been seen again, and its bounding box has changed.
+    LOST:           A track has not been seen for too many frames, and has been removed.
+    REIDENTIFIED:   A lost track has been recognised by its appearance, and has been brought back with its old UID.
+    """
+    BORN: str = "born"
+    CONFIRMED: str = "confirmed"
+    UPDATED: str = "updated"
+    LOST: str = "lost"
+    REIDENTIFIED: str = "reidentified"
+
+    __slots__ = ("kind", "uid", "box", "frame")
+
+    def __init__(self, kind: str, uid: int, box: CompactBox, frame: int):
+        """
+        The constructor.
+
+        @param kind:    A str which is the kind of change.  One of TrackEvent.BORN, TrackEvent.CONFIRMED,
+                        TrackEvent.UPDATED, TrackEvent.LOST or TrackEvent.REIDENTIFIED.
+        @param uid:     An int which is the UID of the track that has changed.
+        @param box:     A CompactBox object which is the bounding box of the track after the change.  For a lost track,
+                        this is the last bounding box it had.
+        @param frame:   An int which is the number of the frame the change happened in.
+        """
+        self.kind: str = kind
+        self.uid: int = uid
+        self.box: CompactBox = box
+        self.frame: int = frame
+
+    def __str__(self) -> str:
+        """
+        An override of the str function.  Used in debugging.
+
+        @return: A str which summarises the event.
+        """
+        return "Track " + str(self.uid) + " " + self.kind + " on frame " + str(self.frame) + " (" + str(self.box) + ")"
@@ -1,8 +1,19 @@
-import copy
+from collections import deque
+from types import MappingProxyType
 
+import numpy
+
+from model.KalmanFilter import KalmanFilter
+from model.TrackEvent import TrackEvent
+from util import Appearance
+from util import Assignment
+from util import BoxMaths
 from util.BoxList import BoxList
+from util.CompactBox import CompactBox
 from util.SafeListEditor import safely_remove_list_indexes as safe_rm
 from util.Box import Box
+from util.LabelRegistry import get_label_registry
+from util.TrackHistory import TrackHistory
 
 
 class Tracker:
@@ -13,8 +24,15 @@ class Tracker:
     identified for a single frame, or boxes which have dropped out of a single frame, from being erroneously described
     (or not described) to the user.
     """
-
-    def __init__(self, iou_threshold=0.9, min_frames=1, allowed_absence=0):
+    __assignment_functions__: dict = {"greedy": Assignment.get_greedy_pair_matches,
+                                      "hungarian": Assignment.get_optimal_pair_matches}
+    # How much each new sighting changes the appearance of a track, used for re-identification.
+    __appearance_update_rate__: float = 0.3
+    # The smallest change in any edge of a propagated track which counts as the track moving.
+    __min_propagated_movement__: float = 1e-9
+
+    def __init__(self, iou_threshold=0.9, min_frames=1, allowed_absence=0, assignment="greedy", motion_model=False,
+                 history_depth=16, reidentify=False, reid_threshold=0.8, reid_memory=100):
         """
         The constructor for the class.
 
@@ -24,93 +42,470 @@ class Tracker:
                                 reported as a valid track.
         @param allowed_absence: An int which is the maximum number of frames which an item may not appear for before it
                                 is no longer reported as a valid track.
+        @param assignment:      A str which is the method used to match each bounding box to at most one track, and
+                                each track to at most one bounding box.  Either "greedy" (the pairs with the highest IoU
+                                values are matched first) or "hungarian" (the total IoU of all matched pairs is as high
+                                as possible).
+        @param motion_model:    A bool which, if True, uses a constant-velocity Kalman filter to predict where each
+                                track will be in the new frame, and matches the new bounding boxes against these
+                                predictions rather than against where each track was last seen.
+        @param history_depth:   An int which is the number of recent sightings each track remembers, for use with
+                                get_track_history().  If 0, no history is kept.
+        @param reidentify:      A bool which, if True, remembers the appearance of tracks which have been lost, so that
+                                when an item comes back into view it carries on with its old track (and its old UID)
+                                rather than starting a new one.  The appearances must be given to add_new_frame().
+        @param reid_threshold:  A float which is how similar (from 0.0 to 1.0) the appearance of a new bounding box must
+                                be to a lost track for the box to carry on that track.
+        @param reid_memory:     An int which is the number of frames that a lost track is remembered for.
         """
-        self.__tracks__: list = list()
+        if assignment not in Tracker.__assignment_functions__:
+            raise ValueError("The assignment method must be one of: " + ", ".join(Tracker.__assignment_functions__))
+
+        self.__tracks__: dict = dict()
+        self.__last_seen_buckets__: deque = deque()
+        self.__motion_rows__: dict = dict()
+        self.__label_groups__: dict = dict()
+        self.__events__: list = list()
+        self.__confirmed_tracks__: dict = dict()
+        self.__current_tracks__: tuple | None = None
+        self.__pending_frame__: tuple | None = None
         self.__frame_count__: int = 0
+        self.__detection_count__: int = 0
         self.__min_frames_for_track__ = min_frames
         self.__allowed_absence__ = allowed_absence
         self.__min_iou_to_continue_track__ = iou_threshold
         self.__next_track_uid__ = 0
+        self.__history_depth__: int = history_depth
+        self.__assignment__: str = assignment
+        self.__motion_model__: KalmanFilter | None = KalmanFilter() if motion_model else None
+        self.__reidentify__: bool = reidentify
+        self.__reid_threshold__: float = reid_threshold
+        self.__reid_memory__: int = reid_memory
+        self.__lost_tracks__: dict = dict()
+        self.__lost_buckets__: deque = deque()
+
+    def match_across_labels(self, labels):
+        """
+        Allows tracks and bounding boxes with any of the given labels to be matched with each other.  By default, a
+        bounding box can only continue a track with the same label.  This is for classes which the object detection
+        model often confuses with each other, such as different kinds of table.  When a track is continued by a box
+        with a different label in the same group, the track keeps whichever label has the highest confidence.
+
+        If any of the labels are already in a group, the groups are merged.
+
+        @param labels:  A collection of str values, which are the labels that may be matched with each other.
+        @return:
+        """
+        group = set(get_label_registry().get_ids(labels))
+        merged_keys = {self.__label_groups__[label_id] for label_id in group if label_id in self.__label_groups__}
+        group.update(label_id for label_id, group_key in self.__label_groups__.items() if group_key in merged_keys)
 
-    def add_new_frame(self, frame_bounding_boxes: BoxList):
+        # Each group is known by its lowest label id, which cannot be the label id of a label outside the group.
+        group_key = min(group, default=None)
+        for label_id in group:
+            self.__label_groups__[label_id] = group_key
+
+    def add_new_frame(self, frame_bounding_boxes: BoxList, appearances: numpy.ndarray | None = None):
         """
         Adds a new frame to the tracker.  Updates any items currently being tracked, and adds and removes tracks for
         items as required.
 
         @param frame_bounding_boxes: A BoxList object which is the bounding boxes for items in the frame.
+        @param appearances:          A numpy.ndarray where each row is the appearance (such as the colour histogram
+                                     returned by Frame.get_appearances()) of one bounding box, in collection order.
+                                     Only used if the tracker was created with reidentify set to True.
         @return:
         """
+        track_edges, track_groups, frame_edges, frame_groups = self.start_frame(frame_bounding_boxes, appearances)
+        track_indexes, bbox_indexes = Tracker.get_matches_within_groups(track_edges, track_groups,
+                                                                        frame_edges, frame_groups,
+                                                                        self.__min_iou_to_continue_track__,
+                                                                        self.__assignment__)
+        self.finish_frame(track_indexes, bbox_indexes)
+
+    def start_frame(self, frame_bounding_boxes: BoxList, appearances: numpy.ndarray | None = None) -> tuple:
+        """
+        The first half of add_new_frame().  Starts a new frame, and gathers what is needed to match the new bounding
+        boxes to the tracks.  The matching is left to the caller, so that it can be done for several trackers at once
+        (as the TrackerPool class does), and the results must then be passed to finish_frame().  Most callers should
+        use add_new_frame() instead.
+
+        @param frame_bounding_boxes: A BoxList object which is the bounding boxes for items in the frame.
+        @param appearances:          A numpy.ndarray where each row is the appearance of one bounding box, or None.  See
+                                     add_new_frame().
+        @return:                     A tuple of the track edges, track label groups, bounding box edges and bounding
+                                     box label groups, in the form taken by get_matches_within_groups().
+        """
+        self.check_new_frame(frame_bounding_boxes, appearances)
+
         self.__frame_count__ = self.__frame_count__ + 1
-        self.__add_frame_bounding_boxes_to_tracks__(frame_bounding_boxes)
+        self.__detection_count__ = self.__detection_count__ + 1
+        self.__events__ = list()
+
+        tracks = list(self.__tracks__.values())
+        motion_rows = None
+        if self.__motion_model__ is not None:
+            motion_rows = numpy.fromiter((self.__motion_rows__[track.get_uid()] for track in tracks),
+                                         dtype=numpy.intp, count=len(tracks))
+            track_edges = tuple(edge[motion_rows] for edge in self.__motion_model__.predict())
+        else:
+            track_edges = self.__get_track_edge_arrays__(tracks)
+        frame_edges = frame_bounding_boxes.views()[:4]
+
+        track_groups = self.__get_label_groups__(numpy.fromiter((track.get_box().label_id for track in tracks),
+                                                                dtype=numpy.int64, count=len(tracks)))
+        frame_groups = self.__get_label_groups__(frame_bounding_boxes.get_label_ids())
+
+        if appearances is not None:
+            appearances = numpy.asarray(appearances, dtype=numpy.float64)
+        self.__pending_frame__ = (frame_bounding_boxes, frame_edges, tracks, motion_rows, appearances)
+        return track_edges, track_groups, frame_edges, frame_groups
+
+    def check_new_frame(self, frame_bounding_boxes: BoxList, appearances: numpy.ndarray | None = None):
+        """
+        Checks that a new frame can be started with start_frame(), without changing the Tracker.  start_frame() does
+        this itself, but a caller starting several trackers at once can check them all first.
+
+        @param frame_bounding_boxes: A BoxList object which is the bounding boxes for items in the frame.
+        @param appearances:          A numpy.ndarray where each row is the appearance of one bounding box, or None.
+        @return:
+        """
+        if self.__pending_frame__ is not None:
+            raise ValueError("The previous frame has not been finished.")
+        if appearances is not None and len(appearances) != len(frame_bounding_boxes):
+            raise ValueError("There must be one appearance for each bounding box.")
+
+    def finish_frame(self, track_indexes: numpy.ndarray, bbox_indexes: numpy.ndarray):
+        """
+        The second half of add_new_frame().  Updates the tracks with the bounding boxes that have been matched to them,
+        adds the other bounding boxes as new tracks, and removes old tracks.
+
+        @param track_indexes:   A numpy.ndarray of int values, which are the indexes of the matched tracks, in the order
+                                returned by start_frame().
+        @param bbox_indexes:    A numpy.ndarray of int values, which are the indexes of the bounding boxes matched to
+                                each of these tracks.
+        @return:
+        """
+        if self.__pending_frame__ is None:
+            raise ValueError("A frame must be started with start_frame() before it can be finished.")
+
+        self.__add_frame_bounding_boxes_to_tracks__(numpy.asarray(track_indexes, dtype=numpy.intp),
+                                                    numpy.asarray(bbox_indexes, dtype=numpy.intp))
+        self.__pending_frame__ = None
         self.__remove_old_tracks__()
 
+    def propagate_frame(self, shifts: dict | None = None):
+        """
+        Adds a new frame which object detection has not been run on, so that detection only needs to be run on some
+        frames.  Rather than being matched with new bounding boxes, each track is moved on to where it is expected to
+        be: by the given shift if there is one (such as one measured with optical flow, see
+        Frame.get_optical_flow_shifts()), or otherwise by the motion model, if it is in use.  Tracks which are moved
+        neither way stay where they are.
+
+        Propagated frames do not count as sightings, and do not count towards the number of frames a track may be
+        absent for.  Confirmed tracks which move are reported as updated.
+
+        @param shifts:  A dict where each key is the UID of a track, and each value is a pair of float values, which
+                        are how far the item has moved horizontally and vertically since the previous frame, as decimals
+                        of the width and height of the frame.  Shifts which are not finite are ignored.  If None, only
+                        the motion model is used.
+        @return:
+        """
+        if self.__pending_frame__ is not None:
+            raise ValueError("The previous frame has not been finished.")
+
+        self.__frame_count__ = self.__frame_count__ + 1
+        self.__events__ = list()
+        predicted_edges = self.__motion_model__.predict() if self.__motion_model__ is not None else None
+        if predicted_edges is None and not shifts:
+            return
+
+        shifted_rows = list()
+        shifted_tracks = list()
+        for uid, track in self.__tracks__.items():
+            box = track.get_box()
+            shift = shifts.get(uid) if shifts else None
+            if shift is not None and numpy.all(numpy.isfinite(shift)):
+                horizontal_shift, vertical_shift = shift
+                edges = (box.left_edge + horizontal_shift, box.right_edge + horizontal_shift,
+                         box.lower_edge + vertical_shift, box.upper_edge + vertical_shift)
+                if self.__motion_model__ is not None:
+                    shifted_rows.append(self.__motion_rows__[uid])
+                    shifted_tracks.append(track)
+            elif predicted_edges is not None:
+                row = self.__motion_rows__[uid]
+                edges = tuple(float(edge[row]) for edge in predicted_edges)
+            else:
+                continue
+
+            # Tracks which have not moved (such as those with a zero shift) keep their box exactly as it was, so that a
+            # still scene causes no updates and does not pick up rounding errors from the motion model.
+            old_edges = (box.left_edge, box.right_edge, box.lower_edge, box.upper_edge)
+            if max(abs(new - old) for new, old in zip(edges, old_edges)) <= Tracker.__min_propagated_movement__:
+                continue
+
+            track.propagated(CompactBox(*edges, box.confidence, box.label))
+            if uid in self.__confirmed_tracks__:
+                self.__confirmed_tracks__[uid] = track.get_box()
+                self.__current_tracks__ = None
+                self.__events__.append(TrackEvent(TrackEvent.UPDATED, uid, track.get_box(), self.__frame_count__))
+
+        if shifted_rows:
+            # A measured shift is more reliable than the prediction, so it corrects the motion model like a sighting.
+            self.__motion_model__.update(shifted_rows, self.__get_track_edge_arrays__(shifted_tracks))
+
+    def get_max_speed(self) -> float:
+        """
+        Estimates how fast the fastest tracked item is moving, which can be used to decide how often object detection
+        needs to be run.  The speeds come from the motion model if it is in use, or otherwise from the track histories.
+
+        @return: A float which is the largest distance that the centre of any track moves in each frame, as a decimal of
+                 the size of the frame.  0.0 if there are no tracks, or no way to tell how fast they are moving.
+        """
+        if not self.__tracks__:
+            return 0.0
+
+        if self.__motion_model__ is not None:
+            rows = numpy.fromiter((self.__motion_rows__[uid] for uid in self.__tracks__), dtype=numpy.intp,
+                                  count=len(self.__tracks__))
+            velocities = self.__motion_model__.get_velocities()[rows, :2]
+        elif self.__history_depth__ > 0:
+            velocities = numpy.array([track.get_history().get_velocity() for track in self.__tracks__.values()])
+        else:
+            return 0.0
+        return float(numpy.hypot(velocities[:, 0], velocities[:, 1]).max())
+
+    @staticmethod
+    def get_matches_within_groups(track_edges: tuple, track_groups: numpy.ndarray, frame_edges: tuple,
+                                  frame_groups: numpy.ndarray, iou_threshold: float,
+                                  assignment: str = "greedy") -> (numpy.ndarray, numpy.ndarray):
+        """
+        Matches bounding boxes to tracks, where a box can only be matched to a track in the same group.  Every pair of
+        a track and a box in the same group is found in one pass, their IoU values are calculated in one pass, and the
+        pairs are then matched one to one in a single call, so the work depends on the number of pairs in the same
+        group rather than on the number of tracks multiplied by the number of boxes.
+
+        @param track_edges:     A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges
+                                of the tracks.
+        @param track_groups:    A numpy.ndarray of int values, which are the group of each track.
+        @param frame_edges:     A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges
+                                of the bounding boxes.
+        @param frame_groups:    A numpy.ndarray of int values, which are the group of each bounding box.
+        @param iou_threshold:   A float which is the IoU value that a pair must be above to be matched.
+        @param assignment:      A str which is the matching method.  Either "greedy" or "hungarian".
+        @return:                A tuple of two numpy.ndarray objects of int values, which are the indexes of the matched
+                                tracks and bounding boxes, in track order.
+        """
+        rows, cols = Assignment.get_pairs_in_same_group(track_groups, frame_groups)
+        ious = BoxMaths.get_paired_ious(tuple(edge[rows] for edge in track_edges),
+                                        tuple(edge[cols] for edge in frame_edges))
+        return Tracker.__assignment_functions__[assignment](rows, cols, ious, iou_threshold)
+
     def __remove_old_tracks__(self):
         """
         Removes any tracked items that have not been identified in recent frames.  The exact number of frames an item
-        can be absent for is set in the class constructor.
+        can be absent for is set in the class constructor.  Only frames which had object detection run on them count
+        towards this, so frames added with propagate_frame() do not make tracks expire.
+
+        Each frame adds one bucket to the end of a queue, holding the UIDs of the tracks seen in that frame, so the
+        buckets are always in order of frame.  Only the buckets which are now too old are looked at, and a track in one
+        of them is only removed if it has not been seen again since.  This means that the cost of removing old tracks
+        depends on how many tracks have expired, not on how many tracks there are.
 
         @return:
         """
-        oldest_allowed_track = self.__frame_count__ - self.__allowed_absence__
-        indexes_to_remove = list()
-        for i in range(len(self.__tracks__)):
-            track: Tracker.Track = self.__tracks__[i]
-            if track.get_last_seen() < oldest_allowed_track:
-                indexes_to_remove.append(i)
-
-        safe_rm(self.__tracks__, indexes_to_remove)
+        oldest_allowed_track = self.__detection_count__ - self.__allowed_absence__
+        expired_uids = list()
+        while self.__last_seen_buckets__ and self.__last_seen_buckets__[0][0] < oldest_allowed_track:
+            _, frame, uids = self.__last_seen_buckets__.popleft()
+            for uid in uids:
+                track = self.__tracks__.get(uid)
+                if track is not None and track.get_last_seen() == frame:
+                    expired_uids.append(uid)
+
+        for uid in expired_uids:
+            track = self.__tracks__.pop(uid)
+            self.__events__.append(TrackEvent(TrackEvent.LOST, uid, track.get_box(), self.__frame_count__))
+            if self.__confirmed_tracks__.pop(uid, None) is not None:
+                self.__current_tracks__ = None
+            if self.__reidentify__ and track.get_appearance() is not None:
+                self.__lost_tracks__[uid] = (track, self.__frame_count__)
+        if self.__motion_model__ is not None and expired_uids:
+            self.__motion_model__.remove([self.__motion_rows__.pop(uid) for uid in expired_uids])
+        if self.__reidentify__ and expired_uids:
+            self.__lost_buckets__.append((self.__frame_count__, expired_uids))
+        self.__forget_old_lost_tracks__()
+
+    def __forget_old_lost_tracks__(self):
+        """
+        Forgets any lost tracks which were lost too long ago to be re-identified.  As with the current tracks, the lost
+        tracks are kept in buckets in order of the frame they were lost in, so only the expired buckets are looked at.
 
-    def __add_frame_bounding_boxes_to_tracks__(self, frame_boxes: BoxList):
+        @return:
+        """
+        oldest_allowed_loss = self.__frame_count__ - self.__reid_memory__
+        while self.__lost_buckets__ and self.__lost_buckets__[0][0] < oldest_allowed_loss:
+            frame, uids = self.__lost_buckets__.popleft()
+            for uid in uids:
+                lost_track = self.__lost_tracks__.get(uid)
+                if lost_track is not None and lost_track[1] == frame:
+                    del self.__lost_tracks__[uid]
+
+    def __add_frame_bounding_boxes_to_tracks__(self, track_indexes: numpy.ndarray, bbox_indexes: numpy.ndarray):
         """
-        Takes a collection of bounding boxes and add new ones to the list of tracks.  Bounding boxes which correspond to
-        existing tracks are identified, and the appropriate tracks updated.
+        Takes the bounding boxes of the frame that has been started, and adds them to the tracks.  Bounding boxes which
+        have been matched to existing tracks update those tracks, and the other bounding boxes become new tracks.  Each
+        bounding box updates at most one track.
 
-        @param frame_boxes: A BoxList object which contains the items identified in this frame.
+        @param track_indexes:   A numpy.ndarray of int values, which are the indexes of the matched tracks.
+        @param bbox_indexes:    A numpy.ndarray of int values, which are the indexes of the bounding boxes matched to
+                                each of these tracks.
         @return:
         """
-        bbox_indexes_to_remove = list()
+        frame_boxes, frame_edges, tracks, motion_rows, appearances = self.__pending_frame__
+        if not self.__reidentify__:
+            appearances = None
+
+        sighted_uids = list()
+        for track_index, bbox_index in zip(track_indexes.tolist(), bbox_indexes.tolist()):
+            self.__update_track__(tracks[track_index], frame_boxes[bbox_index])
+            if appearances is not None:
+                tracks[track_index].update_appearance(appearances[bbox_index], Tracker.__appearance_update_rate__)
+            sighted_uids.append(tracks[track_index].get_uid())
+        if self.__motion_model__ is not None:
+            self.__motion_model__.update(motion_rows[track_indexes], tuple(edge[bbox_indexes] for edge in frame_edges))
+
+        if appearances is not None:
+            appearances = numpy.delete(appearances, bbox_indexes, axis=0)
+        self.__get_rid_of_boxes_that_are_now_updated_tracks__(frame_boxes, bbox_indexes.tolist())
+        if appearances is not None and self.__lost_tracks__:
+            found_uids, appearances = self.__reidentify_lost_tracks__(frame_boxes, appearances)
+            sighted_uids.extend(found_uids)
+        sighted_uids.extend(self.__add_remaining_boxes_as_new_tracks__(frame_boxes, appearances))
+        self.__last_seen_buckets__.append((self.__detection_count__, self.__frame_count__, sighted_uids))
+
+    def __reidentify_lost_tracks__(self, frame_boxes: BoxList, appearances: numpy.ndarray) -> (list, numpy.ndarray):
+        """
+        Compares the appearance of the bounding boxes which have not continued a current track with the appearance of
+        each lost track with the same label (or in the same group of labels).  Each box which looks enough like a lost
+        track brings that track back, with its old UID, and is removed from the given collection.
+
+        @param frame_boxes: A BoxList object which contains the bounding boxes that have not continued a current track.
+        @param appearances: A numpy.ndarray where each row is the appearance of one of these bounding boxes.
+        @return:            A tuple of a list of int values, which are the UIDs of the tracks that have been brought
+                            back, and a numpy.ndarray which is the appearances of the bounding boxes that are left.
+        """
+        lost_tracks = [lost_track for lost_track, _ in self.__lost_tracks__.values()]
+        lost_groups = self.__get_label_groups__(numpy.fromiter((track.get_box().label_id for track in lost_tracks),
+                                                               dtype=numpy.int64, count=len(lost_tracks)))
+        rows, cols = Assignment.get_pairs_in_same_group(lost_groups, self.__get_label_groups__(
+            frame_boxes.get_label_ids()))
+        lost_appearances = numpy.stack([track.get_appearance() for track in lost_tracks])
+        similarities = Appearance.get_paired_histogram_similarities(lost_appearances[rows], appearances[cols])
+        track_indexes, bbox_indexes = Assignment.get_greedy_pair_matches(rows, cols, similarities,
+                                                                         self.__reid_threshold__)
+
+        found_uids = list()
+        for track_index, bbox_index in zip(track_indexes.tolist(), bbox_indexes.tolist()):
+            found_track: Tracker.Track = lost_tracks[track_index]
+            found_box = frame_boxes[bbox_index]
+            uid = found_track.get_uid()
+            del self.__lost_tracks__[uid]
+
+            found_track.sighted(self.__get_bbox_with_best_label__(found_track.get_box(), found_box),
+                                self.__frame_count__)
+            found_track.update_appearance(appearances[bbox_index], Tracker.__appearance_update_rate__)
+            self.__tracks__[uid] = found_track
+            found_uids.append(uid)
+            self.__events__.append(TrackEvent(TrackEvent.REIDENTIFIED, uid, found_track.get_box(),
+                                              self.__frame_count__))
+            if found_track.get_frames_detected() >= self.__min_frames_for_track__:
+                self.__confirm_track__(found_track)
+
+        if self.__motion_model__ is not None and found_uids:
+            rows = self.__motion_model__.append(tuple(edge[bbox_indexes] for edge in frame_boxes.views()[:4]))
+            self.__motion_rows__.update(zip(found_uids, rows.tolist()))
+
+        self.__get_rid_of_boxes_that_are_now_updated_tracks__(frame_boxes, bbox_indexes.tolist())
+        return found_uids, numpy.delete(appearances, bbox_indexes, axis=0)
+
+    def __get_label_groups__(self, label_ids: numpy.ndarray) -> numpy.ndarray:
+        """
+        Converts label ids into the groups that are matched together.  Labels which have not been put into a group with
+        match_across_labels() are in a group of their own.
 
-        for track_index in range(len(self.__tracks__)):
-            for bbox_index in range(frame_boxes.size()):
-                if self.__update_track_if_box_overlaps__(track_index, frame_boxes[bbox_index]) \
-                        and not bbox_indexes_to_remove.__contains__(bbox_index):
-                    bbox_indexes_to_remove.append(bbox_index)
-        self.__get_rid_of_boxes_that_are_now_updated_tracks__(frame_boxes, bbox_indexes_to_remove)
-        self.__add_remaining_boxes_as_new_tracks__(frame_boxes)
+        @param label_ids:   A numpy.ndarray of int values, which are label ids.
+        @return:            A numpy.ndarray of int values, which are the group of each label id.
+        """
+        label_ids = numpy.asarray(label_ids, dtype=numpy.int64)
+        if not self.__label_groups__:
+            return label_ids
+        groups = self.__label_groups__
+        return numpy.fromiter((groups.get(label_id, label_id) for label_id in label_ids.tolist()),
+                              dtype=numpy.int64, count=len(label_ids))
+
+    @staticmethod
+    def __get_track_edge_arrays__(tracks: list) -> tuple:
+        """
+        Gathers the edges of the boxes of the given tracks into arrays, for use in the vectorised IoU function.
 
-    def __update_track_if_box_overlaps__(self, track_index: int, new_bbox: Box) -> bool:
+        @param tracks:  A list of Tracker.Track objects, which are the tracks to gather the edges of.
+        @return:        A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        boxes.
         """
-        Updates the given track if the given bounding box overlaps with it.
+        boxes = [track.get_box() for track in tracks]
+        return (numpy.fromiter((box.left_edge for box in boxes), dtype=numpy.float64, count=len(boxes)),
+                numpy.fromiter((box.right_edge for box in boxes), dtype=numpy.float64, count=len(boxes)),
+                numpy.fromiter((box.lower_edge for box in boxes), dtype=numpy.float64, count=len(boxes)),
+                numpy.fromiter((box.upper_edge for box in boxes), dtype=numpy.float64, count=len(boxes)))
 
-        @param track_index: An int which is the index of the track to update.
-        @param new_bbox:    A Box object which is the bounding box to check against the track.
-        @return:            A bool describing if the track was updated.
+    def __update_track__(self, existing_track: 'Tracker.Track', new_bbox: Box):
         """
-        existing_track: Tracker.Track = self.__tracks__[track_index]
-        current_frame = copy.deepcopy(self.__frame_count__)
-        iou_threshold = self.__min_iou_to_continue_track__
+        Updates the given track with the bounding box that has been matched to it.
 
-        iou = existing_track.get_box().get_iou(new_bbox)
-        if iou > iou_threshold:
-            self.__replace_bbox_label_if_conf_lower_than_existing_label__(existing_track.get_box(), new_bbox)
-            existing_track.sighted(new_bbox, current_frame)
-            return True
-        else:
-            return False
+        @param existing_track:  A Tracker.Track object which is the track to update.
+        @param new_bbox:        A Box object which is the bounding box matched to the track.
+        @return:
+        """
+        old_box = existing_track.get_box()
+        existing_track.sighted(self.__get_bbox_with_best_label__(old_box, new_bbox), self.__frame_count__)
+
+        frames_detected = existing_track.get_frames_detected()
+        if frames_detected == self.__min_frames_for_track__:
+            self.__confirm_track__(existing_track)
+        elif frames_detected > self.__min_frames_for_track__ and existing_track.get_box() != old_box:
+            uid = existing_track.get_uid()
+            self.__confirmed_tracks__[uid] = existing_track.get_box()
+            self.__current_tracks__ = None
+            self.__events__.append(TrackEvent(TrackEvent.UPDATED, uid, existing_track.get_box(), self.__frame_count__))
+
+    def __confirm_track__(self, track: 'Tracker.Track'):
+        """
+        Adds a track which has now been seen for enough frames to the confirmed tracks.
+
+        @param track:   A Tracker.Track object which is the track to confirm.
+        @return:
+        """
+        self.__confirmed_tracks__[track.get_uid()] = track.get_box()
+        self.__current_tracks__ = None
+        self.__events__.append(TrackEvent(TrackEvent.CONFIRMED, track.get_uid(), track.get_box(), self.__frame_count__))
 
     @classmethod
-    def __replace_bbox_label_if_conf_lower_than_existing_label__(cls, tracked_bbox: Box, new_bbox: Box):
+    def __get_bbox_with_best_label__(cls, tracked_bbox: Box, new_bbox: Box) -> Box:
         """
-        Compares the labels between two boxes, and replaces the label of the new box if the confidence value for the
-        tracked box is higher.  This should mean that each track is always labeled with the highest confidence value.
+        Compares the labels between two boxes, and gives the new box the label of the tracked box if the confidence
+        value for the tracked box is higher.  This should mean that each track is always labeled with the highest
+        confidence value.  The given boxes are not changed, as they may be CompactBox objects, or belong to the caller.
 
         @param tracked_bbox:    A Box object which is the box of the existing track.
         @param new_bbox:        A Box object which is the new bounding box.
-        @return:
+        @return:                A Box object with the edges of the new box, and the label and confidence of whichever
+                                box has the higher confidence.
         """
         if tracked_bbox.confidence > new_bbox.confidence:
-            new_bbox.confidence = tracked_bbox.confidence
-            new_bbox.label = tracked_bbox.label
+            return CompactBox(new_bbox.left_edge, new_bbox.right_edge, new_bbox.lower_edge, new_bbox.upper_edge,
+                              tracked_bbox.confidence, tracked_bbox.label)
+        return new_bbox
 
     @classmethod
     def __get_rid_of_boxes_that_are_now_updated_tracks__(cls, boxes: BoxList, indexes: list):
@@ -125,18 +520,31 @@ class Tracker:
         """
         safe_rm(boxes, indexes)
 
-    def __add_remaining_boxes_as_new_tracks__(self, frame_boxes: BoxList):
+    def __add_remaining_boxes_as_new_tracks__(self, frame_boxes: BoxList, appearances: numpy.ndarray | None) -> list:
         """
-        Adds the given bounding boxes to the list of current tracks.
+        Adds the given bounding boxes to the current tracks.
 
         @param frame_boxes: A BoxList object, which contains the boxes to add as new tracks.
-        @return:
+        @param appearances: A numpy.ndarray where each row is the appearance of one of the boxes, or None.
+        @return:            A list of int values, which are the UIDs of the new tracks.
         """
-        current_frame = copy.deepcopy(self.__frame_count__)
+        current_frame = self.__frame_count__
+        new_uids = list()
         for remaining_bbox in frame_boxes:
-            new_track = Tracker.Track(remaining_bbox, current_frame, self.__next_track_uid__)
-            self.__tracks__.append(new_track)
+            uid = self.__next_track_uid__
+            new_track = Tracker.Track(remaining_bbox, current_frame, uid, self.__history_depth__)
+            if appearances is not None:
+                new_track.update_appearance(appearances[len(new_uids)], 1.0)
+            self.__tracks__[uid] = new_track
+            new_uids.append(uid)
             self.__next_track_uid__ += 1
+            self.__events__.append(TrackEvent(TrackEvent.BORN, uid, new_track.get_box(), current_frame))
+            if new_track.get_frames_detected() >= self.__min_frames_for_track__:
+                self.__confirm_track__(new_track)
+        if self.__motion_model__ is not None:
+            rows = self.__motion_model__.append(frame_boxes.views()[:4])
+            self.__motion_rows__.update(zip(new_uids, rows.tolist()))
+        return new_uids
 
     def get_current_tracks(self) -> (BoxList, list):
         """
@@ -144,47 +552,226 @@ class Tracker:
         and will not return tracks that have only been seen for fewer than a given number of frames.  Both of these
         thresholds are set in the class constructor.
 
+        The result is only rebuilt when the confirmed tracks have changed, and the returned BoxList is a snapshot of
+        the stored one, so calling this in a frame where nothing has changed is cheap.  The tracks store their boxes as
+        CompactBox objects, which cannot be changed, so the returned boxes are shared with the tracks rather than
+        copied.
+
         @return:    A tuple containing a BoxList, and a list of int values.  These are the currently
                     tracked bounding boxes, and the unique tracking ID numbers for the corresponding tracks.
         """
-        active_tracks = BoxList()
-        track_uids = list()
-        for index in range(len(self.__tracks__)):
-            track: Tracker.Track = self.__tracks__[index]
-            if track.get_frames_detected() >= self.__min_frames_for_track__:
-                active_tracks.add(track.get_box())
-                track_uids.append(track.get_uid())
-        return copy.deepcopy(active_tracks), copy.deepcopy(track_uids)
+        if self.__current_tracks__ is None:
+            track_uids = sorted(self.__confirmed_tracks__)
+            active_tracks = BoxList()
+            for uid in track_uids:
+                active_tracks.add(self.__confirmed_tracks__[uid])
+            self.__current_tracks__ = (active_tracks, track_uids)
+
+        active_tracks, track_uids = self.__current_tracks__
+        return active_tracks.snapshot(), list(track_uids)
+
+    def get_confirmed_tracks(self) -> MappingProxyType:
+        """
+        A getter for a live, read-only view of the confirmed tracks (the tracks which get_current_tracks() returns).
+        The view is kept up to date by the Tracker as tracks change, rather than being rebuilt each frame.
+
+        @return: A read-only mapping from the UID of each confirmed track to its bounding box, as a CompactBox object.
+        """
+        return MappingProxyType(self.__confirmed_tracks__)
+
+    def get_track_history(self, uid: int) -> TrackHistory | None:
+        """
+        A getter for the recent sightings of a track, which can be used to find a smoothed box, the speed of the item,
+        or how long it has stayed in one place.
+
+        @param uid: An int which is the UID of the track.
+        @return:    A TrackHistory object, which is a copy of the history of the track.  None if there is no current
+                    track with this UID, or if the tracker does not keep a history.
+        """
+        track = self.__tracks__.get(uid)
+        if track is None or track.get_history() is None:
+            return None
+        return track.get_history().copy()
+
+    def get_state(self) -> dict:
+        """
+        Gathers the state of the tracker (its tracks, frame count and next UID, and any label groups) into a dict of
+        numpy arrays, which can be saved with numpy.savez() and later restored with set_state().  Labels are stored as
+        str values, as label ids are only meaningful within one run of the program.  The settings given to the
+        constructor are not included.
+
+        @return: A dict where each key is a str, and each value is a numpy.ndarray.
+        """
+        if self.__pending_frame__ is not None:
+            raise ValueError("The state cannot be saved while a frame is being added.")
+
+        tracks = list(self.__tracks__.values())
+        boxes = [track.get_box() for track in tracks]
+        registry = get_label_registry()
+        detection_of_frame = {frame: detection for detection, frame, _ in self.__last_seen_buckets__}
+        state = {"counters": numpy.array([self.__frame_count__, self.__next_track_uid__, self.__detection_count__],
+                                         dtype=numpy.int64),
+                 "uids": numpy.fromiter((track.get_uid() for track in tracks), dtype=numpy.int64, count=len(tracks)),
+                 "last_seen": numpy.fromiter((track.get_last_seen() for track in tracks), dtype=numpy.int64,
+                                             count=len(tracks)),
+                 "last_detection": numpy.fromiter((detection_of_frame[track.get_last_seen()] for track in tracks),
+                                                  dtype=numpy.int64, count=len(tracks)),
+                 "frames_detected": numpy.fromiter((track.get_frames_detected() for track in tracks),
+                                                   dtype=numpy.int64, count=len(tracks)),
+                 "boxes": numpy.array([(box.left_edge, box.right_edge, box.lower_edge, box.upper_edge, box.confidence)
+                                       for box in boxes], dtype=numpy.float64).reshape(-1, 5),
+                 "labels": numpy.array([box.label for box in boxes], dtype=str),
+                 "group_labels": numpy.array([registry.get_label(label_id) for label_id in self.__label_groups__],
+                                             dtype=str),
+                 "group_keys": numpy.array([registry.get_label(group_key)
+                                            for group_key in self.__label_groups__.values()], dtype=str)}
+
+        if self.__motion_model__ is not None:
+            state["motion"] = self.__motion_model__.get_state([self.__motion_rows__[track.get_uid()]
+                                                               for track in tracks])
+        if self.__history_depth__ > 0:
+            histories = [track.get_history() for track in tracks]
+            state["history_lengths"] = numpy.fromiter((len(history) for history in histories), dtype=numpy.int64,
+                                                      count=len(histories))
+            state["history_samples"] = numpy.concatenate([history.get_samples() for history in histories]) \
+                if histories else numpy.empty((0, 6))
+        return state
+
+    def set_state(self, state: dict):
+        """
+        Replaces the state of the tracker with a state returned by get_state(), such as one loaded from a checkpoint.
+        The tracker should have been created with the same settings as the one that was saved.  No track events are
+        reported for the restored tracks.
+
+        @param state:   A dict (or other mapping, such as the result of numpy.load()) of the arrays returned by
+                        get_state().
+        @return:
+        """
+        registry = get_label_registry()
+        counters = state["counters"].tolist()
+        frame_count, next_uid = counters[:2]
+        detection_count = counters[2] if len(counters) > 2 else frame_count
+        uids = state["uids"].tolist()
+        last_seen = state["last_seen"].tolist()
+        last_detection = state["last_detection"].tolist() if "last_detection" in state else last_seen
+        frames_detected = state["frames_detected"].tolist()
+        boxes = [CompactBox(*fields, label) for fields, label in zip(state["boxes"].tolist(), state["labels"].tolist())]
+
+        histories = [None] * len(uids)
+        if self.__history_depth__ > 0 and "history_samples" in state:
+            history_offsets = numpy.cumsum(numpy.concatenate(([0], state["history_lengths"])))
+            samples = state["history_samples"]
+            histories = [TrackHistory.from_samples(samples[history_offsets[i]:history_offsets[i + 1]],
+                                                   self.__history_depth__) for i in range(len(uids))]
+        elif self.__history_depth__ > 0:
+            histories = [TrackHistory(self.__history_depth__) for _ in uids]
+
+        self.__frame_count__ = frame_count
+        self.__detection_count__ = detection_count
+        self.__next_track_uid__ = next_uid
+        self.__tracks__ = {uid: Tracker.Track.from_state(box, uid, seen, detected, history)
+                           for uid, box, seen, detected, history in zip(uids, boxes, last_seen, frames_detected,
+                                                                        histories)}
+        self.__label_groups__ = {registry.get_id(label): registry.get_id(key)
+                                 for label, key in zip(state["group_labels"].tolist(), state["group_keys"].tolist())}
+
+        buckets = dict()
+        for uid, seen, detection in zip(uids, last_seen, last_detection):
+            buckets.setdefault((detection, seen), list()).append(uid)
+        self.__last_seen_buckets__ = deque((detection, seen, bucket_uids)
+                                           for (detection, seen), bucket_uids in sorted(buckets.items()))
+
+        self.__confirmed_tracks__ = {uid: track.get_box() for uid, track in self.__tracks__.items()
+                                     if track.get_frames_detected() >= self.__min_frames_for_track__}
+        self.__current_tracks__ = None
+        self.__events__ = list()
+        self.__pending_frame__ = None
+        self.__lost_tracks__ = dict()
+        self.__lost_buckets__ = deque()
+
+        if self.__motion_model__ is not None:
+            self.__motion_model__ = KalmanFilter()
+            if "motion" in state:
+                rows = self.__motion_model__.append_state(state["motion"])
+            else:
+                rows = self.__motion_model__.append(self.__get_track_edge_arrays__(list(self.__tracks__.values())))
+            self.__motion_rows__ = dict(zip(uids, rows.tolist()))
+
+    def get_track_events(self) -> list:
+        """
+        A getter for the changes made to the tracks by the most recent call to add_new_frame().  In a frame where
+        nothing has changed, this is an empty list.
+
+        @return: A list of TrackEvent objects, in the order the changes were made.
+        """
+        return list(self.__events__)
 
     class Track:
         """
         A child class to hold the details for each individual track.  This helps make the parent class less cluttered.
         """
 
-        def __init__(self, box: Box, frame_last_seen: int, uid: int):
+        def __init__(self, box: Box, frame_last_seen: int, uid: int, history_depth: int = 0):
             """
             The constructor.
 
-            @param box:             A Box object, which is the bounding box of the track.
+            @param box:             A Box object, which is the bounding box of the track.  It is stored as a CompactBox.
             @param frame_last_seen: An int, which is the frame number the tracked item was last seen on.
             @param uid:             A unique identification number for this track.
+            @param history_depth:   An int, which is the number of recent sightings to remember.  If 0, no history is
+                                    kept.
             """
-            self.__box__: Box = box
+            self.__box__: CompactBox = CompactBox.from_box(box)
             self.__last_seen__: int = frame_last_seen
             self.__detected_for__: int = 1
             self.__uid__: int = uid
+            self.__history__: TrackHistory | None = TrackHistory(history_depth) if history_depth > 0 else None
+            self.__appearance__: numpy.ndarray | None = None
+            if self.__history__ is not None:
+                self.__history__.append(frame_last_seen, self.__box__)
+
+        @classmethod
+        def from_state(cls, box: Box, uid: int, frame_last_seen: int, frames_detected: int,
+                       history: TrackHistory | None) -> 'Tracker.Track':
+            """
+            A constructor function which recreates a track that has been saved.
+
+            @param box:             A Box object, which is the bounding box of the track.
+            @param uid:             An int, which is the unique identification number of the track.
+            @param frame_last_seen: An int, which is the frame number the tracked item was last seen on.
+            @param frames_detected: An int, which is the number of frames the item has been detected in.
+            @param history:         A TrackHistory object which is the recent sightings of the track, or None if the
+                                    track does not keep a history.
+            @return:                A Tracker.Track object with the given details.
+            """
+            track = cls(box, frame_last_seen, uid)
+            track.__detected_for__ = frames_detected
+            track.__history__ = history
+            return track
 
         def sighted(self, box: Box, frame: int):
             """
             Updates the track when the tracked item is sighted.
 
-            @param box:     A Box object, which is the new bounding box to assign to the track.
+            @param box:     A Box object, which is the new bounding box to assign to the track.  It is stored as a
+                            CompactBox.
             @param frame:   An int, which is the frame number that the tracked item has been sighted in.
             @return:
             """
-            self.__box__ = box
+            self.__box__ = CompactBox.from_box(box)
             self.__last_seen__ = frame
             self.__detected_for__ += 1
+            if self.__history__ is not None:
+                self.__history__.append(frame, self.__box__)
+
+        def propagated(self, box: Box):
+            """
+            Moves the track to where the tracked item is expected to be, in a frame where it has not been sighted.
+
+            @param box:     A Box object, which is the expected bounding box of the item.  It is stored as a CompactBox.
+            @return:
+            """
+            self.__box__ = CompactBox.from_box(box)
 
         def get_last_seen(self) -> int:
             """
@@ -194,11 +781,11 @@ class Tracker:
             """
             return self.__last_seen__
 
-        def get_box(self) -> Box:
+        def get_box(self) -> CompactBox:
             """
             A getter for the bounding box associated with this track.
 
-            @return: A Box object, which is the bounding box for the tracked item.
+            @return: A CompactBox object, which is the bounding box for the tracked item.
             """
             return self.__box__
 
@@ -210,6 +797,36 @@ class Tracker:
             """
             return self.__detected_for__
 
+        def get_history(self) -> TrackHistory | None:
+            """
+            A getter for the recent sightings of this track.
+
+            @return: A TrackHistory object, or None if this track does not keep a history.
+            """
+            return self.__history__
+
+        def update_appearance(self, appearance: numpy.ndarray, rate: float):
+            """
+            Blends a new sighting of the item into the appearance of the track.  The first sighting is used as it is.
+
+            @param appearance:  A numpy.ndarray which is the appearance of the item in the new sighting.
+            @param rate:        A float which is how much the new sighting changes the appearance, from 0.0 (not at
+                                all) to 1.0 (replaces it).
+            @return:
+            """
+            if self.__appearance__ is None:
+                self.__appearance__ = numpy.array(appearance, dtype=numpy.float64)
+            else:
+                self.__appearance__ = (1.0 - rate) * self.__appearance__ + rate * appearance
+
+        def get_appearance(self) -> numpy.ndarray | None:
+            """
+            A getter for the appearance of the tracked item, which is used to recognise it if it is lost.
+
+            @return: A numpy.ndarray which is the appearance of the item, or None if no appearance has been given.
+            """
+            return self.__appearance__
+
         def get_uid(self) -> int:
             """
             A getter for the unique identification number (UID) of this track.
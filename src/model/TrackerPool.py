@@ -0,0 +1,167 @@
+import numpy
+
+from model.Tracker import Tracker
+
+
+class TrackerPool:
+    """
+    A class to track the items seen by several cameras at once, in one process.  Each camera (or other stream of
+    frames) has its own Tracker, known by a stream id, and the tracks of different streams are kept completely separate.
+
+    Each call to add_new_frames() steps every given stream by one frame.  Rather than matching each stream on its own,
+    the tracks and bounding boxes of all the streams are gathered together, with the stream and the label group of each
+    one combined into a single group.  The matching is then done for every stream with one vectorised IoU pass and one
+    assignment call, so the fixed cost of each step is shared between the streams.
+    """
+    # The label group of each track or box is combined with the number of its stream, so that it can only match tracks
+    # and boxes from the same stream.  Label groups are label ids, which are far smaller than this.
+    __stream_group_stride__: int = 2 ** 32
+
+    def __init__(self, iou_threshold=0.9, assignment="greedy", **tracker_settings):
+        """
+        The constructor.  Initialises the pool with no streams.
+
+        @param iou_threshold:       A float which is the minimum value for the Intersection over Union value to
+                                    identify two bounding boxes as being from the same item.  This is shared by every
+                                    stream.
+        @param assignment:          A str which is the method used to match each bounding box to at most one track.
+                                    Either "greedy" or "hungarian".  This is shared by every stream.
+        @param tracker_settings:    Any other settings for the Tracker constructor (such as min_frames or
+                                    allowed_absence), which are used for the Tracker of every stream.
+        """
+        # Creating a Tracker checks the settings, so mistakes are found now rather than when the first stream is added.
+        Tracker(iou_threshold=iou_threshold, assignment=assignment, **tracker_settings)
+
+        self.__iou_threshold__: float = iou_threshold
+        self.__assignment__: str = assignment
+        self.__tracker_settings__: dict = dict(tracker_settings)
+        self.__trackers__: dict = dict()
+
+    def add_stream(self, stream_id) -> Tracker:
+        """
+        Adds a new stream to the pool, with its own Tracker.
+
+        @param stream_id:   A hashable value (such as a str or an int) which identifies the stream.
+        @return:            The Tracker object for the new stream, which can be used to set up the stream (for example
+                            with Tracker.match_across_labels()) and to get its tracks.
+        """
+        if stream_id in self.__trackers__:
+            raise ValueError("The stream " + str(stream_id) + " is already in the pool.")
+
+        tracker = Tracker(iou_threshold=self.__iou_threshold__, assignment=self.__assignment__,
+                          **self.__tracker_settings__)
+        self.__trackers__[stream_id] = tracker
+        return tracker
+
+    def remove_stream(self, stream_id):
+        """
+        Removes a stream, and all its tracks, from the pool.
+
+        @param stream_id:   The id of the stream to remove.
+        @return:
+        """
+        del self.__trackers__[stream_id]
+
+    def get_tracker(self, stream_id) -> Tracker:
+        """
+        A getter for the Tracker of one stream.
+
+        @param stream_id:   The id of the stream.
+        @return:            The Tracker object for the stream.
+        """
+        return self.__trackers__[stream_id]
+
+    def get_stream_ids(self) -> list:
+        """
+        A getter for the ids of the streams in the pool.
+
+        @return: A list of the stream ids, in the order the streams were added.
+        """
+        return list(self.__trackers__)
+
+    def __len__(self) -> int:
+        """
+        An override of the len function.
+
+        @return: An int which is the number of streams in the pool.
+        """
+        return len(self.__trackers__)
+
+    def __contains__(self, stream_id) -> bool:
+        """
+        An override of the in operator.
+
+        @param stream_id:   The id of a stream.
+        @return:            A bool which is True if the stream is in the pool.
+        """
+        return stream_id in self.__trackers__
+
+    def add_new_frames(self, frames: dict, appearances: dict | None = None):
+        """
+        Adds a new frame to each of the given streams, in one step.  This has the same effect as calling
+        Tracker.add_new_frame() for each stream, but the matching for all the streams is done together.  Streams which
+        are not given are not changed.
+
+        @param frames:      A dict where each key is a stream id, and each value is a BoxList object which is the
+                            bounding boxes for the items in the new frame of that stream.
+        @param appearances: A dict where each key is a stream id, and each value is a numpy.ndarray where each row is
+                            the appearance of one bounding box of that stream (see Tracker.add_new_frame()), or None.
+                            Streams which are not in the dict have no appearances for this frame.
+        @return:
+        """
+        appearances = appearances if appearances is not None else dict()
+        unknown_streams = [stream_id for stream_id in list(frames) + list(appearances)
+                           if stream_id not in self.__trackers__]
+        if unknown_streams:
+            raise KeyError("These streams are not in the pool: " + ", ".join(str(key) for key in unknown_streams))
+        if not frames:
+            return
+
+        trackers = [self.__trackers__[stream_id] for stream_id in frames]
+        # Every stream is checked before any is started, so a bad frame for one stream cannot leave the others with a
+        # frame that has been started but never finished.
+        for tracker, (stream_id, frame_boxes) in zip(trackers, frames.items()):
+            tracker.check_new_frame(frame_boxes, appearances.get(stream_id))
+        prepared = [tracker.start_frame(frame_boxes, appearances.get(stream_id))
+                    for tracker, (stream_id, frame_boxes) in zip(trackers, frames.items())]
+
+        track_edges = tuple(numpy.concatenate([inputs[0][edge] for inputs in prepared]) for edge in range(4))
+        frame_edges = tuple(numpy.concatenate([inputs[2][edge] for inputs in prepared]) for edge in range(4))
+        track_groups = self.__get_stream_groups__([inputs[1] for inputs in prepared])
+        frame_groups = self.__get_stream_groups__([inputs[3] for inputs in prepared])
+
+        track_indexes, bbox_indexes = Tracker.get_matches_within_groups(track_edges, track_groups, frame_edges,
+                                                                        frame_groups, self.__iou_threshold__,
+                                                                        self.__assignment__)
+
+        # The matches are in track order, so the matches of each stream are one slice of them.
+        track_offsets = numpy.cumsum([0] + [len(inputs[1]) for inputs in prepared])
+        frame_offsets = numpy.cumsum([0] + [len(inputs[3]) for inputs in prepared])
+        match_offsets = numpy.searchsorted(track_indexes, track_offsets)
+        for stream in range(len(trackers)):
+            matches = slice(match_offsets[stream], match_offsets[stream + 1])
+            trackers[stream].finish_frame(track_indexes[matches] - track_offsets[stream],
+                                          bbox_indexes[matches] - frame_offsets[stream])
+
+    def get_current_tracks(self) -> dict:
+        """
+        A getter for the currently tracked items of every stream.  See Tracker.get_current_tracks().
+
+        @return: A dict where each key is a stream id, and each value is a tuple containing a BoxList and a list of int
+                 values, which are the tracked bounding boxes and the track UIDs of that stream.
+        """
+        return {stream_id: tracker.get_current_tracks() for stream_id, tracker in self.__trackers__.items()}
+
+    @staticmethod
+    def __get_stream_groups__(groups: list) -> numpy.ndarray:
+        """
+        Combines the label groups of each stream into one array, with the number of the stream added to each group, so
+        that groups from different streams are never the same.
+
+        @param groups:  A list of numpy.ndarray objects of int values, which are the label groups of each stream.
+        @return:        A numpy.ndarray of int values, which are the combined groups of every stream, end to end.
+        """
+        stream_numbers = numpy.repeat(numpy.arange(len(groups), dtype=numpy.int64),
+                                      [len(stream_groups) for stream_groups in groups])
+        all_groups = numpy.concatenate([numpy.asarray(stream_groups, dtype=numpy.int64) for stream_groups in groups])
+        return stream_numbers * TrackerPool.__stream_group_stride__ + all_groups
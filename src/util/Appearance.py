@@ -0,0 +1,73 @@
+import numpy
+
+# OpenCV stores the hue of an 8-bit HSV image as 0 to 179, and the saturation and value as 0 to 255.
+__channel_ranges__: tuple = (180, 256, 256)
+
+
+def get_hsv_histograms(hsv_image: numpy.ndarray, edges: tuple, bins: tuple = (8, 4, 4),
+                       max_samples: int = 32) -> numpy.ndarray:
+    """
+    Calculates a colour histogram of the part of an image inside each of a series of boxes, for use as a cheap
+    signature of what the item in each box looks like.  The bin of every pixel is found once for the whole image, and
+    the pixels of each box are then counted with a single numpy.bincount() call.  Large boxes are sampled on a grid of
+    at most max_samples by max_samples pixels, so every box costs about the same.
+
+    @param hsv_image:   A numpy.ndarray of shape (H, W, 3), which is an 8-bit image in OpenCV's HSV format.
+    @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        N boxes, as decimals of the width and height of the image.  The lower edge is the top of the box
+                        in the image, as in the results of the object detection model.
+    @param bins:        A tuple of three int values, which are the number of hue, saturation and value bins.
+    @param max_samples: An int which is the largest number of pixels sampled across the width or height of a box.
+    @return:            A numpy.ndarray of shape (N, B), where B is the total number of bins, and each row is the
+                        histogram of one box, normalised to add up to 1.  Boxes with no pixels have a row of zeros.
+    """
+    hue_bins, saturation_bins, value_bins = bins
+    image = numpy.asarray(hsv_image)
+    bin_image = (image[..., 0].astype(numpy.intp) * hue_bins // __channel_ranges__[0]) * saturation_bins
+    bin_image = (bin_image + image[..., 1].astype(numpy.intp) * saturation_bins // __channel_ranges__[1]) * value_bins
+    bin_image = bin_image + image[..., 2].astype(numpy.intp) * value_bins // __channel_ranges__[2]
+
+    height, width = bin_image.shape
+    left, right, lower, upper = (numpy.asarray(edge, dtype=numpy.float64) for edge in edges)
+    x_min = numpy.clip(numpy.floor(left * width), 0, width).astype(numpy.intp)
+    x_max = numpy.clip(numpy.ceil(right * width), 0, width).astype(numpy.intp)
+    y_min = numpy.clip(numpy.floor(lower * height), 0, height).astype(numpy.intp)
+    y_max = numpy.clip(numpy.ceil(upper * height), 0, height).astype(numpy.intp)
+    x_steps = numpy.maximum((x_max - x_min) // max_samples, 1)
+    y_steps = numpy.maximum((y_max - y_min) // max_samples, 1)
+
+    bin_count = hue_bins * saturation_bins * value_bins
+    histograms = numpy.zeros((len(left), bin_count), dtype=numpy.float64)
+    for box in range(len(left)):
+        crop = bin_image[y_min[box]:y_max[box]:y_steps[box], x_min[box]:x_max[box]:x_steps[box]]
+        histograms[box] = numpy.bincount(crop.ravel(), minlength=bin_count)
+
+    totals = histograms.sum(axis=1, keepdims=True)
+    numpy.divide(histograms, totals, out=histograms, where=totals > 0)
+    return histograms
+
+
+def get_histogram_similarities(histograms: numpy.ndarray, other_histograms: numpy.ndarray) -> numpy.ndarray:
+    """
+    Calculates how similar every histogram in one series is to every histogram in another series, using the
+    Bhattacharyya coefficient.  This is 1.0 for identical histograms and 0.0 for histograms with no colours in common.
+
+    @param histograms:          A numpy.ndarray of shape (N, B), where each row is a normalised histogram.
+    @param other_histograms:    A numpy.ndarray of shape (M, B), where each row is a normalised histogram.
+    @return:                    A numpy.ndarray of shape (N, M), where element [i, j] is the similarity of histogram i
+                                with histogram j.
+    """
+    return numpy.sqrt(histograms) @ numpy.sqrt(other_histograms).T
+
+
+def get_paired_histogram_similarities(histograms: numpy.ndarray, other_histograms: numpy.ndarray) -> numpy.ndarray:
+    """
+    Calculates how similar each histogram in one series is to the histogram at the same position in another series,
+    using the Bhattacharyya coefficient.
+
+    @param histograms:          A numpy.ndarray of shape (N, B), where each row is a normalised histogram.
+    @param other_histograms:    A numpy.ndarray of shape (N, B), where each row is a normalised histogram.
+    @return:                    A numpy.ndarray of N float values, where element i is the similarity of histogram i of
+                                the first series with histogram i of the second series.
+    """
+    return numpy.sqrt(histograms * other_histograms).sum(axis=1)
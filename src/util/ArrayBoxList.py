@@ -0,0 +1,467 @@
+import numpy
+
+from util.Box import Box
+from util.BoxList import BoxList
+from util.LabelRegistry import get_label_registry
+
+__label_registry__ = get_label_registry()
+
+
+class ArrayBoxList(BoxList):
+    """
+    An alternative form of the BoxList class, which stores the box data as contiguous arrays (one per field) rather than
+    as a list of Box objects.  The labels are stored as an array of int label ids from the shared LabelRegistry.  This
+    allows the area, overlap and IoU calculations to be run for a whole frame at once.
+
+    Box objects are only created when a box is retrieved from the collection, and are then kept so that the same object
+    is returned each time.  Note that changing the fields of a Box after it has been added to the collection will not
+    update the stored arrays.  Use the __setitem__() function to replace a box instead.
+    """
+    def __init__(self, capacity: int = 16):
+        """
+        The constructor.  Initialises the object with an empty collection.
+
+        @param capacity:    An int which is the number of boxes to allocate space for.  The arrays grow as required.
+        """
+        super().__init__()
+        self.__size__: int = 0
+        self.__left__: numpy.ndarray = numpy.empty(capacity, dtype=numpy.float64)
+        self.__right__: numpy.ndarray = numpy.empty(capacity, dtype=numpy.float64)
+        self.__lower__: numpy.ndarray = numpy.empty(capacity, dtype=numpy.float64)
+        self.__upper__: numpy.ndarray = numpy.empty(capacity, dtype=numpy.float64)
+        self.__confidence__: numpy.ndarray = numpy.empty(capacity, dtype=numpy.float64)
+        self.__label_ids__: numpy.ndarray = numpy.empty(capacity, dtype=numpy.int32)
+        self.__box_cache__: numpy.ndarray = numpy.full(capacity, None, dtype=object)
+        self.__owns_arrays__: bool = True
+
+    @classmethod
+    def from_arrays(cls, boxes, scores, labels) -> 'ArrayBoxList':
+        """
+        A constructor function which wraps the arrays returned by the object detection model, without creating a Box for
+        each detection.  Where possible the given arrays are not copied.  They are only copied (once) if the collection
+        is later changed, so the given arrays are never altered.
+
+        @param boxes:   A numpy.ndarray of shape (N, 4), where each row is the lower, left, upper and right edges of a
+                        box.  This is the order used by the TensorFlowHub models.
+        @param scores:  A numpy.ndarray of N float values, which are the detection confidences of the boxes.
+        @param labels:  A sequence of N str (or bytestring) values, which are the labels of the boxes.  Each different
+                        label is only decoded once.
+        @return:        An ArrayBoxList object which holds the given boxes.
+        """
+        boxes = numpy.asarray(boxes).reshape(-1, 4)
+        label_ids = numpy.fromiter((__label_registry__.get_id(label) for label in labels),
+                                   dtype=numpy.int32, count=len(boxes))
+
+        return cls.from_columns(left=boxes[:, 1], right=boxes[:, 3], lower=boxes[:, 0], upper=boxes[:, 2],
+                                confidence=numpy.asarray(scores).reshape(-1), label_ids=label_ids)
+
+    @classmethod
+    def from_columns(cls, left, right, lower, upper, confidence, label_ids) -> 'ArrayBoxList':
+        """
+        A constructor function which wraps one array per field, without creating a Box for each row.  As with the
+        from_arrays() function, the given arrays are not copied unless the collection is later changed.
+
+        @param left:        A numpy.ndarray of N float values, which are the left edges of the boxes.
+        @param right:       A numpy.ndarray of N float values, which are the right edges of the boxes.
+        @param lower:       A numpy.ndarray of N float values, which are the lower edges of the boxes.
+        @param upper:       A numpy.ndarray of N float values, which are the upper edges of the boxes.
+        @param confidence:  A numpy.ndarray of N float values, which are the detection confidences of the boxes.
+        @param label_ids:   A numpy.ndarray of N int values, which are the label ids (from the shared LabelRegistry) of
+                            the boxes.
+        @return:            An ArrayBoxList object which holds the given boxes.
+        """
+        box_collection = cls(capacity=0)
+        n = len(left)
+
+        box_collection.__size__ = n
+        box_collection.__left__ = left
+        box_collection.__right__ = right
+        box_collection.__lower__ = lower
+        box_collection.__upper__ = upper
+        box_collection.__confidence__ = confidence
+        box_collection.__label_ids__ = label_ids
+        box_collection.__box_cache__ = numpy.full(n, None, dtype=object)
+        box_collection.__owns_arrays__ = False
+
+        return box_collection
+
+    def add(self, box: Box):
+        """
+        Add a box to the collection.
+
+        @param box: A Box object to add to the collection.
+        @return:
+        """
+        if not self.__owns_arrays__ or self.__size__ == len(self.__left__):
+            self.__grow__(max(2 * self.__size__, 16))
+
+        self.__write_row__(self.__size__, box)
+        self.__size__ += 1
+
+    def get(self, index: int) -> Box | None:
+        """
+        A getter for the box at the given index.  Returns None if the index is invalid for any reason.
+
+        @param index:   An int which is the index of the box to return.
+        @return:        A Box object, which is the box at the given index.
+        """
+        if index < 0 or index >= self.__size__:
+            return None
+
+        return self.__get_box__(index)
+
+    def sort_by_confidence(self):
+        """
+        Sorts the collection in descending order of detection confidence.
+
+        @return:
+        """
+        self.__keep_rows__(numpy.argsort(-self.__confidence__[:self.__size__], kind="stable"))
+
+    def trim_by_confidence(self, min_confidence: float):
+        """
+        Removes all the boxes in the collection that have a detection confidence below the given minimum.
+
+        @param min_confidence:  A float which is the minimum confidence level to keep.
+        @return:
+        """
+        self.keep_mask(self.__confidence__[:self.__size__] >= min_confidence)
+
+    def trim_by_label(self, allowed_labels=None, denied_labels=None):
+        """
+        Removes all the boxes in the collection whose labels are not allowed.  The labels are only compared as ids.
+
+        @param allowed_labels:  A collection of str values which are the only labels to keep.  If None, all labels are
+                                allowed.
+        @param denied_labels:   A collection of str values which are labels to remove.  If None, no labels are removed.
+        @return:
+        """
+        label_ids = self.__label_ids__[:self.__size__]
+        mask = numpy.ones(self.__size__, dtype=bool)
+
+        if allowed_labels is not None:
+            mask &= numpy.isin(label_ids, self.__get_label_ids_for__(allowed_labels))
+        if denied_labels is not None:
+            mask &= ~numpy.isin(label_ids, self.__get_label_ids_for__(denied_labels))
+
+        self.keep_mask(mask)
+
+    def filter(self, predicate):
+        """
+        Removes all the boxes in the collection for which the given function does not return True.  Note that this
+        needs a Box object for every row, so the trim_by...() functions or keep_mask() should be preferred.
+
+        @param predicate:   A function which takes a Box object and returns a bool, which is True if the box should be
+                            kept.
+        @return:
+        """
+        self.keep_mask(numpy.fromiter((predicate(self.__get_box__(i)) for i in range(self.__size__)),
+                                      dtype=bool, count=self.__size__))
+
+    def keep_mask(self, mask):
+        """
+        Removes all the boxes in the collection whose entry in the given mask is False.  The rows are removed in one
+        vectorised pass.
+
+        @param mask:    A sequence (such as a numpy.ndarray) of bool values, with one value for each box in the
+                        collection.  Boxes are kept where the value is True.
+        @return:
+        """
+        mask = numpy.asarray(mask, dtype=bool)
+        if len(mask) != self.__size__:
+            raise ValueError("The mask must have one value for each box in the collection.")
+
+        if not mask.all():
+            self.__keep_rows__(numpy.flatnonzero(mask))
+
+    def size(self):
+        """
+        A getter for the size (number of boxes contained) in this collection.
+
+        @return: An int which is the number of boxes contained.
+        """
+        return self.__size__
+
+    def contains(self, box: Box) -> bool:
+        """
+        Checks if a given box is present in the collection.
+
+        @param box: A Box object which is the box to search for in the collection.
+        @return:    A bool which states whether or not the given box was found in the collection.
+        """
+        return self.__find__(box) is not None
+
+    def pop(self, index: int) -> Box:
+        """
+        Remove and return the box at the given index.
+
+        @param index:   The index of the box to remove and return.
+        @return:        A Box object, which is the box removed from the given index.
+        """
+        box = self[index]
+        del self[index]
+        return box
+
+    def __iter__(self):
+        """
+        Override of the iter function, which allows the collection to be used like a normal list.  Each call returns a
+        new, independent iterator, so the same collection can be looped over inside a loop over itself.
+
+        @return: An iterator over the Box objects in the collection.
+        """
+        index = 0
+        while index < self.__size__:
+            yield self.__get_box__(index)
+            index += 1
+
+    def views(self) -> tuple:
+        """
+        Gets read-only views of the stored arrays.  No data is copied, so the views should not be kept after the
+        collection has been changed.
+
+        @return: A tuple of five numpy.ndarray objects, which are the left, right, lower and upper edges and the
+                 confidences of the boxes, in collection order.
+        """
+        n = self.__size__
+        views = list()
+        for column in (self.__left__, self.__right__, self.__lower__, self.__upper__, self.__confidence__):
+            view = column[:n]
+            view.flags.writeable = False
+            views.append(view)
+
+        return tuple(views)
+
+    def __getitem__(self, key) -> Box:
+        """
+        Override of the getitem function, which allows the collection to be used like a normal list.
+
+        @param key:     An int, which is the index of the box to get.
+        @return:        A Box object, which is the box at the given index.
+        """
+        if isinstance(key, slice):
+            return [self.__get_box__(i) for i in range(*key.indices(self.__size__))]
+
+        return self.__get_box__(self.__check_index__(key))
+
+    def __setitem__(self, key: int, value: Box):
+        """
+        Override of the setitem function, which allows the collection to be used like a normal list.
+
+        @param key:     An int, which is the index at which to replace a box.
+        @param value:   A Box object, which is the box to replace an existing box with.
+        @return:
+        """
+        index = self.__check_index__(key)
+        if not self.__owns_arrays__:
+            self.__grow__(self.__size__)
+        self.__write_row__(index, value)
+
+    def __delitem__(self, key: int):
+        """
+        Override of the delitem function, which allows the collection to be used like a normal list.
+
+        @param key:     An int, which is the index of the box to delete.
+        @return:
+        """
+        keep = numpy.ones(self.__size__, dtype=bool)
+        if isinstance(key, slice):
+            keep[key] = False
+        else:
+            keep[self.__check_index__(key)] = False
+        self.__keep_rows__(numpy.flatnonzero(keep))
+
+    def remove(self, box: Box):
+        """
+        Removes the first occurrence of the given box from the collection.
+
+        @param box: A Box object which is to be removed from the collection.
+        @return:
+        """
+        index = self.__find__(box)
+        if index is None:
+            raise ValueError("ArrayBoxList.remove(box): box not in collection")
+        del self[index]
+
+    def __len__(self) -> int:
+        """
+        Override of the len function, which allows the collection to be used like a normal list.
+
+        @return: An int, which is the number of boxes in the collection.
+        """
+        return self.__size__
+
+    def sort_by_area(self):
+        """
+        Sorts the collection in descending order of box area.
+
+        @return:
+        """
+        self.__keep_rows__(numpy.argsort(self.areas(), kind="stable"))
+
+    def snapshot(self) -> 'ArrayBoxList':
+        """
+        Creates a snapshot of the collection, without copying it.  The snapshot wraps views of the stored arrays, and
+        both collections copy the arrays before they are next changed, so neither is affected by later changes to the
+        other.  The Box objects are recreated from the arrays as they are asked for.
+
+        @return: An ArrayBoxList object which holds the same boxes as this collection.
+        """
+        n = self.__size__
+        self.__owns_arrays__ = False
+
+        return ArrayBoxList.from_columns(left=self.__left__[:n], right=self.__right__[:n],
+                                         lower=self.__lower__[:n], upper=self.__upper__[:n],
+                                         confidence=self.__confidence__[:n], label_ids=self.__label_ids__[:n])
+
+    def get_label_ids(self) -> numpy.ndarray:
+        """
+        A getter for the label ids of the boxes in the collection.  The ids come from the shared LabelRegistry, and can
+        be turned back into labels with the get_label_for_id() function.
+
+        @return: A numpy.ndarray of int values, which are the label ids of the boxes, in collection order.
+        """
+        return self.__label_ids__[:self.__size__]
+
+    def get_label_for_id(self, label_id: int) -> str:
+        """
+        Converts a label id back into the label it stands for.
+
+        @param label_id:    An int which is a label id from the shared LabelRegistry.
+        @return:            A str which is the label for the given id.
+        """
+        return __label_registry__.get_label(label_id)
+
+    def __get_edge_arrays__(self) -> tuple:
+        """
+        Returns views of the stored edge arrays, for use in the vectorised functions.  No data is copied.
+
+        @return: A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the boxes.
+        """
+        n = self.__size__
+        return self.__left__[:n], self.__right__[:n], self.__lower__[:n], self.__upper__[:n]
+
+    def __get_field_arrays__(self) -> (numpy.ndarray, numpy.ndarray):
+        """
+        Gathers the stored fields into arrays, for use in comparing collections.
+
+        @return:    A tuple of two numpy.ndarray objects.  The first has shape (N, 5), and holds the left, right, lower
+                    and upper edges and the confidence of each box.  The second holds the label id of each box.
+        """
+        n = self.__size__
+        fields = numpy.stack((self.__left__[:n], self.__right__[:n], self.__lower__[:n], self.__upper__[:n],
+                              self.__confidence__[:n]), axis=1).astype(numpy.float64, copy=False)
+
+        return fields, self.__label_ids__[:n]
+
+    def __get_box__(self, index: int) -> Box:
+        """
+        Returns the Box object for a given row, creating it from the stored arrays if this is the first time it has been
+        asked for.
+
+        @param index:   An int which is a valid, non-negative, row index.
+        @return:        A Box object, which is the box at the given row.
+        """
+        box = self.__box_cache__[index]
+        if box is None:
+            box = Box(left_edge=float(self.__left__[index]),
+                      right_edge=float(self.__right__[index]),
+                      lower_edge=float(self.__lower__[index]),
+                      upper_edge=float(self.__upper__[index]),
+                      confidence=float(self.__confidence__[index]),
+                      label=__label_registry__.get_label(self.__label_ids__[index]))
+            self.__box_cache__[index] = box
+        return box
+
+    def __write_row__(self, index: int, box: Box):
+        """
+        Writes the fields of a box into the given row of the stored arrays.
+
+        @param index:   An int which is the row to write to.
+        @param box:     A Box object which is the box to store.
+        @return:
+        """
+        self.__before_change__()
+        self.__left__[index] = box.left_edge
+        self.__right__[index] = box.right_edge
+        self.__lower__[index] = box.lower_edge
+        self.__upper__[index] = box.upper_edge
+        self.__confidence__[index] = box.confidence
+        self.__label_ids__[index] = box.label_id
+        self.__box_cache__[index] = box
+
+    def __get_label_ids_for__(self, labels) -> numpy.ndarray:
+        """
+        Converts a collection of labels into their label ids.  Labels which have never been seen cannot be used in this
+        collection, so are left out.
+
+        @param labels:  A collection of str values, which are the labels to convert.
+        @return:        A numpy.ndarray of int values, which are the ids of the given labels.
+        """
+        label_ids = [__label_registry__.find_id(label) for label in labels]
+        return numpy.array([label_id for label_id in label_ids if label_id >= 0], dtype=numpy.int32)
+
+    def __grow__(self, capacity: int):
+        """
+        Reallocates the stored arrays with the given capacity.  The new arrays are always owned by this collection, so
+        this is also used to copy wrapped arrays before they are changed.
+
+        @param capacity:    An int which is the new number of boxes to allocate space for.
+        @return:
+        """
+        n = self.__size__
+        for name in ("__left__", "__right__", "__lower__", "__upper__", "__confidence__"):
+            new = numpy.empty(capacity, dtype=numpy.float64)
+            new[:n] = getattr(self, name)[:n]
+            setattr(self, name, new)
+        label_ids = numpy.empty(capacity, dtype=numpy.int32)
+        label_ids[:n] = self.__label_ids__[:n]
+        self.__label_ids__ = label_ids
+        cache = numpy.full(capacity, None, dtype=object)
+        cache[:n] = self.__box_cache__[:n]
+        self.__box_cache__ = cache
+        self.__owns_arrays__ = True
+
+    def __keep_rows__(self, rows: numpy.ndarray):
+        """
+        Rebuilds the collection so that it only contains the given rows, in the given order.  Used for sorting and
+        removal of boxes.
+
+        @param rows:    A numpy.ndarray of int values, which are the rows to keep.
+        @return:
+        """
+        self.__before_change__()
+        if not self.__owns_arrays__:
+            self.__grow__(self.__size__)
+
+        n = len(rows)
+        for name in ("__left__", "__right__", "__lower__", "__upper__", "__confidence__", "__label_ids__",
+                     "__box_cache__"):
+            column = getattr(self, name)
+            column[:n] = column[rows]
+        self.__box_cache__[n:self.__size__] = None
+        self.__size__ = n
+
+    def __check_index__(self, key: int) -> int:
+        """
+        Converts a list-style index (which may be negative) into a row index, and checks that it is in range.
+
+        @param key: An int which is the index to check.
+        @return:    An int which is the equivalent non-negative row index.
+        """
+        index = key + self.__size__ if key < 0 else key
+        if index < 0 or index >= self.__size__:
+            raise IndexError("ArrayBoxList index out of range")
+        return index
+
+    def __find__(self, box: Box) -> int | None:
+        """
+        Finds the index of the first occurrence of the given box in the collection.
+
+        @param box: A Box object to search for.
+        @return:    An int which is the index of the box, or None if the box is not in the collection.
+        """
+        for index in range(self.__size__):
+            cached = self.__box_cache__[index]
+            if cached is box or (cached is not None and cached == box):
+                return index
+        return None
@@ -0,0 +1,230 @@
+import numpy
+
+
+def get_greedy_matches(scores: numpy.ndarray, min_score: float) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Matches the rows of a score matrix (such as a matrix of IoU factors) to its columns, one to one, by repeatedly
+    taking the highest scoring pair whose row and column are both still unmatched.  Only pairs with a score above the
+    given minimum can be matched.  Ties are broken in favour of the lowest row, and then the lowest column.
+
+    @param scores:      A numpy.ndarray of shape (R, C), where element [i, j] is the score for matching row i with
+                        column j.
+    @param min_score:   A float which is the score that a pair must be above to be matched.
+    @return:            A tuple of two numpy.ndarray objects of int values, which are the rows and columns of the
+                        matched pairs, in row order.
+    """
+    scores = numpy.asarray(scores, dtype=numpy.float64)
+    candidate_rows, candidate_cols = numpy.nonzero(scores > min_score)
+
+    return get_greedy_pair_matches(candidate_rows, candidate_cols, scores[candidate_rows, candidate_cols], min_score)
+
+
+def get_greedy_pair_matches(rows, cols, scores, min_score: float) -> (numpy.ndarray, numpy.ndarray):
+    """
+    The same as get_greedy_matches(), but for a sparse series of candidate pairs rather than a full score matrix.  Any
+    pair which is not given cannot be matched.  This is for when only a few of the possible pairs can ever be matched,
+    such as boxes which can only be matched with boxes of the same label.
+
+    @param rows:        A numpy.ndarray of int values, which are the rows of the candidate pairs.
+    @param cols:        A numpy.ndarray of int values, which are the columns of the candidate pairs.
+    @param scores:      A numpy.ndarray of float values, which are the scores of the candidate pairs.
+    @param min_score:   A float which is the score that a pair must be above to be matched.
+    @return:            A tuple of two numpy.ndarray objects of int values, which are the rows and columns of the
+                        matched pairs, in row order.
+    """
+    rows, cols, scores = __get_allowed_pairs__(rows, cols, scores, min_score)
+    order = numpy.lexsort((cols, rows, -scores))
+
+    row_is_free = dict.fromkeys(rows.tolist(), True)
+    col_is_free = dict.fromkeys(cols.tolist(), True)
+    matched_rows = list()
+    matched_cols = list()
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row_is_free[row] and col_is_free[col]:
+            row_is_free[row] = False
+            col_is_free[col] = False
+            matched_rows.append(row)
+            matched_cols.append(col)
+
+    return __in_row_order__(matched_rows, matched_cols)
+
+
+def get_optimal_matches(scores: numpy.ndarray, min_score: float) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Matches the rows of a score matrix (such as a matrix of IoU factors) to its columns, one to one, so that the total
+    score of the matched pairs is as high as possible.  Only pairs with a score above the given minimum can be matched.
+    This uses the Hungarian algorithm (in its shortest augmenting path form), which takes O(R * R * C) time.
+
+    @param scores:      A numpy.ndarray of shape (R, C), where element [i, j] is the score for matching row i with
+                        column j.
+    @param min_score:   A float which is the score that a pair must be above to be matched.
+    @return:            A tuple of two numpy.ndarray objects of int values, which are the rows and columns of the
+                        matched pairs, in row order.
+    """
+    scores = numpy.asarray(scores, dtype=numpy.float64)
+    if scores.size == 0:
+        return __in_row_order__([], [])
+
+    allowed = scores > min_score
+    # Pairs that cannot be matched cost nothing, so they are no better than leaving the row unmatched.
+    costs = numpy.where(allowed, -scores, 0.0)
+
+    transposed = costs.shape[0] > costs.shape[1]
+    if transposed:
+        costs = costs.T
+    rows, cols = __get_minimum_cost_assignment__(costs)
+    if transposed:
+        rows, cols = cols, rows
+
+    matched = allowed[rows, cols]
+    return __in_row_order__(rows[matched].tolist(), cols[matched].tolist())
+
+
+def get_optimal_pair_matches(rows, cols, scores, min_score: float) -> (numpy.ndarray, numpy.ndarray):
+    """
+    The same as get_optimal_matches(), but for a sparse series of candidate pairs rather than a full score matrix.  Any
+    pair which is not given cannot be matched.  The Hungarian algorithm is only run on the rows and columns which are
+    in at least one pair with a score above the minimum, so the cost depends on how many pairs can be matched, rather
+    than on the total number of rows and columns.
+
+    @param rows:        A numpy.ndarray of int values, which are the rows of the candidate pairs.
+    @param cols:        A numpy.ndarray of int values, which are the columns of the candidate pairs.
+    @param scores:      A numpy.ndarray of float values, which are the scores of the candidate pairs.
+    @param min_score:   A float which is the score that a pair must be above to be matched.
+    @return:            A tuple of two numpy.ndarray objects of int values, which are the rows and columns of the
+                        matched pairs, in row order.
+    """
+    rows, cols, scores = __get_allowed_pairs__(rows, cols, scores, min_score)
+    used_rows, row_indexes = numpy.unique(rows, return_inverse=True)
+    used_cols, col_indexes = numpy.unique(cols, return_inverse=True)
+
+    # Pairs which are not given are left at the minimum score, so they cannot be matched.
+    dense_scores = numpy.full((len(used_rows), len(used_cols)), min_score, dtype=numpy.float64)
+    dense_scores[row_indexes, col_indexes] = scores
+    matched_rows, matched_cols = get_optimal_matches(dense_scores, min_score)
+
+    return used_rows[matched_rows], used_cols[matched_cols]
+
+
+def get_pairs_in_same_group(row_groups, col_groups) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Finds every pair of a row and a column which are in the same group, in one vectorised pass.  This is used to find
+    the candidate pairs for get_greedy_pair_matches() and get_optimal_pair_matches(), when rows and columns can only be
+    matched within the same group.
+
+    @param row_groups:  A numpy.ndarray of int values, which are the group of each row.
+    @param col_groups:  A numpy.ndarray of int values, which are the group of each column.
+    @return:            A tuple of two numpy.ndarray objects of int values, which are the rows and columns of every
+                        pair in the same group.  The pairs are sorted by group, then by row, then by column.
+    """
+    row_groups = numpy.asarray(row_groups)
+    col_groups = numpy.asarray(col_groups)
+    row_order = numpy.argsort(row_groups, kind="stable")
+    col_order = numpy.argsort(col_groups, kind="stable")
+    sorted_row_groups = row_groups[row_order]
+    sorted_col_groups = col_groups[col_order]
+    shared_groups = numpy.intersect1d(sorted_row_groups, sorted_col_groups)
+
+    row_starts = numpy.searchsorted(sorted_row_groups, shared_groups, side="left")
+    row_counts = numpy.searchsorted(sorted_row_groups, shared_groups, side="right") - row_starts
+    col_starts = numpy.searchsorted(sorted_col_groups, shared_groups, side="left")
+    col_counts = numpy.searchsorted(sorted_col_groups, shared_groups, side="right") - col_starts
+
+    # Each group has (rows in group) * (columns in group) pairs, numbered row by row within the group.
+    pair_counts = row_counts * col_counts
+    pair_groups = numpy.repeat(numpy.arange(len(shared_groups)), pair_counts)
+    pair_numbers = numpy.arange(pair_counts.sum()) - numpy.repeat(numpy.cumsum(pair_counts) - pair_counts, pair_counts)
+    group_col_counts = col_counts[pair_groups]
+
+    rows = row_order[row_starts[pair_groups] + pair_numbers // group_col_counts]
+    cols = col_order[col_starts[pair_groups] + pair_numbers % group_col_counts]
+    return rows, cols
+
+
+def __get_allowed_pairs__(rows, cols, scores, min_score: float) -> (numpy.ndarray, numpy.ndarray, numpy.ndarray):
+    """
+    Removes the candidate pairs which have a score that is not above the minimum.
+
+    @param rows:        A sequence of int values, which are the rows of the candidate pairs.
+    @param cols:        A sequence of int values, which are the columns of the candidate pairs.
+    @param scores:      A sequence of float values, which are the scores of the candidate pairs.
+    @param min_score:   A float which is the score that a pair must be above to be matched.
+    @return:            A tuple of three numpy.ndarray objects, which are the rows, columns and scores of the pairs that
+                        are allowed to be matched.
+    """
+    rows = numpy.asarray(rows, dtype=numpy.intp)
+    cols = numpy.asarray(cols, dtype=numpy.intp)
+    scores = numpy.asarray(scores, dtype=numpy.float64)
+    allowed = scores > min_score
+
+    return rows[allowed], cols[allowed], scores[allowed]
+
+
+def __get_minimum_cost_assignment__(costs: numpy.ndarray) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Solves the rectangular assignment problem for a cost matrix with no more rows than columns.  Every row is assigned
+    to a different column, so that the total cost is as low as possible.  The search over the columns is vectorised, so
+    only the loops over the rows and the augmenting steps run in Python.
+
+    @param costs:   A numpy.ndarray of shape (R, C), where R <= C, and element [i, j] is the cost of assigning row i to
+                    column j.
+    @return:        A tuple of two numpy.ndarray objects of int values, which are the rows and their assigned columns.
+    """
+    row_count, col_count = costs.shape
+    row_potentials = numpy.zeros(row_count + 1)
+    col_potentials = numpy.zeros(col_count + 1)
+    # Column 0 is a dummy column, and row numbers start at 1, so that 0 can mean "unassigned".
+    col_owner = numpy.zeros(col_count + 1, dtype=numpy.intp)
+    previous_col = numpy.zeros(col_count + 1, dtype=numpy.intp)
+
+    for row in range(1, row_count + 1):
+        col_owner[0] = row
+        current_col = 0
+        min_slack = numpy.full(col_count + 1, numpy.inf)
+        col_used = numpy.zeros(col_count + 1, dtype=bool)
+
+        while True:
+            col_used[current_col] = True
+            current_row = col_owner[current_col]
+            free = ~col_used
+            free[0] = False
+
+            slack = costs[current_row - 1] - row_potentials[current_row] - col_potentials[1:]
+            improved = free[1:] & (slack < min_slack[1:])
+            min_slack[1:][improved] = slack[improved]
+            previous_col[1:][improved] = current_col
+
+            free_slack = numpy.where(free, min_slack, numpy.inf)
+            next_col = int(numpy.argmin(free_slack))
+            delta = free_slack[next_col]
+
+            row_potentials[col_owner[col_used]] += delta
+            col_potentials[col_used] -= delta
+            min_slack[free] -= delta
+
+            current_col = next_col
+            if col_owner[current_col] == 0:
+                break
+
+        while current_col != 0:
+            previous = previous_col[current_col]
+            col_owner[current_col] = col_owner[previous]
+            current_col = previous
+
+    assigned_cols = numpy.flatnonzero(col_owner[1:])
+    return col_owner[1:][assigned_cols] - 1, assigned_cols
+
+
+def __in_row_order__(rows: list, cols: list) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Converts a series of matched pairs into arrays, sorted by row.
+
+    @param rows:    A list of int values, which are the rows of the matched pairs.
+    @param cols:    A list of int values, which are the columns of the matched pairs.
+    @return:        A tuple of two numpy.ndarray objects of int values, which are the rows and columns, in row order.
+    """
+    rows = numpy.array(rows, dtype=numpy.intp)
+    cols = numpy.array(cols, dtype=numpy.intp)
+    order = numpy.argsort(rows, kind="stable")
+
+    return rows[order], cols[order]
@@ -1,23 +1,14 @@
+from util.LabelRegistry import get_label_registry
 
-
-def __get_as_str__(string) -> str:
-    """
-    A helper function to make sure that a given string is in str format, and not a bytestring.
-
-    @param string:  A string that may or may not be a bytestring.
-    @return:        A str, which is the same as the given string.
-    """
-    if isinstance(string, (bytes, bytearray)):
-        return str(string, "utf-8")
-    elif isinstance(string, str):
-        return string
-    else:
-        return str(string)
+__label_registry__ = get_label_registry()
 
 
 class Box:
     """
     A class to describe a single bounding box, along with some details and helpful functions.
+
+    The label is stored as an int label id from the shared LabelRegistry, so that labels can be compared as ints.  The
+    label property converts it to and from a str.
     """
 
     def __init__(self, left_edge: float, right_edge: float,
@@ -37,7 +28,35 @@ class Box:
         self.lower_edge: float = lower_edge
         self.upper_edge: float = upper_edge
         self.confidence: float = confidence
-        self.label: str = __get_as_str__(label)
+        self.label_id: int = __label_registry__.get_id(label)
+
+    @property
+    def label(self) -> str:
+        """
+        A getter for the label of the box.
+
+        @return: A str, which is the classification of this item.
+        """
+        return __label_registry__.get_label(self.label_id)
+
+    @label.setter
+    def label(self, label: str):
+        """
+        A setter for the label of the box.
+
+        @param label:   A str (or bytestring), which is the new classification of this item.
+        @return:
+        """
+        self.label_id = __label_registry__.get_id(label)
+
+    def __reduce__(self) -> tuple:
+        """
+        An override of the reduce function, which allows the box to be pickled and copied.
+
+        @return: A tuple of the class and the arguments needed to recreate this box.  The label is stored as a str, as
+                 label ids are only meaningful within one run of the program.
+        """
+        return Box, (self.left_edge, self.right_edge, self.lower_edge, self.upper_edge, self.confidence, self.label)
 
     def __str__(self) -> str:
         """
@@ -97,8 +116,7 @@ class Box:
         if intersection_area < 0.0000001:
             return 0.0
 
-        other_box_area = (other_box.right_edge - other_box.left_edge) * (other_box.upper_edge - other_box.lower_edge)
-        union_area = self.get_area() + other_box_area - intersection_area
+        union_area = self.get_area() + other_box.get_area() - intersection_area
 
         intersection_over_union = intersection_area / union_area
 
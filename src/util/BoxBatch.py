@@ -0,0 +1,287 @@
+import numpy
+
+from util.ArrayBoxList import ArrayBoxList
+from util import BoxMaths
+from util.LabelRegistry import get_label_registry
+
+
+class BoxBatch:
+    """
+    A class to hold the bounding boxes of many frames at once, such as a whole recorded session, so that they can be
+    processed with vectorised passes rather than one frame at a time.  The boxes of every frame are stored end to end in
+    one array per field, and an array of offsets records where each frame starts.  The boxes of frame i are the rows
+    from offsets[i] up to (but not including) offsets[i + 1].
+
+    The stored arrays are never changed in place.  Each function that changes the batch replaces them instead, so the
+    frames returned by get_frame() (which are views of the arrays) and copies made with copy() are not affected.
+    """
+    def __init__(self, left, right, lower, upper, confidence, label_ids, offsets):
+        """
+        The constructor.  Generally the from_box_lists() or from_detections() functions should be used instead.
+
+        @param left:        A numpy.ndarray of N float values, which are the left edges of the boxes in all frames.
+        @param right:       A numpy.ndarray of N float values, which are the right edges of the boxes in all frames.
+        @param lower:       A numpy.ndarray of N float values, which are the lower edges of the boxes in all frames.
+        @param upper:       A numpy.ndarray of N float values, which are the upper edges of the boxes in all frames.
+        @param confidence:  A numpy.ndarray of N float values, which are the detection confidences of the boxes.
+        @param label_ids:   A numpy.ndarray of N int values, which are the label ids (from the shared LabelRegistry) of
+                            the boxes.
+        @param offsets:     A numpy.ndarray of F + 1 int values, which are the rows where each of the F frames start,
+                            followed by N.
+        """
+        self.__left__: numpy.ndarray = numpy.asarray(left, dtype=numpy.float64)
+        self.__right__: numpy.ndarray = numpy.asarray(right, dtype=numpy.float64)
+        self.__lower__: numpy.ndarray = numpy.asarray(lower, dtype=numpy.float64)
+        self.__upper__: numpy.ndarray = numpy.asarray(upper, dtype=numpy.float64)
+        self.__confidence__: numpy.ndarray = numpy.asarray(confidence, dtype=numpy.float64)
+        self.__label_ids__: numpy.ndarray = numpy.asarray(label_ids, dtype=numpy.int32)
+        self.__offsets__: numpy.ndarray = numpy.asarray(offsets, dtype=numpy.int64)
+
+        if len(self.__offsets__) == 0 or self.__offsets__[0] != 0 or self.__offsets__[-1] != len(self.__left__) \
+                or numpy.any(numpy.diff(self.__offsets__) < 0):
+            raise ValueError("The offsets must start at 0, never decrease, and end at the number of boxes.")
+
+    @classmethod
+    def from_box_lists(cls, box_lists) -> 'BoxBatch':
+        """
+        A constructor function which gathers the boxes of a series of frames into one batch.
+
+        @param box_lists:   A sequence of BoxList (or ArrayBoxList) objects, which are the boxes of each frame, in frame
+                            order.
+        @return:            A BoxBatch object which holds the boxes of all the given frames.
+        """
+        views = [box_list.views() for box_list in box_lists]
+        label_ids = [box_list.get_label_ids() for box_list in box_lists]
+        counts = [len(ids) for ids in label_ids]
+
+        columns = [numpy.concatenate([frame_views[field] for frame_views in views]) if views
+                   else numpy.empty(0, dtype=numpy.float64) for field in range(5)]
+        all_label_ids = numpy.concatenate(label_ids) if label_ids else numpy.empty(0, dtype=numpy.int32)
+
+        return cls(*columns, all_label_ids, numpy.concatenate(([0], numpy.cumsum(counts, dtype=numpy.int64))))
+
+    @classmethod
+    def from_detections(cls, detections) -> 'BoxBatch':
+        """
+        A constructor function which gathers the raw results of the object detection model for a series of frames into
+        one batch, without creating a BoxList for each frame.  Each different label is only looked up once for the
+        whole batch.
+
+        @param detections:  A sequence of dict objects, which are the detection results for each frame, in frame order.
+                            Each dict holds the "detection_boxes" (rows of lower, left, upper and right edges),
+                            "detection_scores" and "detection_class_entities" arrays returned by the model.
+        @return:            A BoxBatch object which holds the boxes of all the given frames.
+        """
+        boxes = [numpy.asarray(detection["detection_boxes"], dtype=numpy.float64).reshape(-1, 4)
+                 for detection in detections]
+        counts = [len(frame_boxes) for frame_boxes in boxes]
+        boxes = numpy.concatenate(boxes) if boxes else numpy.empty((0, 4), dtype=numpy.float64)
+        scores = numpy.concatenate([numpy.asarray(detection["detection_scores"], dtype=numpy.float64).reshape(-1)
+                                    for detection in detections]) if detections else numpy.empty(0)
+
+        labels = numpy.empty(len(boxes), dtype=object)
+        labels[:] = [label for detection in detections for label in detection["detection_class_entities"]]
+        unique_labels, label_indexes = numpy.unique(labels, return_inverse=True)
+        registry = get_label_registry()
+        unique_ids = numpy.array([registry.get_id(label) for label in unique_labels], dtype=numpy.int32)
+
+        return cls(boxes[:, 1], boxes[:, 3], boxes[:, 0], boxes[:, 2], scores, unique_ids[label_indexes].reshape(-1),
+                   numpy.concatenate(([0], numpy.cumsum(counts, dtype=numpy.int64))))
+
+    def copy(self) -> 'BoxBatch':
+        """
+        Creates a copy of the batch.  As the stored arrays are never changed in place, they are shared rather than
+        copied, so this is cheap.
+
+        @return: A BoxBatch object which holds the same boxes as this batch.
+        """
+        return BoxBatch(self.__left__, self.__right__, self.__lower__, self.__upper__, self.__confidence__,
+                        self.__label_ids__, self.__offsets__)
+
+    def frame_count(self) -> int:
+        """
+        A getter for the number of frames in the batch.
+
+        @return: An int which is the number of frames.
+        """
+        return len(self.__offsets__) - 1
+
+    def size(self) -> int:
+        """
+        A getter for the total number of boxes in the batch, across all frames.
+
+        @return: An int which is the number of boxes.
+        """
+        return len(self.__left__)
+
+    def __len__(self) -> int:
+        """
+        An override of the len function.  Note that this is the number of frames, not the number of boxes.
+
+        @return: An int which is the number of frames in the batch.
+        """
+        return self.frame_count()
+
+    def get_offsets(self) -> numpy.ndarray:
+        """
+        A getter for the rows where each frame starts.
+
+        @return: A read-only numpy.ndarray of F + 1 int values, which are the first row of each frame, followed by the
+                 total number of boxes.
+        """
+        offsets = self.__offsets__.view()
+        offsets.flags.writeable = False
+        return offsets
+
+    def get_frame_ids(self) -> numpy.ndarray:
+        """
+        Gets the frame that each box belongs to.
+
+        @return: A numpy.ndarray of N int values, which are the frame index of each box.
+        """
+        return numpy.repeat(numpy.arange(self.frame_count()), numpy.diff(self.__offsets__))
+
+    def get_label_ids(self) -> numpy.ndarray:
+        """
+        A getter for the label ids of the boxes.  The ids come from the shared LabelRegistry.
+
+        @return: A read-only numpy.ndarray of N int values, which are the label ids of the boxes.
+        """
+        label_ids = self.__label_ids__.view()
+        label_ids.flags.writeable = False
+        return label_ids
+
+    def views(self) -> tuple:
+        """
+        Gets the fields of all the boxes in the batch as read-only arrays.  No data is copied.
+
+        @return: A tuple of five numpy.ndarray objects, which are the left, right, lower and upper edges and the
+                 confidences of the boxes, in batch order.
+        """
+        fields = list()
+        for array in (self.__left__, self.__right__, self.__lower__, self.__upper__, self.__confidence__):
+            view = array.view()
+            view.flags.writeable = False
+            fields.append(view)
+        return tuple(fields)
+
+    def areas(self) -> numpy.ndarray:
+        """
+        Calculates the areas of all the boxes in the batch in one pass.
+
+        @return: A numpy.ndarray of N float values, which are the areas of the boxes, in batch order.
+        """
+        return BoxMaths.get_areas(self.__left__, self.__right__, self.__lower__, self.__upper__)
+
+    def get_frame(self, index: int) -> ArrayBoxList:
+        """
+        Gets the boxes of one frame.  The result wraps views of the stored arrays, so no data is copied unless the
+        returned collection is changed.
+
+        @param index:   An int which is the index of the frame.  Negative indexes count back from the last frame.
+        @return:        An ArrayBoxList object which holds the boxes of the given frame.
+        """
+        frame_count = self.frame_count()
+        frame = index + frame_count if index < 0 else index
+        if frame < 0 or frame >= frame_count:
+            raise IndexError("BoxBatch frame index out of range")
+
+        rows = slice(self.__offsets__[frame], self.__offsets__[frame + 1])
+        return ArrayBoxList.from_columns(left=self.__left__[rows], right=self.__right__[rows],
+                                         lower=self.__lower__[rows], upper=self.__upper__[rows],
+                                         confidence=self.__confidence__[rows], label_ids=self.__label_ids__[rows])
+
+    def __iter__(self):
+        """
+        An override of the iter function.  Iterates over the frames of the batch.
+
+        @return: A generator which yields an ArrayBoxList object for each frame, in frame order.
+        """
+        for frame in range(self.frame_count()):
+            yield self.get_frame(frame)
+
+    def to_box_lists(self) -> list:
+        """
+        Splits the batch back into one collection per frame.
+
+        @return: A list of ArrayBoxList objects, which are the boxes of each frame, in frame order.
+        """
+        return list(self)
+
+    def trim_by_confidence(self, min_confidence: float):
+        """
+        Removes all the boxes in every frame which have a confidence below the given minimum.
+
+        @param min_confidence:  A float which is the minimum confidence level to keep.
+        @return:
+        """
+        self.keep_mask(self.__confidence__ >= min_confidence)
+
+    def trim_by_label(self, allowed_labels=None, denied_labels=None):
+        """
+        Removes all the boxes in every frame whose labels are not allowed.  The labels are only compared as ids.
+
+        @param allowed_labels:  A collection of str values which are the only labels to keep.  If None, all labels are
+                                allowed.
+        @param denied_labels:   A collection of str values which are labels to remove.  If None, no labels are removed.
+        @return:
+        """
+        registry = get_label_registry()
+        mask = numpy.ones(self.size(), dtype=bool)
+        if allowed_labels is not None:
+            mask &= numpy.isin(self.__label_ids__, [registry.find_id(label) for label in allowed_labels])
+        if denied_labels is not None:
+            mask &= ~numpy.isin(self.__label_ids__, [registry.find_id(label) for label in denied_labels])
+
+        self.keep_mask(mask)
+
+    def keep_mask(self, mask):
+        """
+        Removes all the boxes whose entry in the given mask is False, from every frame at once.  Frames which lose all
+        their boxes are kept as empty frames.
+
+        @param mask:    A sequence (such as a numpy.ndarray) of bool values, with one value for each box in the batch.
+                        Boxes are kept where the value is True.
+        @return:
+        """
+        mask = numpy.asarray(mask, dtype=bool)
+        if len(mask) != self.size():
+            raise ValueError("The mask must have one value for each box in the batch.")
+
+        if mask.all():
+            return
+
+        counts = numpy.bincount(self.get_frame_ids()[mask], minlength=self.frame_count())
+        self.__offsets__ = numpy.concatenate(([0], numpy.cumsum(counts, dtype=numpy.int64)))
+        self.__take_rows__(numpy.flatnonzero(mask))
+
+    def sort_by_area(self):
+        """
+        Sorts the boxes of every frame in ascending order of area, in one pass.  Boxes with the same area keep their
+        order, so each frame is sorted in the same way as BoxList.sort_by_area() would sort it.
+
+        @return:
+        """
+        self.__take_rows__(numpy.lexsort((self.areas(), self.get_frame_ids())))
+
+    def sort_by_confidence(self):
+        """
+        Sorts the boxes of every frame in descending order of detection confidence, in one pass.
+
+        @return:
+        """
+        self.__take_rows__(numpy.lexsort((-self.__confidence__, self.get_frame_ids())))
+
+    def __take_rows__(self, rows: numpy.ndarray):
+        """
+        Replaces the stored arrays with the given rows of each array.  The offsets must already match the new rows.
+
+        @param rows:    A numpy.ndarray of int values, which are the rows to keep, in their new order.
+        @return:
+        """
+        self.__left__ = self.__left__[rows]
+        self.__right__ = self.__right__[rows]
+        self.__lower__ = self.__lower__[rows]
+        self.__upper__ = self.__upper__[rows]
+        self.__confidence__ = self.__confidence__[rows]
+        self.__label_ids__ = self.__label_ids__[rows]
@@ -1,4 +1,10 @@
+import numpy
+
+from util import Assignment
 from util.Box import Box
+from util import BoxMaths
+from util.LabelRegistry import get_label_registry
+from util.SpatialIndex import SpatialIndex
 
 
 class BoxList:
@@ -11,6 +17,8 @@ class BoxList:
         The constructor.  Initialises the object with an empty list of boxes.
         """
         self.__boxes__: list = list()
+        self.__spatial_index__: SpatialIndex | None = None
+        self.__shares_boxes__: bool = False
 
     def __str__(self) -> str:
         """
@@ -19,39 +27,113 @@ class BoxList:
 
         @return: A str value which summarises the contents of this object.
         """
-        string = ""
         box_ = "Box "
         _open_bracket_ = ": ["
         _close_bracket = "]"
         _new_line_ = "\n"
 
-        for i in range(self.size()):
-            string = string + box_ + str(i) + _open_bracket_ + str(self.__boxes__[i]) + _close_bracket
-
-            if i != (self.size() - 1):
-                string = string + _new_line_
+        lines = [box_ + str(i) + _open_bracket_ + str(self[i]) + _close_bracket for i in range(self.size())]
 
-        return string
+        return _new_line_.join(lines)
 
     def __eq__(self, other) -> bool:
         """
-        An override of the __eq__() function.  This uses the __str__() function to check for equality between two
-        collections that contain the same data.  I.e. if the collections contain the same boxes then they will be listed
-        as equal.
+        An override of the __eq__() function.  Two collections are equal if they contain boxes with the same fields, in
+        the same order.  I.e. if the collections contain the same boxes then they will be listed as equal.
 
         @param other:   The other object to check for equality.
         @return:        A bool which describes if the given object is equal to this one.
         """
-        if not isinstance(other, self.__class__):
-            return False
+        return self.equals(other)
 
-        self_str = str(self)
-        other_str = str(other)
+    def equals(self, other, tolerance: float = 0.0, ignore_order: bool = False) -> bool:
+        """
+        Checks if another collection contains the same boxes as this one.  The fields of the boxes are compared
+        directly, rather than by building strings of the collections.
+
+        @param other:           The other object to check for equality.
+        @param tolerance:       A float which is the largest difference allowed between two numeric fields for them to
+                                still count as equal.  Defaults to 0.0, which requires exact equality.
+        @param ignore_order:    A bool which, if True, allows the boxes to be in a different order in each collection.
+        @return:                A bool which describes if the given object is equal to this one.
+        """
+        if not isinstance(other, BoxList):
+            return False
 
-        if self_str != other_str:
+        if self.size() != other.size():
             return False
 
-        return True
+        return not self.__get_row_differences__(other, tolerance, ignore_order).any()
+
+    def diff(self, other: 'BoxList', tolerance: float = 0.0) -> list:
+        """
+        Finds the positions at which this collection and another collection hold different boxes.  This is intended to
+        help find where two sets of results stop agreeing.
+
+        @param other:       A BoxList object, which is the collection to compare against.
+        @param tolerance:   A float which is the largest difference allowed between two numeric fields for them to still
+                            count as equal.  Defaults to 0.0, which requires exact equality.
+        @return:            A list of int values, which are the indexes at which the boxes differ.  If one collection is
+                            longer than the other, the indexes of the extra boxes are always included.
+        """
+        differences = self.__get_row_differences__(other, tolerance, False)
+        extra_indexes = range(len(differences), max(self.size(), other.size()))
+
+        return numpy.flatnonzero(differences).tolist() + list(extra_indexes)
+
+    def __get_row_differences__(self, other: 'BoxList', tolerance: float, ignore_order: bool) -> numpy.ndarray:
+        """
+        Compares the fields of this collection with the fields of another collection, row by row.  Only the rows which
+        both collections have are compared.
+
+        @param other:           A BoxList object, which is the collection to compare against.
+        @param tolerance:       A float which is the largest difference allowed between two numeric fields.
+        @param ignore_order:    A bool which, if True, allows the boxes to be in a different order in each collection.
+                                With no tolerance both collections are sorted by their fields before comparing them,
+                                and with a tolerance each box is instead matched with a box that is equal to it.
+        @return:                A numpy.ndarray of bool values, which are True for each row where the boxes differ.
+        """
+        fields, label_ids = self.__get_field_arrays__()
+        other_fields, other_label_ids = other.__get_field_arrays__()
+
+        if ignore_order and tolerance > 0.0:
+            # Boxes which are equal within the tolerance may sort into a different order, so they are matched instead.
+            fields_match = self.__get_fields_match__(fields[:, None, :], other_fields[None, :, :], tolerance)
+            matches = fields_match.all(axis=2) & (label_ids[:, None] == other_label_ids[None, :])
+            matched_rows, _ = Assignment.get_optimal_matches(matches, 0.5)
+
+            differences = numpy.ones(len(fields), dtype=bool)
+            differences[matched_rows] = False
+            return differences[:min(len(fields), len(other_fields))]
+
+        if ignore_order:
+            order = numpy.lexsort(tuple(fields.T) + (label_ids,))
+            other_order = numpy.lexsort(tuple(other_fields.T) + (other_label_ids,))
+            fields, label_ids = fields[order], label_ids[order]
+            other_fields, other_label_ids = other_fields[other_order], other_label_ids[other_order]
+
+        n = min(len(fields), len(other_fields))
+        fields, label_ids = fields[:n], label_ids[:n]
+        other_fields, other_label_ids = other_fields[:n], other_label_ids[:n]
+
+        fields_match = self.__get_fields_match__(fields, other_fields, tolerance)
+
+        return ~fields_match.all(axis=1) | (label_ids != other_label_ids)
+
+    @staticmethod
+    def __get_fields_match__(fields: numpy.ndarray, other_fields: numpy.ndarray, tolerance: float) -> numpy.ndarray:
+        """
+        Compares two arrays of box fields, element by element.  Fields which are both NaN count as equal.
+
+        @param fields:          A numpy.ndarray of float values, which are fields of some boxes.
+        @param other_fields:    A numpy.ndarray of float values which can be broadcast against the first array, which
+                                are the fields to compare them with.
+        @param tolerance:       A float which is the largest difference allowed between two fields.
+        @return:                A numpy.ndarray of bool values, which are True for each pair of fields that are equal.
+        """
+        with numpy.errstate(invalid="ignore"):
+            return (numpy.abs(fields - other_fields) <= tolerance) | (fields == other_fields) \
+                | (numpy.isnan(fields) & numpy.isnan(other_fields))
 
     def add(self, box: Box):
         """
@@ -60,6 +142,7 @@ class BoxList:
         @param box: A Box object to add to the collection.
         @return:
         """
+        self.__before_change__()
         self.__boxes__.append(box)
 
     def get(self, index: int) -> Box | None:
@@ -80,6 +163,7 @@ class BoxList:
 
         @return:
         """
+        self.__before_change__()
         def k(box: Box):
             return box.confidence
 
@@ -92,15 +176,77 @@ class BoxList:
         @param min_confidence:  A float which is the minimum confidence level to keep.
         @return:
         """
+        self.__before_change__()
+        self.__boxes__ = [box for box in self.__boxes__ if box.confidence >= min_confidence]
+
+    def trim_by_label(self, allowed_labels=None, denied_labels=None):
+        """
+        Removes all the boxes in the collection whose labels are not allowed.  The labels are only compared as ids.
+
+        @param allowed_labels:  A collection of str values which are the only labels to keep.  If None, all labels are
+                                allowed.
+        @param denied_labels:   A collection of str values which are labels to remove.  If None, no labels are removed.
+        @return:
+        """
+        self.__before_change__()
+        registry = get_label_registry()
+        allowed = None if allowed_labels is None else frozenset(registry.find_id(label) for label in allowed_labels)
+        denied = frozenset() if denied_labels is None else frozenset(registry.find_id(label) for label in denied_labels)
+
+        self.__boxes__ = [box for box in self.__boxes__
+                          if (allowed is None or box.label_id in allowed) and box.label_id not in denied]
+
+    def trim_by_area(self, min_area: float):
+        """
+        Removes all the boxes in the collection that have an area below the given minimum.
+
+        @param min_area:    A float which is the minimum box area to keep, as a decimal of the area of the frame.
+        @return:
+        """
+        self.keep_mask(self.areas() >= min_area)
 
-        boxes_to_remove = list()
+    def trim_by_region(self, region: Box, min_overlap: float = 0.0):
+        """
+        Removes all the boxes in the collection that do not overlap with the given region of interest.
+
+        @param region:      A Box object which describes the region of interest.  Only its edges are used.
+        @param min_overlap: A float which is the amount of overlap with the region needed to keep a box, expressed as a
+                            decimal of the area of the box.  Defaults to 0.0, which keeps any box that overlaps at all.
+        @return:
+        """
+        region_edges = tuple(numpy.array([edge], dtype=numpy.float64) for edge in
+                             (region.left_edge, region.right_edge, region.lower_edge, region.upper_edge))
+        overlap_areas = BoxMaths.get_pairwise_overlap_areas(self.__get_edge_arrays__(), region_edges)[:, 0]
+
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            self.keep_mask(overlap_areas / self.areas() > min_overlap)
+
+    def filter(self, predicate):
+        """
+        Removes all the boxes in the collection for which the given function does not return True.  The collection is
+        only passed over once.
 
-        for box in self.__boxes__:
-            if box.confidence < min_confidence:
-                boxes_to_remove.append(box)
+        @param predicate:   A function which takes a Box object and returns a bool, which is True if the box should be
+                            kept.
+        @return:
+        """
+        self.__before_change__()
+        self.__boxes__ = [box for box in self.__boxes__ if predicate(box)]
 
-        for box_to_remove in boxes_to_remove:
-            self.__boxes__.remove(box_to_remove)
+    def keep_mask(self, mask):
+        """
+        Removes all the boxes in the collection whose entry in the given mask is False.  The collection is only passed
+        over once.
+
+        @param mask:    A sequence (such as a numpy.ndarray) of bool values, with one value for each box in the
+                        collection.  Boxes are kept where the value is True.
+        @return:
+        """
+        self.__before_change__()
+        if len(mask) != self.size():
+            raise ValueError("The mask must have one value for each box in the collection.")
+
+        self.__boxes__ = [box for box, keep in zip(self.__boxes__, mask) if keep]
 
     def size(self):
         """
@@ -126,29 +272,68 @@ class BoxList:
         @param index:   The index of the box to remove and return.
         @return:        A Box object, which is the box removed from the given index.
         """
+        self.__before_change__()
         return self.__boxes__.pop(index)
 
-    def __iter__(self) -> 'BoxList':
+    def __iter__(self):
+        """
+        Override of the iter function, which allows the collection to be used like a normal list.  Each call returns a
+        new, independent iterator, so the same collection can be looped over inside a loop over itself.
+
+        @return: An iterator over the Box objects in the collection.
+        """
+        return iter(self.__boxes__)
+
+    def views(self) -> tuple:
+        """
+        Gets the fields of all the boxes in the collection as read-only arrays.  This allows a whole collection to be
+        scanned with vectorised operations, rather than with nested loops over Box objects.  For a BoxList the arrays
+        are gathered from the boxes, but collections that store arrays (such as the ArrayBoxList) return views of their
+        stored data without copying it.
+
+        @return: A tuple of five numpy.ndarray objects, which are the left, right, lower and upper edges and the
+                 confidences of the boxes, in collection order.
+        """
+        fields, _ = self.__get_field_arrays__()
+        fields = fields.T
+        fields.flags.writeable = False
+
+        return tuple(fields)
+
+    def get_label_ids(self) -> numpy.ndarray:
+        """
+        A getter for the label ids of the boxes in the collection.  The ids come from the shared LabelRegistry.
+
+        @return: A numpy.ndarray of int values, which are the label ids of the boxes, in collection order.
+        """
+        return numpy.fromiter((box.label_id for box in self.__boxes__), dtype=numpy.int32, count=len(self.__boxes__))
+
+    def snapshot(self) -> 'BoxList':
         """
-        Override of the iter function, which allows the collection to be used like a normal list.
+        Creates a snapshot of the collection, without copying it.  The snapshot and this collection share the same
+        list of boxes until either of them is changed, at which point the one being changed takes its own copy of the
+        list first.  Neither is affected by later changes to the other.
 
-        @return: A BoxList object, which is the iterable object.
+        Note that the Box objects themselves are shared, not copied.  Use CompactBox objects (which cannot be changed)
+        if the boxes must not change either.
+
+        @return: A BoxList object which holds the same boxes as this collection.
         """
-        self.iter_value = 0
-        return self
+        snapshot = BoxList()
+        snapshot.__boxes__ = self.__boxes__
+        snapshot.__spatial_index__ = self.__spatial_index__
+        snapshot.__shares_boxes__ = True
+        self.__shares_boxes__ = True
+
+        return snapshot
 
-    def __next__(self) -> Box:
+    def __copy__(self) -> 'BoxList':
         """
-        Override of the iter function, which allows the collection to be used like a normal list.
+        An override of the copy function, which returns a snapshot of the collection.
 
-        @return: A Box object, which is the next object in the collection.
+        @return: A BoxList object which holds the same boxes as this collection.
         """
-        if self.iter_value < self.size():
-            box = self.__boxes__[self.iter_value]
-            self.iter_value += 1
-            return box
-        else:
-            raise StopIteration
+        return self.snapshot()
 
     def __getitem__(self, key) -> Box:
         """
@@ -167,6 +352,7 @@ class BoxList:
         @param value:   A Box object, which is the box to replace an existing box with.
         @return:
         """
+        self.__before_change__()
         self.__boxes__[key] = value
 
     def __delitem__(self, key: int):
@@ -176,6 +362,7 @@ class BoxList:
         @param key:     An int, which is the index of the box to delete.
         @return:
         """
+        self.__before_change__()
         del self.__boxes__[key]
 
     def remove(self, box: Box):
@@ -185,6 +372,7 @@ class BoxList:
         @param box: A Box object which is to be removed from the collection.
         @return:
         """
+        self.__before_change__()
         self.__boxes__.remove(box)
 
     def __len__(self) -> int:
@@ -201,7 +389,88 @@ class BoxList:
 
         @return:
         """
+        self.__before_change__()
         def foo(e: Box):
             return e.get_area()
 
         self.__boxes__.sort(key=foo)
+
+    def areas(self) -> numpy.ndarray:
+        """
+        Gets the areas of all the boxes in the collection in one pass.
+
+        @return: A numpy.ndarray of float values, which are the areas of the boxes, in collection order.
+        """
+        return BoxMaths.get_areas(*self.__get_edge_arrays__())
+
+    def pairwise_overlap(self, other: 'BoxList') -> numpy.ndarray:
+        """
+        Gets the overlap area of every box in this collection with every box in another collection.  The values are the
+        same as calling Box.get_overlap_area() on each pair of boxes in turn.
+
+        @param other:   A BoxList object, which is the other collection of boxes.
+        @return:        A numpy.ndarray of shape (len(self), len(other)), where element [i, j] is the overlap area of
+                        box i in this collection with box j in the other collection.
+        """
+        return BoxMaths.get_pairwise_overlap_areas(self.__get_edge_arrays__(), other.__get_edge_arrays__())
+
+    def pairwise_iou(self, other: 'BoxList') -> numpy.ndarray:
+        """
+        Gets the Intersection over Union factor of every box in this collection with every box in another collection.
+        The values are the same as calling Box.get_iou() on each pair of boxes in turn.
+
+        @param other:   A BoxList object, which is the other collection of boxes.
+        @return:        A numpy.ndarray of shape (len(self), len(other)), where element [i, j] is the IoU factor of
+                        box i in this collection with box j in the other collection.
+        """
+        return BoxMaths.get_pairwise_ious(self.__get_edge_arrays__(), other.__get_edge_arrays__())
+
+    def __get_edge_arrays__(self) -> tuple:
+        """
+        Gathers the edges of all the boxes in the collection into arrays, for use in the vectorised functions.
+
+        @return: A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the boxes.
+        """
+        edges = [(box.left_edge, box.right_edge, box.lower_edge, box.upper_edge) for box in self.__boxes__]
+        edges = numpy.array(edges, dtype=numpy.float64).reshape(-1, 4)
+        return tuple(edges.T)
+
+    def __get_field_arrays__(self) -> (numpy.ndarray, numpy.ndarray):
+        """
+        Gathers the fields of all the boxes in the collection into arrays, for use in comparing collections.
+
+        @return:    A tuple of two numpy.ndarray objects.  The first has shape (N, 5), and holds the left, right, lower
+                    and upper edges and the confidence of each box.  The second holds the label id of each box.
+        """
+        fields = [(box.left_edge, box.right_edge, box.lower_edge, box.upper_edge, box.confidence)
+                  for box in self.__boxes__]
+
+        return numpy.array(fields, dtype=numpy.float64).reshape(-1, 5), self.get_label_ids()
+
+    def get_spatial_index(self, cells: int = 8) -> SpatialIndex:
+        """
+        Gets a SpatialIndex for the collection, which allows boxes to be found by position without checking every box.
+        The index is kept until the collection is changed, so repeated queries on an unchanged collection only build it
+        once.  Note that changing the edges of a Box after it has been added to the collection is not detected.
+
+        @param cells:   An int which is the number of grid cells to use across both the width and the height of the
+                        frame.  Defaults to 8.
+        @return:        A SpatialIndex object for the current contents of the collection.
+        """
+        if self.__spatial_index__ is None or self.__spatial_index__.get_cell_count() != cells:
+            self.__spatial_index__ = SpatialIndex(self, cells)
+
+        return self.__spatial_index__
+
+    def __before_change__(self):
+        """
+        Called by every function that changes the collection, before the change is made.  Throws away any data that has
+        been derived from the current contents of the collection, and takes a private copy of the list of boxes if it
+        is shared with a snapshot.
+
+        @return:
+        """
+        self.__spatial_index__ = None
+        if self.__shares_boxes__:
+            self.__boxes__ = list(self.__boxes__)
+            self.__shares_boxes__ = False
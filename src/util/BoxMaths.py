@@ -0,0 +1,141 @@
+import numpy
+
+
+def get_areas(left: numpy.ndarray, right: numpy.ndarray,
+              lower: numpy.ndarray, upper: numpy.ndarray) -> numpy.ndarray:
+    """
+    Calculates the areas of a series of boxes in one pass.  This is the array form of the Box.get_area() function.
+
+    @param left:    A numpy.ndarray of float values, which are the left edges of the boxes.
+    @param right:   A numpy.ndarray of float values, which are the right edges of the boxes.
+    @param lower:   A numpy.ndarray of float values, which are the lower edges of the boxes.
+    @param upper:   A numpy.ndarray of float values, which are the upper edges of the boxes.
+    @return:        A numpy.ndarray of float values, which are the areas of the boxes.
+    """
+    return (right - left) * (upper - lower)
+
+
+def get_pairwise_overlap_areas(edges: tuple, other_edges: tuple) -> numpy.ndarray:
+    """
+    Calculates the overlap area of every box in one series with every box in another series.  This is the array form of
+    the Box.get_overlap_area() function, and gives the same values for every pair of boxes.
+
+    @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        first series of N boxes.
+    @param other_edges: A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        second series of M boxes.
+    @return:            A numpy.ndarray of shape (N, M), where element [i, j] is the overlap area of box i with box j.
+    """
+    left, right, lower, upper = edges
+    other_left, other_right, other_lower, other_upper = other_edges
+
+    widths = numpy.minimum(right[:, None], other_right[None, :]) - numpy.maximum(left[:, None], other_left[None, :])
+    heights = numpy.minimum(upper[:, None], other_upper[None, :]) - numpy.maximum(lower[:, None], other_lower[None, :])
+    numpy.clip(widths, 0.0, None, out=widths)
+    numpy.clip(heights, 0.0, None, out=heights)
+
+    return widths * heights
+
+
+def get_pairwise_ious(edges: tuple, other_edges: tuple) -> numpy.ndarray:
+    """
+    Calculates the Intersection over Union factor of every box in one series with every box in another series.  This is
+    the array form of the Box.get_iou() function, and gives the same values for every pair of boxes.
+
+    @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        first series of N boxes.
+    @param other_edges: A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        second series of M boxes.
+    @return:            A numpy.ndarray of shape (N, M), where element [i, j] is the IoU factor of box i with box j.
+    """
+    intersections = get_pairwise_overlap_areas(edges, other_edges)
+    unions = get_areas(*edges)[:, None] + get_areas(*other_edges)[None, :] - intersections
+
+    # Match Box.get_iou(), which treats effectively zero intersections as no overlap at all.
+    ious = numpy.zeros_like(intersections)
+    numpy.divide(intersections, unions, out=ious, where=intersections >= 0.0000001)
+
+    return ious
+
+
+def get_paired_overlap_areas(edges: tuple, other_edges: tuple) -> numpy.ndarray:
+    """
+    Calculates the overlap area of each box in one series with the box at the same position in another series.
+
+    @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        first series of N boxes.
+    @param other_edges: A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        second series of N boxes.
+    @return:            A numpy.ndarray of N float values, where element i is the overlap area of box i of the first
+                        series with box i of the second series.
+    """
+    left, right, lower, upper = edges
+    other_left, other_right, other_lower, other_upper = other_edges
+
+    widths = numpy.clip(numpy.minimum(right, other_right) - numpy.maximum(left, other_left), 0.0, None)
+    heights = numpy.clip(numpy.minimum(upper, other_upper) - numpy.maximum(lower, other_lower), 0.0, None)
+
+    return widths * heights
+
+
+def get_horizontally_intersecting_pairs(left: numpy.ndarray, right: numpy.ndarray,
+                                        groups: numpy.ndarray | None = None) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Finds every pair of boxes in a series whose horizontal extents intersect, with a sweep along the horizontal axis.
+    The boxes are sorted by left edge, and the boxes which intersect each box, starting at or after its left edge, are
+    the run of boxes which start before its right edge.  Only these pairs need their overlap checked, which for boxes
+    spread across the frame is a small fraction of all the pairs.
+
+    If groups are given (such as the frame of each box in a batch), the sweep is done on (group, left edge) keys, so
+    only boxes in the same group are paired, and every group is swept in the same pass.
+
+    @param left:    A numpy.ndarray of float values, which are the left edges of the N boxes.
+    @param right:   A numpy.ndarray of float values, which are the right edges of the N boxes.
+    @param groups:  A numpy.ndarray of N non-negative int values, which are the group of each box, or None if every box
+                    is in the same group.
+    @return:        A tuple of two numpy.ndarray objects of int values, which are the indexes of the first and the
+                    second box of each pair.  Each pair is only given once, in no particular order.
+    """
+    left_keys = numpy.asarray(left)
+    right_keys = numpy.asarray(right)
+    if groups is not None:
+        # Replace each edge with its rank among all the edges, so that the group can be added to it exactly.  Every key
+        # of a group is then below every key of the next group, and the order of the edges within a group is kept.
+        values, ranks = numpy.unique(numpy.concatenate((left_keys, right_keys)), return_inverse=True)
+        group_offsets = numpy.asarray(groups, dtype=numpy.int64) * len(values)
+        left_keys = group_offsets + ranks[:len(left_keys)]
+        right_keys = group_offsets + ranks[len(left_keys):]
+
+    order = numpy.argsort(left_keys, kind="stable")
+    sorted_left = left_keys[order]
+    run_ends = numpy.searchsorted(sorted_left, right_keys[order], side="left")
+    run_lengths = numpy.maximum(run_ends - numpy.arange(len(order)) - 1, 0)
+
+    first_positions = numpy.repeat(numpy.arange(len(order)), run_lengths)
+    run_starts = numpy.cumsum(run_lengths) - run_lengths
+    second_positions = numpy.arange(run_lengths.sum()) - numpy.repeat(run_starts, run_lengths) + first_positions + 1
+
+    return order[first_positions], order[second_positions]
+
+
+def get_paired_ious(edges: tuple, other_edges: tuple) -> numpy.ndarray:
+    """
+    Calculates the Intersection over Union factor of each box in one series with the box at the same position in
+    another series.  This is for when only some pairs of boxes need to be compared, so the full matrix of
+    get_pairwise_ious() would be wasted work.
+
+    @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        first series of N boxes.
+    @param other_edges: A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        second series of N boxes.
+    @return:            A numpy.ndarray of N float values, where element i is the IoU factor of box i of the first
+                        series with box i of the second series.
+    """
+    intersections = get_paired_overlap_areas(edges, other_edges)
+    unions = get_areas(*edges) + get_areas(*other_edges) - intersections
+
+    # Match Box.get_iou(), which treats effectively zero intersections as no overlap at all.
+    ious = numpy.zeros_like(intersections)
+    numpy.divide(intersections, unions, out=ious, where=intersections >= 0.0000001)
+
+    return ious
@@ -0,0 +1,194 @@
+from util.Box import Box
+from util.LabelRegistry import get_label_registry
+
+__label_registry__ = get_label_registry()
+
+
+class CompactBox:
+    """
+    A compact, immutable form of the Box class.  It provides the same fields and functions as a Box, but has no
+    per-instance __dict__, and its area is calculated once when it is created.  As it cannot be changed, it compares and
+    hashes by value, and copying it (including with copy.deepcopy()) simply returns the same object.
+    """
+    __slots__ = ("left_edge", "right_edge", "lower_edge", "upper_edge", "confidence", "label_id", "__area__")
+
+    def __init__(self, left_edge: float, right_edge: float,
+                 lower_edge: float, upper_edge: float, confidence: float, label: str):
+        """
+        The constructor.
+
+        @param left_edge:   A float, which is the left edge, expressed as a decimal of the width of the frame.
+        @param right_edge:  A float, which is the right edge, expressed as a decimal of the width of the frame.
+        @param lower_edge:  A float, which is the lower edge, expressed as a decimal of the height of the frame.
+        @param upper_edge:  A float, which is the upper edge, expressed as a decimal of the height of the frame.
+        @param confidence:  A float, which is the detection confidence, on a scale of 0.0 (doubt) to 1.0 (certainty).
+        @param label:       A str, which is the classification of this item.
+        """
+        set_field = object.__setattr__
+        set_field(self, "left_edge", left_edge)
+        set_field(self, "right_edge", right_edge)
+        set_field(self, "lower_edge", lower_edge)
+        set_field(self, "upper_edge", upper_edge)
+        set_field(self, "confidence", confidence)
+        set_field(self, "label_id", __label_registry__.get_id(label))
+        set_field(self, "__area__", (right_edge - left_edge) * (upper_edge - lower_edge))
+
+    @classmethod
+    def from_box(cls, box) -> 'CompactBox':
+        """
+        A constructor function which creates a CompactBox with the same fields as the given box.  If the given box is
+        already a CompactBox then it is returned unchanged.
+
+        @param box: A Box (or CompactBox) object to copy the fields of.
+        @return:    A CompactBox object with the same fields as the given box.
+        """
+        if isinstance(box, CompactBox):
+            return box
+
+        return cls(box.left_edge, box.right_edge, box.lower_edge, box.upper_edge, box.confidence, box.label)
+
+    @property
+    def label(self) -> str:
+        """
+        A getter for the label of the box.  The label is stored as an int label id from the shared LabelRegistry.
+
+        @return: A str, which is the classification of this item.
+        """
+        return __label_registry__.get_label(self.label_id)
+
+    def to_box(self) -> Box:
+        """
+        Creates a normal (changeable) Box object with the same fields as this box.
+
+        @return: A Box object with the same fields as this box.
+        """
+        return Box(self.left_edge, self.right_edge, self.lower_edge, self.upper_edge, self.confidence, self.label)
+
+    def __setattr__(self, name, value):
+        """
+        An override of the setattr function, which stops the box from being changed after it has been created.
+
+        @param name:    The name of the attribute being set.
+        @param value:   The value the attribute was to be set to.
+        @return:
+        """
+        raise AttributeError("CompactBox objects cannot be changed.  Create a new CompactBox instead.")
+
+    def __delattr__(self, name):
+        """
+        An override of the delattr function, which stops the box from being changed after it has been created.
+
+        @param name:    The name of the attribute being deleted.
+        @return:
+        """
+        raise AttributeError("CompactBox objects cannot be changed.  Create a new CompactBox instead.")
+
+    def __key__(self) -> tuple:
+        """
+        Gathers the fields of the box into a tuple, for use in comparisons and hashing.
+
+        @return: A tuple of the left, right, lower and upper edges, the confidence and the label id.
+        """
+        return self.left_edge, self.right_edge, self.lower_edge, self.upper_edge, self.confidence, self.label_id
+
+    def __eq__(self, other) -> bool:
+        """
+        An override of the __eq__() function.  Two CompactBox objects are equal if all their fields are equal.
+
+        @param other:   The other object to check for equality.
+        @return:        A bool which describes if the given object is equal to this one.
+        """
+        if not isinstance(other, CompactBox):
+            return NotImplemented
+
+        return self.__key__() == other.__key__()
+
+    def __hash__(self) -> int:
+        """
+        An override of the __hash__() function, which is consistent with the __eq__() function.
+
+        @return: An int which is the hash of the fields of this box.
+        """
+        return hash(self.__key__())
+
+    def __copy__(self) -> 'CompactBox':
+        """
+        An override of the copy function.  As the box cannot be changed, there is no need to make a new one.
+
+        @return: This CompactBox object.
+        """
+        return self
+
+    def __deepcopy__(self, memo) -> 'CompactBox':
+        """
+        An override of the deepcopy function.  As the box cannot be changed, there is no need to make a new one.
+
+        @param memo:    The dict of already copied objects, used by copy.deepcopy().
+        @return:        This CompactBox object.
+        """
+        return self
+
+    def __reduce__(self) -> tuple:
+        """
+        An override of the reduce function, which allows the box to be pickled.
+
+        @return: A tuple of the class and the arguments needed to recreate this box.  The label is stored as a str, as
+                 label ids are only meaningful within one run of the program.
+        """
+        return CompactBox, (self.left_edge, self.right_edge, self.lower_edge, self.upper_edge, self.confidence,
+                            self.label)
+
+    def __str__(self) -> str:
+        """
+        An override of the str function.  Returns a string which summarises the contents of the box.  This is the same
+        string that a Box with the same fields would give.
+
+        @return:    A str which summarises the contents of the box.
+        """
+        return "left: " + str(self.left_edge) + ", right: " + str(self.right_edge) + \
+            ", lower: " + str(self.lower_edge) + ", upper: " + str(self.upper_edge) + \
+            ", conf: " + str(self.confidence) + ", label: " + str(self.label)
+
+    def get_overlap_area(self, overlapping_box) -> float:
+        """
+        Returns the absolute overlap area that this box shares with another box.  Returns 0.0 if the boxes do not
+        overlap.
+
+        @param overlapping_box: A Box (or CompactBox) object that this box may overlap with.
+        @return:                A float which is the overlap area between the two boxes.
+        """
+        if self.left_edge > overlapping_box.right_edge \
+                or self.right_edge < overlapping_box.left_edge \
+                or self.lower_edge > overlapping_box.upper_edge \
+                or self.upper_edge < overlapping_box.lower_edge:
+            return 0.0
+
+        overlap_upper_edge = min(self.upper_edge, overlapping_box.upper_edge)
+        overlap_lower_edge = max(self.lower_edge, overlapping_box.lower_edge)
+        overlap_left_edge = max(self.left_edge, overlapping_box.left_edge)
+        overlap_right_edge = min(self.right_edge, overlapping_box.right_edge)
+
+        return (overlap_upper_edge - overlap_lower_edge) * (overlap_right_edge - overlap_left_edge)
+
+    def get_iou(self, other_box) -> float:
+        """
+        Returns the Intersection over Union factor for this box and the given box.  Returns 0.0 if the boxes do not
+        overlap.
+
+        @param other_box:   A Box (or CompactBox) object with which to get the IoU factor of this box with.
+        @return:            A float, which is the IoU factor of the given box with this one.
+        """
+        intersection_area = self.get_overlap_area(other_box)
+
+        if intersection_area < 0.0000001:
+            return 0.0
+
+        return intersection_area / (self.__area__ + other_box.get_area() - intersection_area)
+
+    def get_area(self) -> float:
+        """
+        Gets the area of the box.  This was calculated when the box was created.
+
+        @return: A float, which is the area of this box.
+        """
+        return self.__area__
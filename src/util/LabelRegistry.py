@@ -0,0 +1,143 @@
+import numpy
+
+
+def __get_as_str__(string) -> str:
+    """
+    A helper function to make sure that a given string is in str format, and not a bytestring.
+
+    @param string:  A string that may or may not be a bytestring.
+    @return:        A str, which is the same as the given string.
+    """
+    if isinstance(string, (bytes, bytearray)):
+        return str(string, "utf-8")
+    elif isinstance(string, str):
+        return string
+    else:
+        return str(string)
+
+
+class LabelRegistry:
+    """
+    A class to map item labels to small int label ids.  Each label is given an id the first time it is seen, and keeps
+    that id for the rest of the program, so boxes can carry (and be compared by) their label id, and the label string is
+    only needed when something is shown to the user.
+
+    Bytestring labels (as returned by the detection model) are given the same id as the matching str label, and are only
+    decoded the first time they are seen.
+
+    A single registry is shared by the whole program.  Use the get_label_registry() function to access it.
+    """
+    def __init__(self):
+        """
+        The constructor.  Initialises the registry with no labels.
+        """
+        self.__labels__: list = list()
+        self.__label_array__: numpy.ndarray = numpy.empty(0, dtype=object)
+        self.__ids__: dict = dict()
+
+    def get_id(self, label) -> int:
+        """
+        Gets the label id for the given label, adding a new id if this label has not been seen before.
+
+        @param label:   A str (or bytestring) which is the label to get the id of.
+        @return:        An int which is the label id.
+        """
+        if isinstance(label, bytearray):
+            label = bytes(label)
+
+        label_id = self.__ids__.get(label)
+        if label_id is None:
+            label_str = __get_as_str__(label)
+            label_id = self.__ids__.get(label_str)
+            if label_id is None:
+                label_id = len(self.__labels__)
+                self.__labels__.append(label_str)
+                self.__ids__[label_str] = label_id
+            self.__ids__[label] = label_id
+        return label_id
+
+    def find_id(self, label) -> int:
+        """
+        Gets the label id for the given label, without adding a new id if this label has not been seen before.  This is
+        for searches, where a label that has never been seen cannot match anything.
+
+        @param label:   A str (or bytestring) which is the label to get the id of.
+        @return:        An int which is the label id, or -1 if the label has not been seen before.
+        """
+        if isinstance(label, bytearray):
+            label = bytes(label)
+
+        label_id = self.__ids__.get(label)
+        if label_id is None:
+            label_id = self.__ids__.get(__get_as_str__(label), -1)
+        return label_id
+
+    def get_ids(self, labels) -> frozenset:
+        """
+        Gets the label ids for a collection of labels, adding new ids for any labels that have not been seen before.
+        This is for sets of labels which are checked against many boxes, so each check is a single int lookup.
+
+        @param labels:  A collection of str (or bytestring) values, which are the labels to get the ids of.
+        @return:        A frozenset of int values, which are the label ids.
+        """
+        return frozenset(self.get_id(label) for label in labels)
+
+    def get_label(self, label_id: int) -> str:
+        """
+        Converts a label id back into the label it stands for.
+
+        @param label_id:    An int which is a label id from this registry.
+        @return:            A str which is the label for the given id.
+        """
+        return self.__labels__[label_id]
+
+    def get_labels(self, label_ids) -> numpy.ndarray:
+        """
+        Converts an array of label ids back into the labels they stand for, in one pass.
+
+        @param label_ids:   A numpy.ndarray of int values, which are label ids from this registry.
+        @return:            A numpy.ndarray of str values (with an object dtype), which are the labels.
+        """
+        if len(self.__label_array__) != len(self.__labels__):
+            self.__label_array__ = numpy.empty(len(self.__labels__), dtype=object)
+            self.__label_array__[:] = self.__labels__
+        return self.__label_array__[numpy.asarray(label_ids, dtype=numpy.intp)]
+
+    def add_labels(self, labels):
+        """
+        Adds a vocabulary of labels to the registry in one go, such as the full list of classes a detection model can
+        return.  Labels which are already in the registry keep their ids.
+
+        @param labels:  A collection of str (or bytestring) values, which are the labels to add.
+        @return:
+        """
+        for label in labels:
+            self.get_id(label)
+
+    def size(self) -> int:
+        """
+        A getter for the number of labels in the registry.
+
+        @return: An int which is the number of labels that have been given an id.
+        """
+        return len(self.__labels__)
+
+    def __len__(self) -> int:
+        """
+        An override of the len function.
+
+        @return: An int which is the number of labels that have been given an id.
+        """
+        return len(self.__labels__)
+
+
+__shared_registry__: LabelRegistry = LabelRegistry()
+
+
+def get_label_registry() -> LabelRegistry:
+    """
+    A getter for the label registry which is shared by the whole program.
+
+    @return: The shared LabelRegistry object.
+    """
+    return __shared_registry__
@@ -0,0 +1,210 @@
+import numpy
+
+
+class SpatialIndex:
+    """
+    A class to find the boxes in a collection by their position, without checking every box in the collection.  The
+    frame is divided into a uniform grid of cells, and each box is recorded against every cell it covers.  The lower
+    edges are also kept in sorted order.  Queries then only need to check the boxes in the relevant cells.
+
+    All the query functions return the indexes of the matching boxes in the collection, in collection order (apart from
+    get_k_nearest(), which returns them nearest first).  The index is a snapshot of the collection when it was built,
+    and should be rebuilt if the collection changes.  The BoxList.get_spatial_index() function does this automatically.
+    """
+
+    def __init__(self, boxes, cells: int = 8):
+        """
+        The constructor.  Builds the index for the given collection.
+
+        @param boxes:   A BoxList object, which is the collection to index.
+        @param cells:   An int which is the number of grid cells to use across both the width and the height of the
+                        frame.  Defaults to 8.
+        """
+        left, right, lower, upper, _ = boxes.views()
+        self.__cells__: int = cells
+        self.__left__: numpy.ndarray = left
+        self.__right__: numpy.ndarray = right
+        self.__lower__: numpy.ndarray = lower
+        self.__upper__: numpy.ndarray = upper
+
+        columns = self.__get_cell_range__(left, right)
+        rows = self.__get_cell_range__(lower, upper)
+        self.__grid_starts__, self.__grid_boxes__ = self.__build_cells__(columns, rows)
+        no_rows = numpy.zeros_like(rows[0])
+        self.__column_starts__, self.__column_boxes__ = self.__build_cells__(columns, (no_rows, no_rows))
+
+        self.__centre_x__: numpy.ndarray = (left + right) / 2
+        self.__centre_y__: numpy.ndarray = (lower + upper) / 2
+        centre_columns = self.__get_cell__(self.__centre_x__)
+        centre_rows = self.__get_cell__(self.__centre_y__)
+        self.__centre_starts__, self.__centre_boxes__ = self.__build_cells__((centre_columns, centre_columns),
+                                                                             (centre_rows, centre_rows))
+
+        self.__lower_order__: numpy.ndarray = numpy.argsort(lower, kind="stable")
+        self.__sorted_lower__: numpy.ndarray = lower[self.__lower_order__]
+
+    def get_cell_count(self) -> int:
+        """
+        A getter for the number of grid cells across the width and height of the frame.
+
+        @return: An int which is the number of cells along each side of the grid.
+        """
+        return self.__cells__
+
+    def get_overlapping(self, region) -> numpy.ndarray:
+        """
+        Finds the boxes which overlap (with a non-zero area) with the given region.
+
+        @param region:  A Box object which describes the region.  Only its edges are used.
+        @return:        A numpy.ndarray of int values, which are the indexes of the overlapping boxes.
+        """
+        first_column, last_column = map(int, self.__get_cell_range__(region.left_edge, region.right_edge))
+        first_row, last_row = map(int, self.__get_cell_range__(region.lower_edge, region.upper_edge))
+
+        slices = list()
+        for row in range(first_row, last_row + 1):
+            start = self.__grid_starts__[row * self.__cells__ + first_column]
+            end = self.__grid_starts__[row * self.__cells__ + last_column + 1]
+            slices.append(self.__grid_boxes__[start:end])
+        candidates = numpy.unique(numpy.concatenate(slices))
+
+        overlapping = (self.__left__[candidates] < region.right_edge) \
+            & (self.__right__[candidates] > region.left_edge) \
+            & (self.__lower__[candidates] < region.upper_edge) \
+            & (self.__upper__[candidates] > region.lower_edge)
+
+        return candidates[overlapping]
+
+    def get_horizontally_intersecting(self, left_edge: float, right_edge: float) -> numpy.ndarray:
+        """
+        Finds the boxes whose horizontal extent intersects (with a non-zero width) with the given horizontal extent.
+
+        @param left_edge:   A float which is the left edge of the extent, as a decimal of the width of the frame.
+        @param right_edge:  A float which is the right edge of the extent, as a decimal of the width of the frame.
+        @return:            A numpy.ndarray of int values, which are the indexes of the intersecting boxes.
+        """
+        first_column, last_column = map(int, self.__get_cell_range__(left_edge, right_edge))
+        candidates = numpy.unique(self.__column_boxes__[self.__column_starts__[first_column]:
+                                                        self.__column_starts__[last_column + 1]])
+
+        intersecting = (self.__left__[candidates] < right_edge) & (self.__right__[candidates] > left_edge)
+
+        return candidates[intersecting]
+
+    def get_below(self, y: float) -> numpy.ndarray:
+        """
+        Finds the boxes whose lower edges are below the given height.
+
+        @param y:   A float which is the height, as a decimal of the height of the frame.
+        @return:    A numpy.ndarray of int values, which are the indexes of the boxes with a lower edge below y.
+        """
+        count = numpy.searchsorted(self.__sorted_lower__, y, side="left")
+        return numpy.sort(self.__lower_order__[:count])
+
+    def get_above(self, y: float) -> numpy.ndarray:
+        """
+        Finds the boxes whose lower edges are above the given height.
+
+        @param y:   A float which is the height, as a decimal of the height of the frame.
+        @return:    A numpy.ndarray of int values, which are the indexes of the boxes with a lower edge above y.
+        """
+        count = numpy.searchsorted(self.__sorted_lower__, y, side="right")
+        return numpy.sort(self.__lower_order__[count:])
+
+    def get_k_nearest(self, x: float, y: float, k: int) -> numpy.ndarray:
+        """
+        Finds the k boxes whose centres are nearest to the given point.  The grid is searched in rings of cells outwards
+        from the point, and the search stops as soon as no unsearched cell can hold a nearer box.
+
+        @param x:   A float which is the horizontal position of the point, as a decimal of the width of the frame.
+        @param y:   A float which is the vertical position of the point, as a decimal of the height of the frame.
+        @param k:   An int which is the number of boxes to find.
+        @return:    A numpy.ndarray of int values, which are the indexes of the nearest boxes, nearest first.
+        """
+        k = min(k, len(self.__centre_x__))
+        if k <= 0:
+            return numpy.empty(0, dtype=numpy.intp)
+
+        column = int(self.__get_cell__(x))
+        row = int(self.__get_cell__(y))
+        cell_size = 1.0 / self.__cells__
+        found = list()
+        ring = 0
+
+        while True:
+            found.extend(self.__get_ring__(column, row, ring))
+            candidates = numpy.concatenate(found) if found else numpy.empty(0, dtype=numpy.intp)
+            if len(candidates) >= k:
+                distances = numpy.hypot(self.__centre_x__[candidates] - x, self.__centre_y__[candidates] - y)
+                if ring >= self.__cells__ or numpy.partition(distances, k - 1)[k - 1] <= ring * cell_size:
+                    order = numpy.lexsort((candidates, distances))[:k]
+                    return candidates[order]
+            ring += 1
+
+    def __get_ring__(self, column: int, row: int, ring: int) -> list:
+        """
+        Gets the boxes whose centres are in the square ring of cells at the given distance from the given cell.
+
+        @param column:  An int which is the column of the centre cell.
+        @param row:     An int which is the row of the centre cell.
+        @param ring:    An int which is the distance of the ring from the centre cell, in cells.
+        @return:        A list of numpy.ndarray objects, which hold the indexes of the boxes in the ring.
+        """
+        cells = self.__cells__
+        slices = list()
+        for ring_row in range(max(row - ring, 0), min(row + ring, cells - 1) + 1):
+            if abs(ring_row - row) == ring:
+                ring_columns = range(max(column - ring, 0), min(column + ring, cells - 1) + 1)
+            else:
+                ring_columns = [c for c in (column - ring, column + ring) if 0 <= c < cells]
+            for ring_column in ring_columns:
+                cell = ring_row * cells + ring_column
+                slices.append(self.__centre_boxes__[self.__centre_starts__[cell]:self.__centre_starts__[cell + 1]])
+        return slices
+
+    def __get_cell__(self, position):
+        """
+        Converts a position (or array of positions) into the grid cell that contains it.  Positions outside the frame
+        are put into the nearest edge cell.
+
+        @param position:    A float (or numpy.ndarray of float values), which is a decimal of the frame size.
+        @return:            An int (or numpy.ndarray of int values), which is the cell index.
+        """
+        return numpy.clip(numpy.floor(numpy.asarray(position) * self.__cells__), 0, self.__cells__ - 1).astype(int)
+
+    def __get_cell_range__(self, start, end) -> tuple:
+        """
+        Converts the extent of a box (or boxes) along one axis into the first and last cells it covers.
+
+        @param start:   A float (or numpy.ndarray of float values), which is the start of the extent.
+        @param end:     A float (or numpy.ndarray of float values), which is the end of the extent.
+        @return:        A tuple of the first and last cells covered.
+        """
+        first = self.__get_cell__(start)
+        last = numpy.maximum(self.__get_cell__(end), first)
+        return first, last
+
+    def __build_cells__(self, columns: tuple, rows: tuple) -> tuple:
+        """
+        Records each box against every cell it covers.  The result is stored as a list of box indexes sorted by cell,
+        along with the position in that list where each cell starts.
+
+        @param columns: A tuple of two numpy.ndarray objects, which are the first and last columns covered by each box.
+        @param rows:    A tuple of two numpy.ndarray objects, which are the first and last rows covered by each box.
+        @return:        A tuple of two numpy.ndarray objects.  The first holds the start position of each cell (and one
+                        extra value, which is the end of the last cell).  The second holds the box indexes.
+        """
+        widths = columns[1] - columns[0] + 1
+        heights = rows[1] - rows[0] + 1
+        counts = widths * heights
+
+        boxes = numpy.repeat(numpy.arange(len(counts)), counts)
+        offsets = numpy.arange(len(boxes)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        box_widths = numpy.repeat(widths, counts)
+        cells = (numpy.repeat(rows[0], counts) + offsets // box_widths) * self.__cells__ \
+            + numpy.repeat(columns[0], counts) + offsets % box_widths
+
+        order = numpy.argsort(cells, kind="stable")
+        starts = numpy.searchsorted(cells[order], numpy.arange(self.__cells__ * self.__cells__ + 1))
+
+        return starts, boxes[order]
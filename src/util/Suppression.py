@@ -0,0 +1,134 @@
+import numpy
+
+from util import BoxMaths
+
+
+def get_nms_keep_mask(edges: tuple, scores, groups=None, overlap_threshold: float = 0.5, score_threshold: float = 0.0,
+                      eta: float | None = None, top_k: int | None = None) -> numpy.ndarray:
+    """
+    Performs Non-Maximum Suppression (NMS) on a series of boxes.  The boxes are taken in descending order of score, and
+    each one is kept unless it overlaps a box which has already been kept by more than the overlap threshold.  This
+    follows cv2.dnn.NMSBoxes(), but works on the float edges directly, and can be limited to boxes in the same group
+    (such as boxes with the same label), so that items of one type never suppress items of another.
+
+    The IoU factors are found in one vectorised pass, and the highest IoU of each box with the kept boxes is updated in
+    one pass each time a box is kept, so the only work done box by box is deciding whether to keep it.
+
+    @param edges:               A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges
+                                of the N boxes.
+    @param scores:              A numpy.ndarray of N float values, which are the scores of the boxes.
+    @param groups:              A numpy.ndarray of N values, where boxes can only suppress boxes with the same value, or
+                                None to let any box suppress any other box.
+    @param overlap_threshold:   A float which is the IoU factor a box must be above to be suppressed.
+    @param score_threshold:     A float which is the score a box must be above to be kept at all.
+    @param eta:                 A float which the overlap threshold is multiplied by after each box is kept, while the
+                                threshold is above 0.5, as in adaptive NMS.  None (or 1.0) keeps the threshold fixed.
+    @param top_k:               An int which is the largest number of boxes (with the highest scores) to consider, or
+                                None to consider every box.
+    @return:                    A numpy.ndarray of N bool values, which are True for each box that should be kept.
+    """
+    scores = numpy.asarray(scores, dtype=numpy.float64).reshape(-1)
+    candidates = __get_candidates__(scores, score_threshold, top_k)
+    keep_mask = numpy.zeros(len(scores), dtype=bool)
+    if not candidates.size:
+        return keep_mask
+
+    ious = __get_grouped_ious__(edges, groups, candidates)
+    max_iou_with_kept = numpy.zeros(len(candidates), dtype=numpy.float64)
+    threshold = overlap_threshold
+    for position in range(len(candidates)):
+        if max_iou_with_kept[position] > threshold:
+            continue
+
+        keep_mask[candidates[position]] = True
+        numpy.maximum(max_iou_with_kept, ious[position], out=max_iou_with_kept)
+        if eta is not None and eta < 1.0 and threshold > 0.5:
+            threshold *= eta
+
+    return keep_mask
+
+
+def get_soft_nms_scores(edges: tuple, scores, groups=None, sigma: float = 0.5, score_threshold: float = 0.001,
+                        top_k: int | None = None) -> (numpy.ndarray, numpy.ndarray):
+    """
+    Performs Soft Non-Maximum Suppression on a series of boxes, with a Gaussian penalty.  Rather than removing every box
+    which overlaps a kept box, the scores of the overlapping boxes are reduced by how much they overlap, and a box is
+    only removed once its score falls below the score threshold.  This keeps items which really do overlap, such as
+    items on a table, while still removing duplicate boxes.
+
+    @param edges:           A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of
+                            the N boxes.
+    @param scores:          A numpy.ndarray of N float values, which are the scores of the boxes.
+    @param groups:          A numpy.ndarray of N values, where boxes can only reduce the scores of boxes with the same
+                            value, or None to let any box reduce the score of any other box.
+    @param sigma:           A float which is the width of the Gaussian penalty.  Smaller values suppress more strongly.
+    @param score_threshold: A float which is the score a box must stay above to be kept.
+    @param top_k:           An int which is the largest number of boxes (with the highest scores) to consider, or None
+                            to consider every box.
+    @return:                A tuple of two numpy.ndarray objects.  The first holds N bool values, which are True for
+                            each box that should be kept.  The second holds the N reduced scores, which are 0.0 for
+                            boxes that were not kept.
+    """
+    if sigma <= 0.0:
+        raise ValueError("The Soft-NMS sigma must be above 0.")
+
+    scores = numpy.asarray(scores, dtype=numpy.float64).reshape(-1)
+    candidates = __get_candidates__(scores, score_threshold, top_k)
+    keep_mask = numpy.zeros(len(scores), dtype=bool)
+    new_scores = numpy.zeros(len(scores), dtype=numpy.float64)
+    if not candidates.size:
+        return keep_mask, new_scores
+
+    penalties = numpy.exp(-(__get_grouped_ious__(edges, groups, candidates) ** 2) / sigma)
+    candidate_scores = scores[candidates]
+    remaining = numpy.ones(len(candidates), dtype=bool)
+    while remaining.any():
+        position = numpy.flatnonzero(remaining)[numpy.argmax(candidate_scores[remaining])]
+        remaining[position] = False
+        keep_mask[candidates[position]] = True
+        new_scores[candidates[position]] = candidate_scores[position]
+
+        candidate_scores[remaining] *= penalties[position, remaining]
+        remaining &= candidate_scores > score_threshold
+
+    return keep_mask, new_scores
+
+
+def __get_candidates__(scores: numpy.ndarray, score_threshold: float, top_k: int | None) -> numpy.ndarray:
+    """
+    Finds the boxes which are considered for suppression, in descending order of score.  Boxes with equal scores keep
+    their original order.
+
+    @param scores:          A numpy.ndarray of float values, which are the scores of the boxes.
+    @param score_threshold: A float which is the score a box must be above to be considered.
+    @param top_k:           An int which is the largest number of boxes to consider, or None for no limit.
+    @return:                A numpy.ndarray of int values, which are the indexes of the boxes to consider.
+    """
+    candidates = numpy.flatnonzero(scores > score_threshold)
+    candidates = candidates[numpy.argsort(-scores[candidates], kind="stable")]
+    if top_k is not None and top_k > 0:
+        candidates = candidates[:int(top_k)]
+
+    return candidates
+
+
+def __get_grouped_ious__(edges: tuple, groups, candidates: numpy.ndarray) -> numpy.ndarray:
+    """
+    Calculates the IoU factor of every candidate box with every other candidate box, with pairs of boxes in different
+    groups treated as not overlapping.
+
+    @param edges:       A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges of the
+                        boxes.
+    @param groups:      A numpy.ndarray of values, which are the groups of the boxes, or None if there are no groups.
+    @param candidates:  A numpy.ndarray of C int values, which are the indexes of the candidate boxes.
+    @return:            A numpy.ndarray of shape (C, C), where element [i, j] is the IoU factor of candidate i with
+                        candidate j.
+    """
+    candidate_edges = tuple(numpy.asarray(edge, dtype=numpy.float64)[candidates] for edge in edges)
+    ious = BoxMaths.get_pairwise_ious(candidate_edges, candidate_edges)
+    if groups is not None:
+        candidate_groups = numpy.asarray(groups)[candidates]
+        ious[candidate_groups[:, None] != candidate_groups[None, :]] = 0.0
+    numpy.fill_diagonal(ious, 0.0)
+
+    return ious
@@ -0,0 +1,184 @@
+import numpy
+
+
+class TrackHistory:
+    """
+    A class to hold the recent history of a tracked item, as a fixed number of (frame, box) samples.  The samples are
+    stored in one array which is allocated when the history is created, and used as a ring: once it is full, each new
+    sample overwrites the oldest one.  This means that adding a sample never allocates memory, and the history of a
+    track takes the same amount of memory however long the track lasts.
+
+    Each sample is stored as a row of the frame number, the left, right, lower and upper edges of the box, and its
+    detection confidence.  The helper functions work on all the stored samples at once.
+    """
+    __frame_column__: int = 0
+    __edge_columns__: slice = slice(1, 5)
+    __confidence_column__: int = 5
+
+    def __init__(self, depth: int = 16):
+        """
+        The constructor.  Initialises the history with no samples.
+
+        @param depth:   An int which is the number of samples to keep.  Must be at least 1.
+        """
+        if depth < 1:
+            raise ValueError("A TrackHistory must be able to hold at least one sample.")
+
+        self.__samples__: numpy.ndarray = numpy.empty((depth, 6), dtype=numpy.float64)
+        self.__next_row__: int = 0
+        self.__count__: int = 0
+
+    def append(self, frame: int, box):
+        """
+        Adds a new sample to the history, overwriting the oldest sample if the history is full.
+
+        @param frame:   An int which is the frame number the box was seen on.
+        @param box:     A Box (or CompactBox) object which is the box that was seen.
+        @return:
+        """
+        row = self.__samples__[self.__next_row__]
+        row[0] = frame
+        row[1] = box.left_edge
+        row[2] = box.right_edge
+        row[3] = box.lower_edge
+        row[4] = box.upper_edge
+        row[5] = box.confidence
+
+        self.__next_row__ = (self.__next_row__ + 1) % len(self.__samples__)
+        self.__count__ = min(self.__count__ + 1, len(self.__samples__))
+
+    @classmethod
+    def from_samples(cls, samples: numpy.ndarray, depth: int) -> 'TrackHistory':
+        """
+        A constructor function which creates a history holding the given samples, such as those saved from another
+        history with get_samples().
+
+        @param samples: A numpy.ndarray of shape (N, 6), which are the samples in the same form as get_samples(), oldest
+                        first.  If there are more than the depth, only the most recent are kept.
+        @param depth:   An int which is the number of samples the history can hold.
+        @return:        A TrackHistory object which holds the given samples.
+        """
+        history = cls(depth)
+        samples = numpy.asarray(samples, dtype=numpy.float64).reshape(-1, 6)[-depth:]
+        history.__samples__[:len(samples)] = samples
+        history.__count__ = len(samples)
+        history.__next_row__ = len(samples) % depth
+        return history
+
+    def copy(self) -> 'TrackHistory':
+        """
+        Creates a copy of the history, which is not affected by later samples added to this one.
+
+        @return: A TrackHistory object which holds the same samples as this history.
+        """
+        history = TrackHistory(len(self.__samples__))
+        history.__samples__[:] = self.__samples__
+        history.__next_row__ = self.__next_row__
+        history.__count__ = self.__count__
+        return history
+
+    def depth(self) -> int:
+        """
+        A getter for the number of samples that the history can hold.
+
+        @return: An int which is the maximum number of samples.
+        """
+        return len(self.__samples__)
+
+    def __len__(self) -> int:
+        """
+        An override of the len function.
+
+        @return: An int which is the number of samples currently held.
+        """
+        return self.__count__
+
+    def get_samples(self, samples: int | None = None) -> numpy.ndarray:
+        """
+        Gets the most recent samples, oldest first.
+
+        @param samples: An int which is the number of samples to get.  If None, or more than the number of samples
+                        held, all the samples are returned.
+        @return:        A numpy.ndarray of shape (N, 6), where each row is the frame number, the left, right, lower and
+                        upper edges, and the confidence of a sample.
+        """
+        count = self.__count__ if samples is None else max(min(samples, self.__count__), 0)
+        rows = numpy.arange(self.__next_row__ - count, self.__next_row__) % len(self.__samples__)
+        return self.__samples__[rows]
+
+    def get_frames(self, samples: int | None = None) -> numpy.ndarray:
+        """
+        Gets the frame numbers of the most recent samples, oldest first.
+
+        @param samples: An int which is the number of samples to use.  If None, all the samples are used.
+        @return:        A numpy.ndarray of int values, which are the frame numbers.
+        """
+        return self.get_samples(samples)[:, TrackHistory.__frame_column__].astype(numpy.int64)
+
+    def get_edges(self, samples: int | None = None) -> numpy.ndarray:
+        """
+        Gets the edges of the boxes of the most recent samples, oldest first.
+
+        @param samples: An int which is the number of samples to use.  If None, all the samples are used.
+        @return:        A numpy.ndarray of shape (N, 4), where each row is the left, right, lower and upper edges of a
+                        box.
+        """
+        return self.get_samples(samples)[:, TrackHistory.__edge_columns__]
+
+    def get_smoothed_edges(self, samples: int | None = None) -> numpy.ndarray:
+        """
+        Gets a smoothed version of the most recent box, which is the average of the edges of the recent samples,
+        weighted by their detection confidence.
+
+        @param samples: An int which is the number of samples to average over.  If None, all the samples are used.
+        @return:        A numpy.ndarray of four float values, which are the smoothed left, right, lower and upper
+                        edges.  If there are no samples, the values are all NaN.
+        """
+        recent = self.get_samples(samples)
+        if len(recent) == 0:
+            return numpy.full(4, numpy.nan)
+
+        weights = numpy.maximum(recent[:, TrackHistory.__confidence_column__], 1e-9)
+        return numpy.average(recent[:, TrackHistory.__edge_columns__], axis=0, weights=weights)
+
+    def get_velocity(self, samples: int | None = None) -> numpy.ndarray:
+        """
+        Estimates how fast the centre of the box is moving, with a least squares fit of the centre positions of the
+        recent samples against their frame numbers.  Gaps between samples (frames the item was not seen in) are taken
+        into account.
+
+        @param samples: An int which is the number of samples to fit.  If None, all the samples are used.
+        @return:        A numpy.ndarray of two float values, which are the horizontal and vertical change in the centre
+                        of the box in each frame.  If there are fewer than two samples, both values are zero.
+        """
+        recent = self.get_samples(samples)
+        frames = recent[:, TrackHistory.__frame_column__]
+        if len(recent) < 2 or frames[-1] == frames[0]:
+            return numpy.zeros(2)
+
+        edges = recent[:, TrackHistory.__edge_columns__]
+        centres = numpy.stack(((edges[:, 0] + edges[:, 1]) / 2.0, (edges[:, 2] + edges[:, 3]) / 2.0), axis=1)
+        frame_offsets = frames - frames.mean()
+        return frame_offsets @ (centres - centres.mean(axis=0)) / (frame_offsets @ frame_offsets)
+
+    def get_dwell_time(self, max_movement: float = 0.05) -> int:
+        """
+        Gets how long the item has stayed in its current position, which is the number of frames from the first sample
+        after the centre of the box was last more than the given distance from where it is now, up to the latest
+        sample.  This can be no more than the span of the samples held.
+
+        @param max_movement:    A float which is how far the centre may move while still counting as the same position,
+                                as a decimal of the size of the frame.
+        @return:                An int which is the number of frames the item has stayed in its current position.
+        """
+        recent = self.get_samples()
+        if len(recent) == 0:
+            return 0
+
+        edges = recent[:, TrackHistory.__edge_columns__]
+        centres = numpy.stack(((edges[:, 0] + edges[:, 1]) / 2.0, (edges[:, 2] + edges[:, 3]) / 2.0), axis=1)
+        moved = numpy.hypot(*(centres - centres[-1]).T) > max_movement
+        first_still_sample = numpy.flatnonzero(moved)[-1] + 1 if moved.any() else 0
+
+        frames = recent[:, TrackHistory.__frame_column__]
+        return int(frames[-1] - frames[first_still_sample])
@@ -0,0 +1,43 @@
+import unittest
+
+import numpy
+
+from util import Appearance
+
+
+class AppearanceTests(unittest.TestCase):
+    def test_histograms_describe_the_inside_of_each_box(self):
+        """
+        Tests that the histogram of each box only counts the pixels inside that box, and is normalised.
+
+        @return:
+        """
+        hsv_image = numpy.zeros((100, 200, 3), dtype=numpy.uint8)
+        hsv_image[:, :100] = (10, 200, 200)
+        hsv_image[:, 100:] = (120, 200, 50)
+        edges = (numpy.array([0.0, 0.5, 0.25]), numpy.array([0.5, 1.0, 0.75]),
+                 numpy.array([0.0, 0.0, 0.0]), numpy.array([1.0, 1.0, 1.0]))
+
+        histograms = Appearance.get_hsv_histograms(hsv_image, edges)
+
+        self.assertEqual((3, 128), histograms.shape)
+        self.assertTrue(numpy.allclose(1.0, histograms.sum(axis=1)))
+        self.assertEqual(1, numpy.count_nonzero(histograms[0]))
+        self.assertEqual(1, numpy.count_nonzero(histograms[1]))
+        self.assertTrue(numpy.allclose(0.5, histograms[2][histograms[2] > 0]))
+
+    def test_similarities(self):
+        """
+        Tests that identical histograms have a similarity of 1, and histograms with nothing in common have a similarity
+        of 0.
+
+        @return:
+        """
+        histograms = numpy.array([[1.0, 0.0, 0.0], [0.0, 0.5, 0.5]])
+        other_histograms = numpy.array([[0.0, 0.5, 0.5], [1.0, 0.0, 0.0]])
+
+        similarities = Appearance.get_histogram_similarities(histograms, other_histograms)
+
+        self.assertTrue(numpy.allclose([[0.0, 1.0], [1.0, 0.0]], similarities))
+        self.assertTrue(numpy.allclose([0.0, 0.0],
+                                       Appearance.get_paired_histogram_similarities(histograms, other_histograms)))
@@ -0,0 +1,298 @@
+import unittest
+
+import numpy
+
+from util.ArrayBoxList import ArrayBoxList
+from util.Box import Box
+from util.BoxList import BoxList
+
+
+class ArrayBoxListTests(unittest.TestCase):
+
+    def test_can_add_and_get_boxes(self):
+        """
+        Tests that boxes added to the collection are returned as the same objects.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_0 = Box(0.2, 0.3, 0.2, 0.3, 0.5, "test1")
+        box_1 = Box(0.1, 0.3, 0.2, 0.3, 0.5, "test2")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+
+        self.assertIs(box_0, box_collection.get(0))
+        self.assertIs(box_1, box_collection[1])
+        self.assertEqual(None, box_collection.get(2))
+
+    def test_grows_past_initial_capacity(self):
+        """
+        Tests that the collection can hold more boxes than it initially allocated space for.
+
+        @return:
+        """
+        box_collection = ArrayBoxList(capacity=2)
+        boxes = [Box(0.0, 0.1 * i, 0.0, 0.1, 0.5, "test" + str(i)) for i in range(1, 6)]
+
+        for box in boxes:
+            box_collection.add(box)
+
+        self.assertEqual(5, box_collection.size())
+        for i in range(5):
+            self.assertIs(boxes[i], box_collection[i])
+
+    def test_matches_box_list_string_and_equality(self):
+        """
+        Tests that the collection gives the same summary string as a BoxList holding the same boxes, and compares as
+        equal to it.
+
+        @return:
+        """
+        box_list = BoxList()
+        array_box_list = ArrayBoxList()
+        for box in [Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1"), Box(0.1, 0.4, 0.1, 0.6, 0.5, b"test2")]:
+            box_list.add(box)
+            array_box_list.add(box)
+
+        self.assertEqual(str(box_list), str(array_box_list))
+        self.assertEqual(box_list, array_box_list)
+
+    def test_sort_by_area_and_confidence(self):
+        """
+        Tests that the collection sorts in the same way as a BoxList.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_0 = Box(0.0, 0.3, 0.0, 0.3, 0.1, "test1")
+        box_1 = Box(0.0, 0.1, 0.0, 0.1, 0.3, "test2")
+        box_2 = Box(0.0, 0.2, 0.0, 0.2, 0.2, "test3")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        box_collection.add(box_2)
+
+        box_collection.sort_by_area()
+        self.assertEqual([box_1, box_2, box_0], [box for box in box_collection])
+
+        box_collection.sort_by_confidence()
+        self.assertEqual([box_1, box_2, box_0], [box for box in box_collection])
+
+    def test_trim_and_remove_boxes(self):
+        """
+        Tests that boxes can be removed from the collection by confidence, by index, and by value.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_0 = Box(0.2, 0.3, 0.2, 0.3, 0.1, "test1")
+        box_1 = Box(0.1, 0.3, 0.2, 0.3, 0.3, "test2")
+        box_2 = Box(0.0, 0.3, 0.2, 0.3, 0.2, "test3")
+        box_3 = Box(0.0, 0.3, 0.2, 0.3, 0.4, "test4")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        box_collection.add(box_2)
+        box_collection.add(box_3)
+
+        box_collection.trim_by_confidence(0.2)
+        self.assertFalse(box_collection.contains(box_0))
+
+        self.assertIs(box_2, box_collection.pop(1))
+        box_collection.remove(box_3)
+
+        self.assertEqual(1, len(box_collection))
+        self.assertIs(box_1, box_collection[0])
+
+    def test_boxes_are_recreated_from_stored_rows(self):
+        """
+        Tests that a box which has not been kept can be recreated from the stored arrays with the right fields.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_collection.add(Box(0.2, 0.3, 0.2, 0.3, 0.1, "test1"))
+        box_collection.add(Box(0.1, 0.3, 0.2, 0.3, 0.3, "test2"))
+
+        box_collection.__box_cache__[:] = None
+        box = box_collection[1]
+
+        self.assertEqual("left: 0.1, right: 0.3, lower: 0.2, upper: 0.3, conf: 0.3, label: test2", str(box))
+        self.assertIs(box, box_collection[1])
+
+    def test_labels_are_interned(self):
+        """
+        Tests that boxes with the same label share a label id.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_collection.add(Box(0.2, 0.3, 0.2, 0.3, 0.1, "chair"))
+        box_collection.add(Box(0.1, 0.3, 0.2, 0.3, 0.3, "table"))
+        box_collection.add(Box(0.0, 0.3, 0.2, 0.3, 0.2, "chair"))
+
+        label_ids = box_collection.get_label_ids()
+
+        self.assertEqual(label_ids[0], label_ids[2])
+        self.assertNotEqual(label_ids[0], label_ids[1])
+        self.assertEqual("table", box_collection.get_label_for_id(label_ids[1]))
+
+    def test_vectorised_functions_match_box_functions(self):
+        """
+        Tests that the areas, overlap and IoU matrices match the values given by the Box class.
+
+        @return:
+        """
+        boxes = [Box(0.1, 0.2, 0.1, 0.2, 0.5, "test1"),
+                 Box(0.05, 0.15, 0.15, 0.25, 0.5, "test2"),
+                 Box(0.5, 0.6, 0.1, 0.2, 0.5, "test3")]
+        box_collection = ArrayBoxList()
+        for box in boxes:
+            box_collection.add(box)
+
+        overlaps = box_collection.pairwise_overlap(box_collection)
+        ious = box_collection.pairwise_iou(box_collection)
+
+        self.assertTrue(numpy.allclose([box.get_area() for box in boxes], box_collection.areas()))
+        for i in range(len(boxes)):
+            for j in range(len(boxes)):
+                self.assertAlmostEqual(boxes[i].get_overlap_area(boxes[j]), overlaps[i, j], places=7)
+                self.assertAlmostEqual(boxes[i].get_iou(boxes[j]), ious[i, j], places=7)
+
+
+    def test_can_be_created_from_detector_arrays(self):
+        """
+        Tests that the collection can wrap the arrays returned by the detection model.
+
+        @return:
+        """
+        boxes = numpy.array([[0.1, 0.2, 0.3, 0.4], [0.5, 0.6, 0.7, 0.8]], dtype=numpy.float32)
+        scores = numpy.array([0.5, 0.25], dtype=numpy.float32)
+        labels = numpy.array([b"chair", b"chair"], dtype=object)
+
+        box_collection = ArrayBoxList.from_arrays(boxes, scores, labels)
+        box = box_collection[1]
+
+        self.assertEqual(2, len(box_collection))
+        self.assertAlmostEqual(0.6, box.left_edge, places=6)
+        self.assertAlmostEqual(0.8, box.right_edge, places=6)
+        self.assertAlmostEqual(0.5, box.lower_edge, places=6)
+        self.assertAlmostEqual(0.7, box.upper_edge, places=6)
+        self.assertEqual(0.25, box.confidence)
+        self.assertEqual("chair", box.label)
+        self.assertEqual(box_collection.get_label_ids()[0], box_collection.get_label_ids()[1])
+
+    def test_created_from_arrays_does_not_copy_until_changed(self):
+        """
+        Tests that the wrapped arrays are shared until the collection is changed, and are never altered.
+
+        @return:
+        """
+        boxes = numpy.array([[0.1, 0.2, 0.3, 0.4], [0.5, 0.6, 0.7, 0.8]])
+        scores = numpy.array([0.5, 0.25])
+        original_boxes = boxes.copy()
+
+        box_collection = ArrayBoxList.from_arrays(boxes, scores, ["test1", "test2"])
+        self.assertTrue(numpy.shares_memory(boxes, box_collection.__left__))
+
+        box_collection[0] = Box(0.0, 0.1, 0.0, 0.1, 0.9, "test3")
+        box_collection.add(Box(0.0, 0.2, 0.0, 0.2, 0.9, "test4"))
+        box_collection.sort_by_area()
+
+        self.assertTrue(numpy.array_equal(original_boxes, boxes))
+        self.assertEqual(3, len(box_collection))
+        self.assertEqual("test3", box_collection[0].label)
+
+    def test_created_from_empty_arrays(self):
+        """
+        Tests that the collection can be created from a detection with no results.
+
+        @return:
+        """
+        box_collection = ArrayBoxList.from_arrays([], [], [])
+
+        self.assertEqual(0, len(box_collection))
+        self.assertEqual((0,), box_collection.areas().shape)
+
+    def test_filters_match_box_list(self):
+        """
+        Tests that the vectorised filters keep the same boxes as the BoxList filters.
+
+        @return:
+        """
+        boxes = [Box(0.0, 0.2, 0.0, 0.2, 0.5, "chair"),
+                 Box(0.4, 0.6, 0.4, 0.6, 0.05, "table"),
+                 Box(0.45, 0.8, 0.45, 0.8, 0.5, "lamp"),
+                 Box(0.3, 0.35, 0.3, 0.35, 0.9, "chair"),
+                 Box(0.5, 0.9, 0.1, 0.9, 0.7, "table")]
+        box_list = BoxList()
+        array_box_list = ArrayBoxList.from_arrays([[box.lower_edge, box.left_edge, box.upper_edge, box.right_edge]
+                                                   for box in boxes],
+                                                  [box.confidence for box in boxes],
+                                                  [box.label for box in boxes])
+        for box in boxes:
+            box_list.add(box)
+
+        for box_collection in (box_list, array_box_list):
+            box_collection.trim_by_confidence(0.1)
+            box_collection.trim_by_label(denied_labels=["lamp", "sofa"])
+            box_collection.trim_by_region(Box(0.3, 1.0, 0.0, 1.0, 1.0, ""))
+            box_collection.trim_by_area(0.01)
+            box_collection.filter(lambda box: box.confidence < 0.8)
+
+        self.assertEqual(box_list, array_box_list)
+        self.assertEqual(1, len(array_box_list))
+        self.assertEqual("table", array_box_list[0].label)
+
+    def test_iteration_is_re_entrant(self):
+        """
+        Tests that nested loops over the same collection do not interfere with each other.
+
+        @return:
+        """
+        box_collection = ArrayBoxList.from_arrays([[0.1, 0.2, 0.3, 0.4], [0.5, 0.6, 0.7, 0.8]], [0.5, 0.25],
+                                                  ["test1", "test2"])
+
+        pairs = [(outer.label, inner.label) for outer in box_collection for inner in box_collection]
+
+        self.assertEqual([("test1", "test1"), ("test1", "test2"), ("test2", "test1"), ("test2", "test2")], pairs)
+
+    def test_views_do_not_copy(self):
+        """
+        Tests that the views function returns read-only views of the stored arrays.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_collection.add(Box(0.2, 0.3, 0.4, 0.5, 0.6, "test1"))
+
+        left, right, lower, upper, confidence = box_collection.views()
+
+        self.assertTrue(numpy.shares_memory(left, box_collection.__left__))
+        self.assertEqual([0.5], upper.tolist())
+        with self.assertRaises(ValueError):
+            confidence[0] = 1.0
+
+    def test_snapshot_is_not_affected_by_changes(self):
+        """
+        Tests that a snapshot shares the stored arrays until either collection is changed, and is not changed when the
+        original collection is changed.
+
+        @return:
+        """
+        box_collection = ArrayBoxList()
+        box_collection.add(Box(0.2, 0.3, 0.2, 0.3, 0.1, "test1"))
+        box_collection.add(Box(0.1, 0.3, 0.2, 0.3, 0.3, "test2"))
+
+        snapshot = box_collection.snapshot()
+        self.assertTrue(numpy.shares_memory(box_collection.__left__, snapshot.__left__))
+
+        box_collection[0] = Box(0.0, 0.1, 0.0, 0.1, 0.9, "test3")
+        box_collection.add(Box(0.0, 0.2, 0.0, 0.2, 0.9, "test4"))
+        snapshot.trim_by_confidence(0.2)
+
+        self.assertEqual(3, len(box_collection))
+        self.assertEqual("test3", box_collection[0].label)
+        self.assertEqual(1, len(snapshot))
+        self.assertEqual("left: 0.1, right: 0.3, lower: 0.2, upper: 0.3, conf: 0.3, label: test2", str(snapshot[0]))
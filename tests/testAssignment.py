@@ -0,0 +1,96 @@
+import itertools
+import unittest
+
+import numpy
+
+from util import Assignment
+
+
+class AssignmentTests(unittest.TestCase):
+    def test_greedy_matches_highest_scores_first(self):
+        """
+        Tests that the greedy method matches the highest scoring pairs first, and never reuses a row or column.
+
+        @return:
+        """
+        scores = numpy.array([[0.9, 0.8, 0.0],
+                              [0.85, 0.6, 0.0],
+                              [0.0, 0.0, 0.2]])
+
+        rows, cols = Assignment.get_greedy_matches(scores, 0.5)
+
+        self.assertEqual([(0, 0), (1, 1)], list(zip(rows.tolist(), cols.tolist())))
+
+    def test_optimal_matches_give_highest_total(self):
+        """
+        Tests that the optimal method finds the matching with the highest total score, where the greedy method does not.
+
+        @return:
+        """
+        scores = numpy.array([[0.9, 0.8],
+                              [0.85, 0.0]])
+
+        greedy_rows, greedy_cols = Assignment.get_greedy_matches(scores, 0.5)
+        rows, cols = Assignment.get_optimal_matches(scores, 0.5)
+
+        self.assertEqual([(0, 0)], list(zip(greedy_rows.tolist(), greedy_cols.tolist())))
+        self.assertEqual([(0, 1), (1, 0)], list(zip(rows.tolist(), cols.tolist())))
+
+    def test_optimal_matches_against_every_matching(self):
+        """
+        Tests that the optimal method matches the best of every possible matching, for a series of random matrices.
+
+        @return:
+        """
+        generator = numpy.random.default_rng(7)
+        for _ in range(50):
+            row_count, col_count = (int(size) for size in generator.integers(1, 6, 2))
+            scores = generator.random((row_count, col_count))
+
+            rows, cols = Assignment.get_optimal_matches(scores, 0.3)
+
+            best_total = 0.0
+            for chosen in itertools.permutations(range(max(row_count, col_count)), min(row_count, col_count)):
+                pairs = zip(range(row_count), chosen) if row_count <= col_count else zip(chosen, range(col_count))
+                best_total = max(best_total, sum(scores[pair] for pair in pairs if scores[pair] > 0.3))
+            self.assertAlmostEqual(best_total, scores[rows, cols].sum(), places=9)
+            self.assertEqual(len(set(cols.tolist())), len(cols))
+            self.assertTrue(numpy.all(scores[rows, cols] > 0.3))
+
+    def test_empty_matrices(self):
+        """
+        Tests that matrices with no rows or no columns give no matches.
+
+        @return:
+        """
+        for scores in (numpy.zeros((0, 3)), numpy.zeros((3, 0))):
+            for get_matches in (Assignment.get_greedy_matches, Assignment.get_optimal_matches):
+                rows, cols = get_matches(scores, 0.5)
+                self.assertEqual(0, len(rows))
+                self.assertEqual(0, len(cols))
+
+    def test_pair_matches_agree_with_grouped_matrices(self):
+        """
+        Tests that matching the pairs in the same group gives the same result as matching a full matrix where pairs in
+        different groups are not allowed.
+
+        @return:
+        """
+        generator = numpy.random.default_rng(11)
+        for _ in range(20):
+            row_groups = generator.integers(0, 3, 7)
+            col_groups = generator.integers(0, 3, 6)
+            scores = generator.random((7, 6))
+            masked_scores = numpy.where(row_groups[:, None] == col_groups[None, :], scores, 0.0)
+
+            rows, cols = Assignment.get_pairs_in_same_group(row_groups, col_groups)
+
+            self.assertEqual(sorted(zip(*numpy.nonzero(masked_scores))), sorted(zip(rows.tolist(), cols.tolist())))
+            for pair_function, matrix_function in ((Assignment.get_greedy_pair_matches, Assignment.get_greedy_matches),
+                                                   (Assignment.get_optimal_pair_matches,
+                                                    Assignment.get_optimal_matches)):
+                pair_rows, pair_cols = pair_function(rows, cols, scores[rows, cols], 0.2)
+                matrix_rows, matrix_cols = matrix_function(masked_scores, 0.2)
+                self.assertAlmostEqual(masked_scores[matrix_rows, matrix_cols].sum(),
+                                       scores[pair_rows, pair_cols].sum())
+                self.assertTrue(numpy.all(row_groups[pair_rows] == col_groups[pair_cols]))
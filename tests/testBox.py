@@ -1,3 +1,7 @@
+import os
+import pickle
+import subprocess
+import sys
 import unittest
 
 from util.Box import Box
@@ -122,3 +126,24 @@ class BoxTests(unittest.TestCase):
 
         self.assertTrue(floats_eq_7_dp(expected_result, actual_result))
 
+
+    def test_pickled_box_keeps_its_label_in_another_process(self):
+        """
+        Test that a pickled box keeps its label when it is loaded by another process, where the label registry has
+        given the label ids to different labels.
+
+        @return:
+        """
+        box = Box(0.1, 0.2, 0.3, 0.4, 0.5, "Zebra")
+        source_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+        script = ("import pickle, sys\n"
+                  "from util.LabelRegistry import get_label_registry\n"
+                  "get_label_registry().add_labels(['Cat', 'Dog', 'Mouse'])\n"
+                  "box = pickle.loads(sys.stdin.buffer.read())\n"
+                  "print(box.label, box.left_edge, box.confidence)\n")
+
+        result = subprocess.run([sys.executable, "-c", script], input=pickle.dumps(box), capture_output=True,
+                                env=dict(os.environ, PYTHONPATH=source_directory), check=True)
+
+        self.assertEqual("Zebra 0.1 0.5", result.stdout.decode().strip())
+        self.assertEqual("Zebra", pickle.loads(pickle.dumps(box)).label)
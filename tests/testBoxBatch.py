@@ -0,0 +1,126 @@
+import unittest
+
+import numpy
+
+from util.Box import Box
+from util.BoxBatch import BoxBatch
+from util.BoxList import BoxList
+
+
+def make_frames() -> list:
+    """
+    A helper function that creates the boxes of three frames, where the middle frame has no boxes.
+
+    @return: A list of BoxList objects, which are the boxes of each frame.
+    """
+    frame_0 = BoxList()
+    frame_0.add(Box(0.0, 0.3, 0.0, 0.3, 0.1, "chair"))
+    frame_0.add(Box(0.0, 0.1, 0.0, 0.1, 0.3, "table"))
+    frame_0.add(Box(0.0, 0.2, 0.0, 0.2, 0.2, "chair"))
+
+    frame_2 = BoxList()
+    frame_2.add(Box(0.5, 0.9, 0.5, 0.9, 0.9, "lamp"))
+    frame_2.add(Box(0.5, 0.6, 0.5, 0.6, 0.05, "chair"))
+
+    return [frame_0, BoxList(), frame_2]
+
+
+class BoxBatchTests(unittest.TestCase):
+    def test_frames_can_be_split_back_out(self):
+        """
+        Tests that a batch made from a series of frames gives back the same frames.
+
+        @return:
+        """
+        frames = make_frames()
+        batch = BoxBatch.from_box_lists(frames)
+
+        self.assertEqual(3, batch.frame_count())
+        self.assertEqual(5, batch.size())
+        self.assertEqual([0, 3, 3, 5], batch.get_offsets().tolist())
+        self.assertEqual([0, 0, 0, 2, 2], batch.get_frame_ids().tolist())
+        for frame, batch_frame in zip(frames, batch.to_box_lists()):
+            self.assertEqual(frame, batch_frame)
+        self.assertEqual(frames[2], batch.get_frame(-1))
+        with self.assertRaises(IndexError):
+            batch.get_frame(3)
+
+    def test_can_be_created_from_detector_results(self):
+        """
+        Tests that a batch can be made from the raw results of the detection model.
+
+        @return:
+        """
+        detections = [{"detection_boxes": numpy.array([[0.1, 0.2, 0.3, 0.4]], dtype=numpy.float32),
+                       "detection_scores": numpy.array([0.5], dtype=numpy.float32),
+                       "detection_class_entities": numpy.array([b"chair"], dtype=object)},
+                      {"detection_boxes": numpy.array([[0.5, 0.6, 0.7, 0.8], [0.0, 0.0, 0.1, 0.1]]),
+                       "detection_scores": numpy.array([0.25, 0.75]),
+                       "detection_class_entities": numpy.array([b"table", b"chair"], dtype=object)}]
+
+        batch = BoxBatch.from_detections(detections)
+        box = batch.get_frame(1)[0]
+
+        self.assertEqual([0, 1, 3], batch.get_offsets().tolist())
+        self.assertAlmostEqual(0.6, box.left_edge, places=6)
+        self.assertAlmostEqual(0.8, box.right_edge, places=6)
+        self.assertAlmostEqual(0.5, box.lower_edge, places=6)
+        self.assertAlmostEqual(0.7, box.upper_edge, places=6)
+        self.assertEqual("table", box.label)
+        self.assertEqual(batch.get_label_ids()[0], batch.get_label_ids()[2])
+
+    def test_trims_and_sorts_match_box_list(self):
+        """
+        Tests that trimming and sorting the whole batch gives the same frames as trimming and sorting each frame.
+
+        @return:
+        """
+        frames = make_frames()
+        batch = BoxBatch.from_box_lists(frames)
+
+        batch.trim_by_confidence(0.1)
+        batch.trim_by_label(denied_labels=["lamp"])
+        batch.sort_by_area()
+        for frame in frames:
+            frame.trim_by_confidence(0.1)
+            frame.trim_by_label(denied_labels=["lamp"])
+            frame.sort_by_area()
+
+        self.assertEqual([0, 3, 3, 3], batch.get_offsets().tolist())
+        for frame, batch_frame in zip(frames, batch):
+            self.assertEqual(frame, batch_frame)
+
+        batch.sort_by_confidence()
+        frames[0].sort_by_confidence()
+        self.assertEqual(frames[0], batch.get_frame(0))
+
+    def test_changes_do_not_affect_copies_or_frames(self):
+        """
+        Tests that changing a batch does not change copies of it, or frames that were taken from it.
+
+        @return:
+        """
+        batch = BoxBatch.from_box_lists(make_frames())
+        frame = batch.get_frame(0)
+        batch_copy = batch.copy()
+
+        batch.keep_mask([False, True, False, False, True])
+
+        self.assertEqual(2, batch.size())
+        self.assertEqual(5, batch_copy.size())
+        self.assertEqual(3, len(frame))
+        with self.assertRaises(ValueError):
+            batch.keep_mask([True])
+
+    def test_empty_batch(self):
+        """
+        Tests that a batch can be made with no frames.
+
+        @return:
+        """
+        batch = BoxBatch.from_box_lists([])
+
+        self.assertEqual(0, len(batch))
+        self.assertEqual(0, batch.size())
+        self.assertEqual([], batch.to_box_lists())
+        self.assertEqual(0, BoxBatch.from_detections([]).size())
@@ -1,3 +1,4 @@
+import copy
 import unittest
 
 from util.Box import Box
@@ -419,3 +420,265 @@ class BoxListTests(unittest.TestCase):
 
 
 
+
+    def test_vectorised_functions_match_box_functions(self):
+        """
+        Test that the areas, overlap and IoU matrices match the values given by the Box class.
+
+        @return:
+        """
+        box_collection = BoxList()
+        other_collection = BoxList()
+        box_0 = Box(0.1, 0.2, 0.1, 0.2, 0.5, "test1")
+        box_1 = Box(0.05, 0.15, 0.15, 0.25, 0.5, "test2")
+        box_2 = Box(0.5, 0.6, 0.1, 0.2, 0.5, "test3")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        other_collection.add(box_1)
+        other_collection.add(box_2)
+
+        self.assertEqual((2,), box_collection.areas().shape)
+        self.assertAlmostEqual(box_0.get_area(), box_collection.areas()[0], places=7)
+        self.assertAlmostEqual(box_0.get_overlap_area(box_1), box_collection.pairwise_overlap(other_collection)[0, 0],
+                               places=7)
+        self.assertAlmostEqual(box_0.get_iou(box_1), box_collection.pairwise_iou(other_collection)[0, 0], places=7)
+        self.assertEqual(0.0, box_collection.pairwise_iou(other_collection)[0, 1])
+        self.assertEqual((2, 0), box_collection.pairwise_iou(BoxList()).shape)
+
+    def test_equality_check_with_tolerance(self):
+        """
+        Test that the collections can be compared with a tolerance on the numeric fields.
+
+        @return:
+        """
+        c_1 = BoxList()
+        c_2 = BoxList()
+        c_1.add(Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1"))
+        c_2.add(Box(0.2000001, 0.3, 0.2, 0.6, 0.5, "test1"))
+
+        self.assertNotEqual(c_1, c_2)
+        self.assertTrue(c_1.equals(c_2, tolerance=0.000001))
+        self.assertFalse(c_1.equals(c_2, tolerance=0.00000001))
+
+    def test_equality_check_ignoring_order(self):
+        """
+        Test that the collections can be compared without regard to the order of the boxes.
+
+        @return:
+        """
+        box_0 = Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1")
+        box_1 = Box(0.2, 0.3, 0.2, 0.6, 0.5, "test2")
+        box_2 = Box(0.0, 0.3, 0.2, 0.3, 0.7, "test1")
+
+        c_1 = BoxList()
+        c_2 = BoxList()
+        for box in [box_0, box_1, box_2]:
+            c_1.add(box)
+        for box in [box_2, box_0, box_1]:
+            c_2.add(box)
+
+        self.assertNotEqual(c_1, c_2)
+        self.assertTrue(c_1.equals(c_2, ignore_order=True))
+
+        c_2.pop(0)
+        c_2.add(Box(0.0, 0.3, 0.2, 0.3, 0.7, "test3"))
+        self.assertFalse(c_1.equals(c_2, ignore_order=True))
+
+    def test_equality_ignoring_order_with_tolerance(self):
+        """
+        Test that reordered collections whose boxes differ by less than the tolerance are equal when the order is
+        ignored, even when the differences would sort the boxes into a different order.
+
+        @return:
+        """
+        c_1 = BoxList()
+        c_1.add(Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1"))
+        c_1.add(Box(0.4, 0.5, 0.2, 0.6, 0.50000001, "test1"))
+        c_1.add(Box(0.4, 0.5, 0.2, 0.6, 0.7, "test2"))
+        c_2 = BoxList()
+        c_2.add(Box(0.4, 0.5, 0.2, 0.6, 0.70000001, "test2"))
+        c_2.add(Box(0.4, 0.5, 0.2, 0.6, 0.5, "test1"))
+        c_2.add(Box(0.2, 0.3, 0.2, 0.6, 0.50000002, "test1"))
+
+        self.assertTrue(c_1.equals(c_2, tolerance=1e-6, ignore_order=True))
+        self.assertFalse(c_1.equals(c_2, ignore_order=True))
+
+        c_2.pop(0)
+        c_2.add(Box(0.4, 0.5, 0.2, 0.6, 0.70000001, "test1"))
+        self.assertFalse(c_1.equals(c_2, tolerance=1e-6, ignore_order=True))
+
+    def test_equality_check_with_other_types(self):
+        """
+        Test that the collection is never equal to an object which is not a collection of boxes.
+
+        @return:
+        """
+        box_collection = BoxList()
+
+        self.assertNotEqual(box_collection, list())
+        self.assertNotEqual(box_collection, None)
+
+    def test_diff_reports_indexes_of_differing_boxes(self):
+        """
+        Test that the diff function returns the indexes of the boxes that differ between two collections.
+
+        @return:
+        """
+        c_1 = BoxList()
+        c_2 = BoxList()
+        c_1.add(Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1"))
+        c_1.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test2"))
+        c_1.add(Box(0.0, 0.3, 0.2, 0.3, 0.7, "test3"))
+        c_2.add(Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1"))
+        c_2.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test4"))
+        c_2.add(Box(0.0, 0.3, 0.2, 0.3, 0.7, "test3"))
+        c_2.add(Box(0.0, 0.3, 0.2, 0.3, 0.7, "test5"))
+
+        self.assertEqual([1, 3], c_1.diff(c_2))
+        self.assertEqual([], c_1.diff(c_1))
+
+    def test_trim_boxes_by_label(self):
+        """
+        Test that boxes can be removed by allowed and denied labels.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_0 = Box(0.2, 0.3, 0.2, 0.3, 0.1, "chair")
+        box_1 = Box(0.1, 0.3, 0.2, 0.3, 0.3, "table")
+        box_2 = Box(0.0, 0.3, 0.2, 0.3, 0.2, "lamp")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        box_collection.add(box_2)
+
+        box_collection.trim_by_label(allowed_labels=["chair", "table"], denied_labels={"table"})
+
+        self.assertEqual(1, box_collection.size())
+        self.assertEqual(box_0, box_collection.get(0))
+
+    def test_trim_boxes_by_area(self):
+        """
+        Test that boxes smaller than a given area can be removed.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_0 = Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1")
+        box_1 = Box(0.0, 0.3, 0.0, 0.3, 0.5, "test2")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+
+        box_collection.trim_by_area(0.05)
+
+        self.assertEqual(1, box_collection.size())
+        self.assertEqual(box_1, box_collection.get(0))
+
+    def test_trim_boxes_by_region(self):
+        """
+        Test that boxes outside a region of interest can be removed.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_0 = Box(0.0, 0.2, 0.0, 0.2, 0.5, "test1")
+        box_1 = Box(0.4, 0.6, 0.4, 0.6, 0.5, "test2")
+        box_2 = Box(0.45, 0.8, 0.45, 0.8, 0.5, "test3")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        box_collection.add(box_2)
+
+        box_collection.trim_by_region(Box(0.3, 0.7, 0.3, 0.7, 1.0, ""))
+        self.assertEqual(2, box_collection.size())
+
+        box_collection.trim_by_region(Box(0.3, 0.7, 0.3, 0.7, 1.0, ""), min_overlap=0.6)
+        self.assertEqual(1, box_collection.size())
+        self.assertEqual(box_1, box_collection.get(0))
+
+    def test_filter_and_keep_mask(self):
+        """
+        Test that boxes can be removed by a given function, or by a given mask.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_0 = Box(0.2, 0.3, 0.2, 0.3, 0.1, "test1")
+        box_1 = Box(0.1, 0.3, 0.2, 0.3, 0.3, "test2")
+        box_2 = Box(0.0, 0.3, 0.2, 0.3, 0.2, "test3")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        box_collection.add(box_2)
+
+        box_collection.filter(lambda box: box.label != "test2")
+        self.assertFalse(box_collection.contains(box_1))
+
+        box_collection.keep_mask([False, True])
+        self.assertEqual(1, box_collection.size())
+        self.assertEqual(box_2, box_collection.get(0))
+
+        with self.assertRaises(ValueError):
+            box_collection.keep_mask([True, True])
+
+    def test_can_iterate_over_collection_inside_a_loop_over_itself(self):
+        """
+        Test that nested loops over the same collection do not interfere with each other.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_0 = Box(0.2, 0.3, 0.2, 0.3, 0.5, "test1")
+        box_1 = Box(0.1, 0.3, 0.2, 0.3, 0.5, "test2")
+        box_2 = Box(0.0, 0.3, 0.2, 0.3, 0.5, "test3")
+
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+        box_collection.add(box_2)
+
+        pairs = [(outer.label, inner.label) for outer in box_collection for inner in box_collection]
+
+        self.assertEqual(9, len(pairs))
+        self.assertEqual(("test3", "test3"), pairs[-1])
+
+    def test_views_give_read_only_fields(self):
+        """
+        Test that the views function returns the fields of the boxes as read-only arrays.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_collection.add(Box(0.2, 0.3, 0.4, 0.5, 0.6, "test1"))
+        box_collection.add(Box(0.1, 0.3, 0.2, 0.3, 0.5, "test2"))
+
+        left, right, lower, upper, confidence = box_collection.views()
+
+        self.assertEqual([0.2, 0.1], left.tolist())
+        self.assertEqual([0.6, 0.5], confidence.tolist())
+        with self.assertRaises(ValueError):
+            upper[0] = 1.0
+
+    def test_snapshot_is_not_affected_by_changes(self):
+        """
+        Test that a snapshot shares the boxes of the collection, but is not changed when either collection is changed.
+
+        @return:
+        """
+        box_collection = BoxList()
+        box_0 = Box(0.2, 0.3, 0.2, 0.3, 0.5, "test1")
+        box_1 = Box(0.1, 0.3, 0.2, 0.3, 0.5, "test2")
+        box_collection.add(box_0)
+        box_collection.add(box_1)
+
+        snapshot = box_collection.snapshot()
+        second_snapshot = copy.copy(box_collection)
+        self.assertIs(box_0, snapshot[0])
+
+        box_collection.add(Box(0.0, 0.3, 0.2, 0.3, 0.5, "test3"))
+        snapshot.pop(0)
+
+        self.assertEqual(3, len(box_collection))
+        self.assertEqual([box_1], [box for box in snapshot])
+        self.assertEqual([box_0, box_1], [box for box in second_snapshot])
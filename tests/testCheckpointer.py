@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from model.Checkpointer import Checkpointer
+from model.KnowledgeUnit import KnowledgeUnit
+from model.Tracker import Tracker
+from util.Box import Box
+from util.BoxList import BoxList
+
+
+def moving_frame(frame_number: int) -> BoxList:
+    """
+    A helper function to create a frame with one moving item, and one item which is only seen in some frames.
+
+    @param frame_number:    An int which is the number of the frame.
+    @return:                A BoxList object which holds the boxes of the frame.
+    """
+    frame = BoxList()
+    left_edge = 0.1 + 0.02 * frame_number
+    frame.add(Box(left_edge, left_edge + 0.2, 0.1, 0.4, 0.5 + 0.01 * frame_number, "Chair"))
+    if frame_number % 3 != 0:
+        frame.add(Box(0.7, 0.8, 0.5, 0.9, 0.6, "Table"))
+    return frame
+
+
+class CheckpointerTests(unittest.TestCase):
+    def test_restored_tracker_carries_on_as_before(self):
+        """
+        Tests that a tracker restored from a checkpoint gives the same tracks as one which was never stopped.
+
+        @return:
+        """
+        settings = dict(iou_threshold=0.3, min_frames=3, allowed_absence=2, motion_model=True, history_depth=4)
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "checkpoint.npz")
+            tracker = Tracker(**settings)
+            checkpointer = Checkpointer(file_name, tracker=tracker, interval=5)
+            saved = list()
+            for frame_number in range(10):
+                tracker.add_new_frame(moving_frame(frame_number))
+                saved.append(checkpointer.add_frame())
+
+            restored_tracker = Tracker(**settings)
+            self.assertTrue(Checkpointer(file_name, tracker=restored_tracker).restore())
+
+        self.assertEqual([False, False, False, False, True] * 2, saved)
+        for frame_number in range(10, 20):
+            tracker.add_new_frame(moving_frame(frame_number))
+            restored_tracker.add_new_frame(moving_frame(frame_number))
+            self.assertEqual(tracker.get_current_tracks(), restored_tracker.get_current_tracks())
+
+        self.assertTrue(numpy.allclose(tracker.get_track_history(0).get_samples(),
+                                       restored_tracker.get_track_history(0).get_samples()))
+
+    def test_restored_knowledge_unit_remembers_items(self):
+        """
+        Tests that a KnowledgeUnit restored from a checkpoint remembers what it has seen, and when.
+
+        @return:
+        """
+        knowledge = KnowledgeUnit()
+        knowledge.add_frame(moving_frame(1), 1)
+        knowledge.add_frame(moving_frame(3), 2)
+        knowledge.add_frame(moving_frame(4), 5)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "checkpoint.npz")
+            Checkpointer(file_name, knowledge=knowledge).save()
+            restored_knowledge = KnowledgeUnit()
+            self.assertTrue(Checkpointer(file_name, knowledge=restored_knowledge).restore())
+            self.assertFalse(Checkpointer(os.path.join(directory, "missing.npz"), knowledge=KnowledgeUnit()).restore())
+
+        self.assertEqual(knowledge.get_list_of_all_seen_items(), restored_knowledge.get_list_of_all_seen_items())
+        self.assertEqual(knowledge.when_did_you_see("Table"), restored_knowledge.when_did_you_see("Table"))
+        self.assertEqual(knowledge.describe_scene(), restored_knowledge.describe_scene())
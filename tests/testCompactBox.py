@@ -0,0 +1,92 @@
+import copy
+import pickle
+import unittest
+
+from util.Box import Box
+from util.CompactBox import CompactBox
+
+
+class CompactBoxTests(unittest.TestCase):
+    def test_to_string_matches_box(self):
+        """
+        Tests that the box gives the same summary string as a Box with the same fields.
+
+        @return:
+        """
+        box = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, b"test1")
+
+        self.assertEqual(str(Box(0.2, 0.3, 0.2, 0.6, 0.5, "test1")), str(box))
+
+    def test_cannot_be_changed(self):
+        """
+        Tests that the fields of the box cannot be changed once it has been created.
+
+        @return:
+        """
+        box = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test1")
+
+        with self.assertRaises(AttributeError):
+            box.label = "test2"
+        with self.assertRaises(AttributeError):
+            box.new_field = 1.0
+
+    def test_equality_and_hash_are_by_value(self):
+        """
+        Tests that boxes with the same fields are equal and hash the same, and boxes with different fields are not.
+
+        @return:
+        """
+        box_1 = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test1")
+        box_2 = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test1")
+        box_3 = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test2")
+
+        self.assertEqual(box_1, box_2)
+        self.assertEqual(hash(box_1), hash(box_2))
+        self.assertNotEqual(box_1, box_3)
+        self.assertEqual(2, len({box_1, box_2, box_3}))
+
+    def test_copies_are_the_same_object(self):
+        """
+        Tests that copying the box does not create a new object, as the box cannot be changed.
+
+        @return:
+        """
+        box = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test1")
+
+        self.assertIs(box, copy.copy(box))
+        self.assertIs(box, copy.deepcopy(box))
+        self.assertEqual(box, pickle.loads(pickle.dumps(box)))
+
+    def test_functions_match_box(self):
+        """
+        Tests that the area, overlap and IoU functions give the same values as the Box class.
+
+        @return:
+        """
+        box_1 = Box(0.1, 0.2, 0.1, 0.2, 0.5, "test1")
+        box_2 = Box(0.05, 0.15, 0.15, 0.25, 0.5, "test2")
+        box_3 = Box(0.5, 0.6, 0.1, 0.2, 0.5, "test3")
+        compact_1 = CompactBox.from_box(box_1)
+        compact_2 = CompactBox.from_box(box_2)
+
+        self.assertEqual(box_1.get_area(), compact_1.get_area())
+        self.assertEqual(box_1.get_overlap_area(box_2), compact_1.get_overlap_area(compact_2))
+        self.assertEqual(box_1.get_iou(box_2), compact_1.get_iou(compact_2))
+        self.assertEqual(box_1.get_iou(box_2), compact_1.get_iou(box_2))
+        self.assertEqual(box_1.get_iou(box_2), box_1.get_iou(compact_2))
+        self.assertEqual(0.0, compact_1.get_iou(box_3))
+
+    def test_can_be_converted_to_and_from_box(self):
+        """
+        Tests that the box can be converted to a Box and back without changing.
+
+        @return:
+        """
+        compact_box = CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test1")
+
+        box = compact_box.to_box()
+        box.label = "test2"
+
+        self.assertEqual("test1", compact_box.label)
+        self.assertEqual(CompactBox(0.2, 0.3, 0.2, 0.6, 0.5, "test2"), CompactBox.from_box(box))
+        self.assertIs(compact_box, CompactBox.from_box(compact_box))
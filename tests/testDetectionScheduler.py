@@ -0,0 +1,39 @@
+import unittest
+
+from model.DetectionScheduler import DetectionScheduler
+from model.Tracker import Tracker
+from util.Box import Box
+from util.BoxList import BoxList
+
+
+class DetectionSchedulerTests(unittest.TestCase):
+    def test_detects_every_nth_frame(self):
+        """
+        Tests that object detection is run on the first frame, and then on every Nth frame.
+
+        @return:
+        """
+        scheduler = DetectionScheduler(interval=3)
+
+        self.assertEqual([True, False, False, True, False, False, True], [scheduler.should_detect() for _ in range(7)])
+        self.assertRaises(ValueError, DetectionScheduler, interval=0)
+
+    def test_detects_every_frame_while_tracks_move_quickly(self):
+        """
+        Tests that object detection is run on every frame while the fastest track is moving faster than the maximum
+        speed.
+
+        @return:
+        """
+        tracker = Tracker(iou_threshold=0.5, history_depth=4)
+        for frame_number in range(4):
+            frame = BoxList()
+            left_edge = 0.1 + 0.05 * frame_number
+            frame.add(Box(left_edge, left_edge + 0.4, 0.1, 0.4, 0.5, "test1"))
+            tracker.add_new_frame(frame)
+
+        fast_scheduler = DetectionScheduler(interval=3, max_speed=0.01)
+        slow_scheduler = DetectionScheduler(interval=3, max_speed=0.1)
+
+        self.assertEqual([True, True, True], [fast_scheduler.should_detect(tracker) for _ in range(3)])
+        self.assertEqual([True, False, False], [slow_scheduler.should_detect(tracker) for _ in range(3)])
@@ -0,0 +1,74 @@
+import unittest
+
+import numpy
+
+from model.KalmanFilter import KalmanFilter
+
+
+def edges_of(left: list, width: float = 0.1) -> tuple:
+    """
+    A helper function that creates the edges of a series of boxes of the same size, at the given horizontal positions.
+
+    @param left:    A list of float values, which are the left edges of the boxes.
+    @param width:   A float which is the width (and height) of every box.
+    @return:        A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges.
+    """
+    left = numpy.array(left, dtype=numpy.float64)
+    return left, left + width, numpy.full_like(left, 0.2), numpy.full_like(left, 0.2 + width)
+
+
+class KalmanFilterTests(unittest.TestCase):
+    def test_predicts_constant_velocity(self):
+        """
+        Tests that after following a box moving at a constant speed, the filter predicts where it will be next.
+
+        @return:
+        """
+        kalman_filter = KalmanFilter()
+        kalman_filter.append(edges_of([0.1]))
+        for frame in range(1, 10):
+            kalman_filter.predict()
+            kalman_filter.update([0], edges_of([0.1 + 0.03 * frame]))
+
+        left, right, lower, upper = kalman_filter.predict()
+
+        self.assertAlmostEqual(0.4, left[0], places=2)
+        self.assertAlmostEqual(0.5, right[0], places=2)
+        self.assertAlmostEqual(0.2, lower[0], places=4)
+        self.assertAlmostEqual(0.03, kalman_filter.get_velocities()[0, 0], places=2)
+
+    def test_new_boxes_stay_still(self):
+        """
+        Tests that a box which has only been seen once is predicted to stay where it is.
+
+        @return:
+        """
+        kalman_filter = KalmanFilter()
+        kalman_filter.append(edges_of([0.1, 0.5]))
+
+        left, right, _, _ = kalman_filter.predict()
+
+        self.assertTrue(numpy.allclose([0.1, 0.5], left))
+        self.assertTrue(numpy.allclose([0.2, 0.6], right))
+
+    def test_rows_can_be_removed(self):
+        """
+        Tests that removing rows leaves the remaining boxes in their rows, and that the removed rows are reused by new
+        boxes.
+
+        @return:
+        """
+        kalman_filter = KalmanFilter()
+        kalman_filter.append(edges_of([0.1, 0.3]))
+        kalman_filter.append(edges_of([0.5]))
+
+        kalman_filter.remove([1])
+
+        self.assertEqual(2, len(kalman_filter))
+        self.assertTrue(numpy.allclose([0.1, 0.5], kalman_filter.get_edges()[0][[0, 2]]))
+
+        rows = kalman_filter.append(edges_of([0.7, 0.8]))
+
+        self.assertEqual([1, 3], rows.tolist())
+        self.assertEqual(4, len(kalman_filter))
+        self.assertTrue(numpy.allclose([0.1, 0.7, 0.5, 0.8], kalman_filter.get_edges()[0]))
@@ -0,0 +1,84 @@
+import unittest
+
+import numpy
+
+from util.Box import Box
+from util.CompactBox import CompactBox
+from util.LabelRegistry import LabelRegistry, get_label_registry
+
+
+class LabelRegistryTests(unittest.TestCase):
+    def test_labels_keep_their_ids(self):
+        """
+        Tests that each label is given one id, which is returned every time the label is looked up.
+
+        @return:
+        """
+        registry = LabelRegistry()
+
+        chair_id = registry.get_id("chair")
+        table_id = registry.get_id("table")
+
+        self.assertNotEqual(chair_id, table_id)
+        self.assertEqual(chair_id, registry.get_id("chair"))
+        self.assertEqual("table", registry.get_label(table_id))
+        self.assertEqual(2, len(registry))
+
+    def test_bytestrings_share_ids_with_strings(self):
+        """
+        Tests that a bytestring label is given the same id as the matching str label.
+
+        @return:
+        """
+        registry = LabelRegistry()
+
+        lamp_id = registry.get_id(b"lamp")
+
+        self.assertEqual(lamp_id, registry.get_id("lamp"))
+        self.assertEqual(lamp_id, registry.get_id(bytearray(b"lamp")))
+        self.assertEqual("lamp", registry.get_label(lamp_id))
+        self.assertEqual(1, registry.size())
+
+    def test_find_id_does_not_add_labels(self):
+        """
+        Tests that searching for a label which has never been seen does not give it an id.
+
+        @return:
+        """
+        registry = LabelRegistry()
+        registry.add_labels(["chair", b"table"])
+
+        self.assertEqual(registry.get_id("table"), registry.find_id(b"table"))
+        self.assertEqual(-1, registry.find_id("sofa"))
+        self.assertEqual(2, registry.size())
+
+    def test_labels_can_be_looked_up_in_one_pass(self):
+        """
+        Tests that an array of label ids can be turned back into labels.
+
+        @return:
+        """
+        registry = LabelRegistry()
+        ids = numpy.array([registry.get_id(label) for label in ["chair", "table", "chair"]])
+
+        self.assertEqual(["chair", "table", "chair"], registry.get_labels(ids).tolist())
+        self.assertEqual(frozenset(ids), registry.get_ids(["table", "chair"]))
+
+    def test_boxes_carry_shared_label_ids(self):
+        """
+        Tests that boxes store their label as an id from the shared registry, and that changing the label changes the
+        id.
+
+        @return:
+        """
+        registry = get_label_registry()
+        box = Box(0.0, 0.1, 0.0, 0.1, 0.5, b"test1")
+        compact_box = CompactBox(0.0, 0.1, 0.0, 0.1, 0.5, "test1")
+
+        self.assertEqual(registry.get_id("test1"), box.label_id)
+        self.assertEqual(box.label_id, compact_box.label_id)
+
+        box.label = "test2"
+
+        self.assertEqual(registry.get_id("test2"), box.label_id)
+        self.assertEqual("test2", box.label)
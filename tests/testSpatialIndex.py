@@ -0,0 +1,117 @@
+import random
+import unittest
+
+from util.Box import Box
+from util.BoxList import BoxList
+from util.SpatialIndex import SpatialIndex
+
+
+def make_random_boxes(count: int, seed: int) -> BoxList:
+    """
+    A helper function that creates a collection of randomly placed boxes.
+
+    @param count:   An int which is the number of boxes to create.
+    @param seed:    An int which is the seed for the random number generator, so that the boxes are repeatable.
+    @return:        A BoxList object containing the boxes.
+    """
+    rng = random.Random(seed)
+    boxes = BoxList()
+    for i in range(count):
+        left = rng.uniform(-0.05, 0.95)
+        lower = rng.uniform(-0.05, 0.95)
+        boxes.add(Box(left, left + rng.uniform(0.0, 0.3), lower, lower + rng.uniform(0.0, 0.3), 0.5, str(i)))
+    return boxes
+
+
+class SpatialIndexTests(unittest.TestCase):
+    def test_overlapping_matches_brute_force(self):
+        """
+        Test that the overlapping query finds exactly the boxes that overlap the region.
+
+        @return:
+        """
+        boxes = make_random_boxes(200, 1)
+        index = SpatialIndex(boxes, cells=6)
+
+        for region in make_random_boxes(20, 2):
+            expected = [i for i in range(len(boxes)) if boxes[i].get_overlap_area(region) > 0.0]
+            self.assertEqual(expected, index.get_overlapping(region).tolist())
+
+    def test_horizontally_intersecting_matches_brute_force(self):
+        """
+        Test that the horizontal query finds exactly the boxes whose horizontal extents intersect the given extent.
+
+        @return:
+        """
+        boxes = make_random_boxes(200, 3)
+        index = SpatialIndex(boxes)
+
+        for left, right in [(0.0, 0.1), (0.33, 0.66), (0.9, 1.2), (0.5, 0.5)]:
+            expected = [i for i in range(len(boxes)) if boxes[i].left_edge < right and boxes[i].right_edge > left]
+            self.assertEqual(expected, index.get_horizontally_intersecting(left, right).tolist())
+
+    def test_below_and_above(self):
+        """
+        Test that boxes can be found by the height of their lower edges.
+
+        @return:
+        """
+        boxes = BoxList()
+        boxes.add(Box(0.0, 0.1, 0.5, 0.6, 0.5, "test1"))
+        boxes.add(Box(0.0, 0.1, 0.1, 0.6, 0.5, "test2"))
+        boxes.add(Box(0.0, 0.1, 0.3, 0.6, 0.5, "test3"))
+        boxes.add(Box(0.0, 0.1, 0.7, 0.8, 0.5, "test4"))
+        index = SpatialIndex(boxes)
+
+        self.assertEqual([1, 2], index.get_below(0.5).tolist())
+        self.assertEqual([3], index.get_above(0.5).tolist())
+        self.assertEqual([0, 1, 2, 3], index.get_below(1.0).tolist())
+
+    def test_k_nearest_matches_brute_force(self):
+        """
+        Test that the nearest boxes to a point are found, nearest first.
+
+        @return:
+        """
+        boxes = make_random_boxes(150, 4)
+        index = SpatialIndex(boxes)
+
+        for x, y in [(0.5, 0.5), (0.0, 0.0), (0.95, 0.1), (-0.5, 2.0)]:
+            def distance(box: Box) -> float:
+                return (((box.left_edge + box.right_edge) / 2 - x) ** 2
+                        + ((box.lower_edge + box.upper_edge) / 2 - y) ** 2) ** 0.5
+
+            expected = sorted(range(len(boxes)), key=lambda i: distance(boxes[i]))[:5]
+            self.assertEqual(expected, index.get_k_nearest(x, y, 5).tolist())
+
+        self.assertEqual(150, len(index.get_k_nearest(0.5, 0.5, 1000)))
+
+    def test_empty_collection(self):
+        """
+        Test that an index of an empty collection returns no results.
+
+        @return:
+        """
+        index = SpatialIndex(BoxList())
+
+        self.assertEqual([], index.get_overlapping(Box(0.0, 1.0, 0.0, 1.0, 1.0, "")).tolist())
+        self.assertEqual([], index.get_horizontally_intersecting(0.0, 1.0).tolist())
+        self.assertEqual([], index.get_below(1.0).tolist())
+        self.assertEqual([], index.get_k_nearest(0.5, 0.5, 3).tolist())
+
+    def test_box_list_keeps_index_until_changed(self):
+        """
+        Test that the collection only rebuilds its index when it has been changed.
+
+        @return:
+        """
+        boxes = make_random_boxes(10, 5)
+
+        index = boxes.get_spatial_index()
+        self.assertIs(index, boxes.get_spatial_index())
+
+        boxes.add(Box(0.0, 1.0, 0.0, 1.0, 1.0, "everything"))
+        new_index = boxes.get_spatial_index()
+
+        self.assertIsNot(index, new_index)
+        self.assertIn(10, new_index.get_overlapping(Box(0.4, 0.5, 0.4, 0.5, 1.0, "")).tolist())
@@ -1,7 +1,11 @@
 import copy
+import json
+import os
+import tempfile
 import unittest
 
 from model.SubsumptionUnit import SubsumptionUnit
+from util.BoxBatch import BoxBatch
 from util.BoxList import BoxList
 from util.Box import Box
 
@@ -270,3 +274,167 @@ class MyTestCase(unittest.TestCase):
                          msg=("Expected tracks: \n" + str(expected_result) +
                               "\n does not equal actual tracks: \n" + str(actual_result)))
 
+
+    def test_subsumes_each_frame_of_a_batch(self):
+        """
+        Test that subsuming a batch of frames gives the same result as subsuming each frame on its own.
+
+        @return:
+        """
+        su = SubsumptionUnit()
+        su.add_list(["test1", "test2"])
+
+        frame_0 = BoxList()
+        frame_0.add(Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1"))
+        frame_0.add(Box(0.001, 0.099, 0.001, 0.099, 0.5, "test2"))
+        frame_0.add(Box(0.5, 0.6, 0.5, 0.6, 0.5, "test2"))
+        frame_1 = BoxList()
+        frame_1.add(Box(0.00, 0.90, 0.00, 0.90, 0.5, "test1"))
+        frame_1.add(Box(0.30, 0.60, 0.30, 0.60, 0.5, "test1"))
+        frames = [frame_0, BoxList(), frame_1]
+
+        batch = BoxBatch.from_box_lists(frames)
+        actual_result = su.subsume_batch(batch)
+
+        self.assertEqual(3, actual_result.frame_count())
+        for frame, subsumed_frame in zip(frames, actual_result):
+            self.assertEqual(su.subsume_bboxes(copy.deepcopy(frame)), subsumed_frame)
+        for frame, batch_frame in zip(frames, batch):
+            self.assertEqual(frame, batch_frame)
+
+    def test_lists_added_after_subsuming_are_used(self):
+        """
+        Test that a subsumption list added after boxes have already been subsumed is used for later frames, and that
+        labels which are not on any list are only subsumed into their own type.
+
+        @return:
+        """
+        su = SubsumptionUnit()
+
+        given_box_collection = BoxList()
+        given_box_collection.add(Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1"))
+        given_box_collection.add(Box(0.001, 0.099, 0.001, 0.099, 0.5, "test2"))
+        given_box_collection.add(Box(0.002, 0.098, 0.002, 0.098, 0.5, "test3"))
+
+        self.assertEqual(3, len(su.subsume_bboxes(copy.deepcopy(given_box_collection))))
+
+        su.add_list(["test1", "test2"])
+
+        expected_result = BoxList()
+        expected_result.add(Box(0.002, 0.098, 0.002, 0.098, 0.5, "test3"))
+        expected_result.add(Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1"))
+        self.assertEqual(expected_result, su.subsume_bboxes(copy.deepcopy(given_box_collection)))
+
+    def test_add_list_does_not_change_the_given_list(self):
+        """
+        Test that adding a subsumption list leaves the given list as it was.
+
+        @return:
+        """
+        su = SubsumptionUnit()
+        subsumption_list: list = ["test1", "test2", "test3"]
+
+        su.add_list(subsumption_list)
+
+        self.assertEqual(["test1", "test2", "test3"], subsumption_list)
+        self.assertEqual(frozenset({"test1"}), su.get_items_can_sub_into("test3"))
+
+    def test_compile_finds_cycles_and_freezes_lists(self):
+        """
+        Test that compiling the subsumption lists finds item types which may be subsumed into each other, and that the
+        lists cannot be changed once compiled.
+
+        @return:
+        """
+        su = SubsumptionUnit()
+        su.add_list(["test1", "test2", "test1"])
+        su.add_list(["test2", "test3"])
+        su.compile()
+
+        self.assertTrue(su.is_compiled())
+        self.assertRaises(ValueError, su.add_list, ["test3", "test4"])
+
+        su = SubsumptionUnit()
+        su.add_list(["test1", "test2"])
+        su.add_list(["test2", "test3"])
+        su.add_list(["test3", "test1"])
+        self.assertRaises(ValueError, su.compile)
+        self.assertFalse(su.is_compiled())
+
+    def test_rules_can_be_exported_and_imported(self):
+        """
+        Test that subsumption lists exported to a file and imported into another unit give the same results.
+
+        @return:
+        """
+        su = SubsumptionUnit()
+        su.add_list(["test1", "test2", "test3"])
+        su.add_list(["test4", "test3"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "rules.json")
+            su.export_rules(file_name)
+            imported_su = SubsumptionUnit()
+            imported_su.import_rules(file_name)
+
+        self.assertEqual(frozenset({"test1", "test4"}), imported_su.get_items_can_sub_into("test3"))
+        self.assertEqual(frozenset({"test1"}), imported_su.get_items_can_sub_into("test2"))
+        self.assertEqual(frozenset(), imported_su.get_items_can_sub_into("test1"))
+
+    def test_negative_threshold_subsumes_boxes_that_do_not_overlap(self):
+        """
+        Test that boxes which do not overlap at all, even horizontally, are subsumed if the threshold is negative.
+
+        @return:
+        """
+        su = SubsumptionUnit()
+        su.set_overlap_threshold(-0.1)
+
+        given_box_collection = BoxList()
+        given_box_collection.add(Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1"))
+        given_box_collection.add(Box(0.5, 0.9, 0.5, 0.9, 0.5, "test1"))
+        given_box_collection.add(Box(0.2, 0.3, 0.2, 0.3, 0.5, "test2"))
+
+        expected_result = BoxList()
+        expected_result.add(Box(0.2, 0.3, 0.2, 0.3, 0.5, "test2"))
+        expected_result.add(Box(0.5, 0.9, 0.5, 0.9, 0.5, "test1"))
+        self.assertEqual(expected_result, su.subsume_bboxes(copy.deepcopy(given_box_collection)))
+
+    def test_classes_are_subsumed_into_their_ancestors_in_a_hierarchy(self):
+        """
+        Test that a class hierarchy file makes every class subsumable into all the classes above it, using the labels
+        from the class descriptions file.
+
+        @return:
+        """
+        hierarchy = {"LabelName": "/m/root",
+                     "Subcategory": [{"LabelName": "/m/person",
+                                      "Part": [{"LabelName": "/m/face", "Part": [{"LabelName": "/m/nose"}]}]},
+                                     {"LabelName": "/m/furniture",
+                                      "Subcategory": [{"LabelName": "/m/chair"}]}]}
+
+        su = SubsumptionUnit()
+        with tempfile.TemporaryDirectory() as directory:
+            hierarchy_file_name = os.path.join(directory, "hierarchy.json")
+            descriptions_file_name = os.path.join(directory, "descriptions.csv")
+            with open(hierarchy_file_name, "w", encoding="utf-8") as file:
+                json.dump(hierarchy, file)
+            with open(descriptions_file_name, "w", encoding="utf-8") as file:
+                file.write("/m/person,test_person\n/m/face,\"test_face, human\"\n/m/nose,test_nose\n"
+                           "/m/furniture,test_furniture\n/m/chair,test_chair\n")
+            su.load_hierarchy(hierarchy_file_name, descriptions_file_name)
+        su.compile()
+
+        self.assertEqual(frozenset({"test_person", "test_face, human"}), su.get_items_can_sub_into("test_nose"))
+        self.assertEqual(frozenset({"test_furniture"}), su.get_items_can_sub_into("test_chair"))
+        self.assertEqual(frozenset(), su.get_items_can_sub_into("test_person"))
+
+        given_box_collection = BoxList()
+        given_box_collection.add(Box(0.0, 0.5, 0.0, 0.9, 0.5, "test_person"))
+        given_box_collection.add(Box(0.1, 0.2, 0.1, 0.2, 0.5, "test_nose"))
+        given_box_collection.add(Box(0.1, 0.2, 0.1, 0.2, 0.5, "test_chair"))
+
+        expected_result = BoxList()
+        expected_result.add(Box(0.1, 0.2, 0.1, 0.2, 0.5, "test_chair"))
+        expected_result.add(Box(0.0, 0.5, 0.0, 0.9, 0.5, "test_person"))
+        self.assertEqual(expected_result, su.subsume_bboxes(copy.deepcopy(given_box_collection)))
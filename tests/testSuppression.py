@@ -0,0 +1,75 @@
+import unittest
+
+import numpy
+
+from util import Suppression
+
+
+def get_edges(boxes: list) -> tuple:
+    """
+    A helper function to convert a list of boxes into the tuple of edge arrays used by the Suppression functions.
+
+    @param boxes:   A list of tuples of four float values, which are the left, right, lower and upper edges of each box.
+    @return:        A tuple of four numpy.ndarray objects, which are the left, right, lower and upper edges.
+    """
+    return tuple(numpy.array(edge, dtype=numpy.float64) for edge in zip(*boxes))
+
+
+class SuppressionTests(unittest.TestCase):
+    def test_nms_keeps_highest_scoring_of_overlapping_boxes(self):
+        """
+        Tests that NMS removes boxes which overlap a higher scoring box, and keeps boxes which do not.
+
+        @return:
+        """
+        edges = get_edges([(0.0, 0.2, 0.0, 0.2), (0.01, 0.2, 0.0, 0.2), (0.5, 0.7, 0.5, 0.7), (0.0, 0.2, 0.0, 0.2)])
+        scores = numpy.array([0.6, 0.9, 0.5, 0.05])
+
+        keep_mask = Suppression.get_nms_keep_mask(edges, scores, overlap_threshold=0.5, score_threshold=0.1)
+
+        self.assertEqual([False, True, True, False], keep_mask.tolist())
+
+    def test_nms_per_group_only_suppresses_boxes_in_the_same_group(self):
+        """
+        Tests that a box is not suppressed by an overlapping box in a different group.
+
+        @return:
+        """
+        edges = get_edges([(0.0, 0.2, 0.0, 0.2), (0.0, 0.2, 0.0, 0.2), (0.0, 0.2, 0.0, 0.2)])
+        scores = numpy.array([0.9, 0.8, 0.7])
+        groups = numpy.array(["Table", "Book", "Table"])
+
+        self.assertEqual([True, False, False], Suppression.get_nms_keep_mask(edges, scores).tolist())
+        self.assertEqual([True, True, False], Suppression.get_nms_keep_mask(edges, scores, groups).tolist())
+
+    def test_nms_top_k_limits_the_boxes_considered(self):
+        """
+        Tests that only the top K highest scoring boxes can be kept.
+
+        @return:
+        """
+        edges = get_edges([(0.1 * i, 0.1 * i + 0.05, 0.0, 0.1) for i in range(5)])
+        scores = numpy.array([0.1, 0.5, 0.3, 0.4, 0.2])
+
+        keep_mask = Suppression.get_nms_keep_mask(edges, scores, top_k=2)
+
+        self.assertEqual([False, True, False, True, False], keep_mask.tolist())
+
+    def test_soft_nms_reduces_scores_of_overlapping_boxes(self):
+        """
+        Tests that Soft-NMS reduces the score of a box which overlaps a higher scoring box rather than removing it, and
+        removes it once its score falls below the threshold.
+
+        @return:
+        """
+        edges = get_edges([(0.0, 0.2, 0.0, 0.2), (0.0, 0.2, 0.0, 0.1), (0.5, 0.7, 0.5, 0.7)])
+        scores = numpy.array([0.9, 0.8, 0.5])
+
+        keep_mask, new_scores = Suppression.get_soft_nms_scores(edges, scores, sigma=0.5, score_threshold=0.1)
+
+        self.assertEqual([True, True, True], keep_mask.tolist())
+        self.assertTrue(numpy.allclose([0.9, 0.8 * numpy.exp(-0.25 / 0.5), 0.5], new_scores))
+
+        keep_mask, new_scores = Suppression.get_soft_nms_scores(edges, scores, sigma=0.5, score_threshold=0.6)
+        self.assertEqual([True, False, False], keep_mask.tolist())
+        self.assertEqual([0.9, 0.0, 0.0], new_scores.tolist())
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy
+
+from util.Box import Box
+from util.TrackHistory import TrackHistory
+
+
+class TrackHistoryTests(unittest.TestCase):
+    def test_oldest_samples_are_overwritten(self):
+        """
+        Tests that the history never holds more than its depth, and that the oldest samples are dropped first.
+
+        @return:
+        """
+        history = TrackHistory(depth=3)
+        for frame in range(1, 6):
+            history.append(frame, Box(0.1 * frame, 0.1 * frame + 0.1, 0.0, 0.1, 0.5, "test1"))
+
+        self.assertEqual(3, len(history))
+        self.assertEqual([3, 4, 5], history.get_frames().tolist())
+        self.assertEqual([4, 5], history.get_frames(2).tolist())
+        self.assertTrue(numpy.allclose([0.3, 0.4, 0.5], history.get_edges()[:, 0]))
+
+    def test_copy_is_not_changed_by_later_samples(self):
+        """
+        Tests that a copy of the history keeps its samples when more are added to the original.
+
+        @return:
+        """
+        history = TrackHistory(depth=2)
+        history.append(1, Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1"))
+        copied_history = history.copy()
+
+        history.append(2, Box(0.2, 0.3, 0.0, 0.1, 0.5, "test1"))
+
+        self.assertEqual([1], copied_history.get_frames().tolist())
+        self.assertEqual([1, 2], history.get_frames().tolist())
+
+    def test_smoothed_edges_are_weighted_by_confidence(self):
+        """
+        Tests that the smoothed edges are the confidence weighted average of the edges of the samples.
+
+        @return:
+        """
+        history = TrackHistory()
+        history.append(1, Box(0.0, 0.2, 0.0, 0.2, 0.25, "test1"))
+        history.append(2, Box(0.4, 0.6, 0.0, 0.2, 0.75, "test1"))
+
+        self.assertTrue(numpy.allclose([0.3, 0.5, 0.0, 0.2], history.get_smoothed_edges()))
+        self.assertTrue(numpy.allclose([0.4, 0.6, 0.0, 0.2], history.get_smoothed_edges(1)))
+
+    def test_velocity_accounts_for_missed_frames(self):
+        """
+        Tests that the velocity is the change in the centre of the box per frame, even when the item was not seen in
+        some frames.
+
+        @return:
+        """
+        history = TrackHistory()
+        for frame in (1, 2, 4, 7):
+            history.append(frame, Box(0.02 * frame, 0.02 * frame + 0.1, 0.5 - 0.01 * frame, 0.6 - 0.01 * frame, 0.5,
+                                      "test1"))
+
+        self.assertTrue(numpy.allclose([0.02, -0.01], history.get_velocity()))
+
+    def test_dwell_time_counts_frames_in_current_position(self):
+        """
+        Tests that the dwell time counts the frames since the item arrived at its current position.
+
+        @return:
+        """
+        history = TrackHistory()
+        history.append(1, Box(0.0, 0.1, 0.0, 0.1, 0.5, "test1"))
+        for frame in range(3, 9):
+            history.append(frame, Box(0.5, 0.6, 0.0, 0.1, 0.5, "test1"))
+
+        self.assertEqual(5, history.get_dwell_time())
+        self.assertEqual(7, history.get_dwell_time(max_movement=1.0))
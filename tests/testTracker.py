@@ -1,6 +1,9 @@
 import copy
 import unittest
 
+import numpy
+
+from model.TrackEvent import TrackEvent
 from model.Tracker import Tracker
 from util.BoxList import BoxList
 from util.Box import Box
@@ -284,6 +287,7 @@ class TrackerTests(unittest.TestCase):
         @return:
         """
         tracker = Tracker()
+        tracker.match_across_labels(["test1", "test2"])
 
         box_collection = BoxList()
         box_collection.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test1"))
@@ -307,6 +311,7 @@ class TrackerTests(unittest.TestCase):
         @return:
         """
         tracker = Tracker()
+        tracker.match_across_labels(["possibly this", "probably this"])
 
         box_collection = BoxList()
         box_collection.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "possibly this"))
@@ -399,3 +404,336 @@ class TrackerTests(unittest.TestCase):
         self.assertEqual(expected_result, actual_result,
                          msg=("Expected track ids: \n" + str(expected_result) +
                               "\n does not equal actual track ids: \n" + str(actual_result)))
+
+    def test_returned_tracks_are_not_changed_by_later_frames(self):
+        """
+        Test that the tracks returned by the tracker hold boxes that cannot be changed, and are not changed by later
+        frames.
+
+        @return:
+        """
+        tracker = Tracker(iou_threshold=0.5)
+
+        box_collection_1 = BoxList()
+        box_collection_1.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test1"))
+        box_collection_2 = BoxList()
+        box_collection_2.add(Box(0.1, 0.41, 0.1, 0.6, 0.5, "test1"))
+
+        tracker.add_new_frame(copy.deepcopy(box_collection_1))
+        first_tracks, first_uids = tracker.get_current_tracks()
+        tracker.add_new_frame(copy.deepcopy(box_collection_2))
+        second_tracks, second_uids = tracker.get_current_tracks()
+
+        self.assertEqual(box_collection_1, first_tracks)
+        self.assertEqual(box_collection_2, second_tracks)
+        self.assertEqual(first_uids, second_uids)
+        with self.assertRaises(AttributeError):
+            first_tracks[0].right_edge = 0.9
+
+    def test_each_box_updates_only_one_track(self):
+        """
+        Test that a bounding box which overlaps with two tracks only updates the track it overlaps with the most, and
+        that a track is only updated by one bounding box in each frame.
+
+        @return:
+        """
+        for assignment in ("greedy", "hungarian"):
+            tracker = Tracker(iou_threshold=0.5, allowed_absence=1, assignment=assignment)
+
+            frame_1 = BoxList()
+            frame_1.add(Box(0.10, 0.40, 0.1, 0.6, 0.5, "test1"))
+            frame_1.add(Box(0.12, 0.42, 0.1, 0.6, 0.5, "test1"))
+            frame_2 = BoxList()
+            frame_2.add(Box(0.11, 0.40, 0.1, 0.6, 0.5, "test1"))
+
+            tracker.add_new_frame(copy.deepcopy(frame_1))
+            tracker.add_new_frame(copy.deepcopy(frame_2))
+
+            expected_result = BoxList()
+            expected_result.add(Box(0.11, 0.40, 0.1, 0.6, 0.5, "test1"))
+            expected_result.add(Box(0.12, 0.42, 0.1, 0.6, 0.5, "test1"))
+            actual_result, track_uids = tracker.get_current_tracks()
+            self.assertEqual(expected_result, actual_result,
+                             msg="Expected tracks: \n" + str(expected_result) +
+                                 "\n does not equal current tracks: \n" + str(actual_result))
+            self.assertEqual([0, 1], track_uids)
+
+    def test_rejects_unknown_assignment_method(self):
+        """
+        Test that the tracker cannot be created with an assignment method that does not exist.
+
+        @return:
+        """
+        with self.assertRaises(ValueError):
+            Tracker(assignment="random")
+
+    def test_motion_model_keeps_fast_moving_track(self):
+        """
+        Test that the motion model lets the tracker keep following an item which speeds up, where matching against the
+        last seen bounding box would lose it.
+
+        @return:
+        """
+        left_edges = [0.1, 0.12, 0.14, 0.16, 0.2, 0.26, 0.32, 0.38, 0.44, 0.5]
+        for motion_model, expected_uids in ((False, [5]), (True, [0])):
+            tracker = Tracker(iou_threshold=0.3, motion_model=motion_model)
+            for left_edge in left_edges:
+                frame = BoxList()
+                frame.add(Box(left_edge, left_edge + 0.1, 0.1, 0.3, 0.5, "test1"))
+                tracker.add_new_frame(frame)
+
+            _, track_uids = tracker.get_current_tracks()
+            self.assertEqual(expected_uids, track_uids)
+
+    def test_spurious_tracks_expire_while_steady_track_continues(self):
+        """
+        Test that tracks which are only seen once are removed once their allowed absence has passed, without affecting a
+        track which is seen in every frame, with and without the motion model.
+
+        @return:
+        """
+        for motion_model in (False, True):
+            tracker = Tracker(allowed_absence=1, motion_model=motion_model)
+            for frame_number in range(1, 11):
+                frame = BoxList()
+                frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.5, "test1"))
+                spurious_left_edge = 0.4 + 0.05 * frame_number
+                frame.add(Box(spurious_left_edge, spurious_left_edge + 0.04, 0.5, 0.6, 0.5, "test2"))
+                tracker.add_new_frame(frame)
+
+            _, track_uids = tracker.get_current_tracks()
+            self.assertEqual([0, 9, 10], track_uids)
+
+    def test_boxes_only_continue_tracks_with_the_same_label(self):
+        """
+        Test that a bounding box with a different label does not continue a track, unless the two labels have been
+        grouped together with match_across_labels().
+
+        @return:
+        """
+        for grouped, expected_uids in ((False, [0, 1]), (True, [0])):
+            tracker = Tracker(allowed_absence=1)
+            if grouped:
+                tracker.match_across_labels(["test1"])
+                tracker.match_across_labels(["test2", "test1"])
+
+            for label in ("test1", "test2"):
+                frame = BoxList()
+                frame.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, label))
+                tracker.add_new_frame(frame)
+
+            _, track_uids = tracker.get_current_tracks()
+            self.assertEqual(expected_uids, track_uids)
+
+    def test_track_events_describe_changes_to_tracks(self):
+        """
+        Test that the tracker reports when tracks are born, confirmed, updated and lost, and reports nothing for a frame
+        where nothing has changed.
+
+        @return:
+        """
+        tracker = Tracker(min_frames=2, allowed_absence=1)
+        still_box = Box(0.1, 0.4, 0.1, 0.6, 0.5, "test1")
+        moved_box = Box(0.11, 0.41, 0.1, 0.6, 0.5, "test1")
+        frames = [[still_box], [still_box], [still_box], [moved_box], [], []]
+        expected_events = [[(TrackEvent.BORN, 0)], [(TrackEvent.CONFIRMED, 0)], [], [(TrackEvent.UPDATED, 0)], [],
+                           [(TrackEvent.LOST, 0)]]
+
+        for boxes, expected in zip(frames, expected_events):
+            frame = BoxList()
+            for box in boxes:
+                frame.add(copy.copy(box))
+            tracker.add_new_frame(frame)
+
+            self.assertEqual(expected, [(event.kind, event.uid) for event in tracker.get_track_events()])
+
+        self.assertEqual(0, len(tracker.get_confirmed_tracks()))
+
+    def test_confirmed_tracks_view_is_kept_up_to_date(self):
+        """
+        Test that the view of confirmed tracks follows the tracks as they change, and that changing the BoxList returned
+        by get_current_tracks() does not change the tracks returned later.
+
+        @return:
+        """
+        tracker = Tracker()
+        confirmed_tracks = tracker.get_confirmed_tracks()
+
+        frame = BoxList()
+        frame.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test1"))
+        frame.add(Box(0.6, 0.7, 0.1, 0.2, 0.5, "test2"))
+        tracker.add_new_frame(frame)
+
+        self.assertEqual([0, 1], sorted(confirmed_tracks))
+        self.assertEqual("test2", confirmed_tracks[1].label)
+
+        returned_tracks, _ = tracker.get_current_tracks()
+        returned_tracks.sort_by_area()
+        returned_tracks.add(Box(0.0, 0.1, 0.0, 0.1, 0.5, "test3"))
+        current_tracks, track_uids = tracker.get_current_tracks()
+
+        self.assertEqual(2, len(current_tracks))
+        self.assertEqual("test1", current_tracks[0].label)
+        self.assertEqual([0, 1], track_uids)
+
+    def test_tracks_keep_a_bounded_history(self):
+        """
+        Test that each track remembers only its most recent sightings.
+
+        @return:
+        """
+        tracker = Tracker(iou_threshold=0.5, history_depth=4)
+        for frame_number in range(10):
+            frame = BoxList()
+            left_edge = 0.1 + 0.01 * frame_number
+            frame.add(Box(left_edge, left_edge + 0.3, 0.1, 0.4, 0.5, "test1"))
+            tracker.add_new_frame(frame)
+
+        history = tracker.get_track_history(0)
+
+        self.assertEqual([7, 8, 9, 10], history.get_frames().tolist())
+        self.assertAlmostEqual(0.01, history.get_velocity()[0])
+        self.assertIsNone(tracker.get_track_history(1))
+        self.assertIsNone(Tracker(history_depth=0).get_track_history(0))
+
+    def test_lost_track_is_reidentified_by_appearance(self):
+        """
+        Test that an item which comes back into view after its track was lost carries on with its old track, if it looks
+        the same, and starts a new track if it does not.
+
+        @return:
+        """
+        red = numpy.array([[1.0, 0.0]])
+        blue = numpy.array([[0.0, 1.0]])
+        cases = [(red, 0, [TrackEvent.REIDENTIFIED, TrackEvent.CONFIRMED]),
+                 (blue, 1, [TrackEvent.BORN])]
+        for returning_appearance, expected_uid, expected_kinds in cases:
+            tracker = Tracker(min_frames=3, reidentify=True)
+            for _ in range(3):
+                frame = BoxList()
+                frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.5, "test1"))
+                tracker.add_new_frame(frame, red)
+            tracker.add_new_frame(BoxList(), numpy.empty((0, 2)))
+
+            frame = BoxList()
+            frame.add(Box(0.6, 0.8, 0.1, 0.3, 0.5, "test1"))
+            tracker.add_new_frame(frame, returning_appearance)
+
+            self.assertEqual(expected_kinds, [event.kind for event in tracker.get_track_events()])
+            self.assertEqual([expected_uid], [event.uid for event in tracker.get_track_events()][:1])
+
+    def test_propagated_frames_move_tracks_without_expiring_them(self):
+        """
+        Test that frames without object detection move the tracks by the given shifts, and do not count towards the
+        number of frames a track may be absent for.
+
+        @return:
+        """
+        tracker = Tracker(allowed_absence=1)
+        frame = BoxList()
+        frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.5, "test1"))
+        tracker.add_new_frame(frame)
+
+        for _ in range(3):
+            tracker.propagate_frame({0: (0.1, 0.0)})
+        self.assertEqual([TrackEvent.UPDATED], [event.kind for event in tracker.get_track_events()])
+        self.assertAlmostEqual(0.4, tracker.get_confirmed_tracks()[0].left_edge)
+
+        tracker.add_new_frame(BoxList())
+        self.assertEqual([0], tracker.get_current_tracks()[1])
+        tracker.add_new_frame(BoxList())
+        self.assertEqual([], tracker.get_current_tracks()[1])
+
+    def test_propagated_frames_follow_the_motion_model(self):
+        """
+        Test that tracks without a shift are moved to where the motion model predicts, and that the speed of the
+        fastest track is reported.
+
+        @return:
+        """
+        tracker = Tracker(iou_threshold=0.5, motion_model=True)
+        for frame_number in range(10):
+            frame = BoxList()
+            left_edge = 0.1 + 0.01 * frame_number
+            frame.add(Box(left_edge, left_edge + 0.3, 0.1, 0.4, 0.5, "test1"))
+            tracker.add_new_frame(frame)
+
+        self.assertAlmostEqual(0.01, tracker.get_max_speed(), places=2)
+        tracker.propagate_frame({0: (numpy.nan, numpy.nan)})
+        self.assertAlmostEqual(0.2, tracker.get_confirmed_tracks()[0].left_edge, places=2)
+        self.assertEqual(0.0, Tracker().get_max_speed())
+
+    def test_tracks_of_one_tracker_can_be_fed_into_another(self):
+        """
+        Test that the CompactBox objects returned by one tracker can be added to another tracker, where the label of a
+        track with a higher confidence is kept without changing the given boxes.
+
+        @return:
+        """
+        first_tracker = Tracker()
+        frame = BoxList()
+        frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.4, "test2"))
+        first_tracker.add_new_frame(frame)
+        tracked_boxes, _ = first_tracker.get_current_tracks()
+        tracked_box = tracked_boxes.get(0)
+
+        second_tracker = Tracker()
+        second_tracker.match_across_labels(["test1", "test2"])
+        frame = BoxList()
+        frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.8, "test1"))
+        second_tracker.add_new_frame(frame)
+        second_tracker.add_new_frame(tracked_boxes)
+
+        self.assertEqual("test1", second_tracker.get_confirmed_tracks()[0].label)
+        self.assertAlmostEqual(0.8, second_tracker.get_confirmed_tracks()[0].confidence)
+        self.assertEqual("test2", tracked_box.label)
+        self.assertAlmostEqual(0.4, tracked_box.confidence)
+
+    def test_rejected_frame_does_not_change_the_tracker(self):
+        """
+        Test that a frame with the wrong number of appearances is rejected before anything in the tracker is changed,
+        so that the frame count, the motion model and the tracks are the same as before.
+
+        @return:
+        """
+        tracker = Tracker(motion_model=True, reidentify=True)
+        for frame_number in range(3):
+            frame = BoxList()
+            left_edge = 0.1 + 0.01 * frame_number
+            frame.add(Box(left_edge, left_edge + 0.2, 0.1, 0.3, 0.5, "test1"))
+            tracker.add_new_frame(frame, numpy.array([[1.0, 0.0]]))
+        state_before = tracker.get_state()
+        events_before = [str(event) for event in tracker.get_track_events()]
+
+        frame = BoxList()
+        frame.add(Box(0.13, 0.33, 0.1, 0.3, 0.5, "test1"))
+        with self.assertRaises(ValueError):
+            tracker.add_new_frame(frame, numpy.empty((0, 2)))
+
+        state_after = tracker.get_state()
+        self.assertEqual(set(state_before), set(state_after))
+        for key in state_before:
+            self.assertTrue(numpy.array_equal(state_before[key], state_after[key]), msg=key)
+        self.assertEqual(events_before, [str(event) for event in tracker.get_track_events()])
+        tracker.add_new_frame(frame, numpy.array([[1.0, 0.0]]))
+
+    def test_propagated_frames_leave_still_tracks_unchanged(self):
+        """
+        Test that tracks which do not move in a propagated frame keep exactly the same box, and are not reported as
+        updated.
+
+        @return:
+        """
+        for motion_model, shifts in ((False, {0: (0.0, 0.0)}), (True, None), (True, {0: (0.0, 0.0)})):
+            tracker = Tracker(motion_model=motion_model)
+            for _ in range(3):
+                frame = BoxList()
+                frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.5, "test1"))
+                tracker.add_new_frame(frame)
+            box_before = tracker.get_confirmed_tracks()[0]
+
+            tracker.propagate_frame(shifts)
+
+            self.assertEqual([], tracker.get_track_events())
+            self.assertIs(box_before, tracker.get_confirmed_tracks()[0])
+            self.assertEqual(0.1, tracker.get_confirmed_tracks()[0].left_edge)
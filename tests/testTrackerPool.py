@@ -0,0 +1,144 @@
+import unittest
+
+import numpy
+
+from model.TrackEvent import TrackEvent
+from model.Tracker import Tracker
+from model.TrackerPool import TrackerPool
+from util.Box import Box
+from util.BoxList import BoxList
+
+
+def random_frame(generator: numpy.random.Generator) -> BoxList:
+    """
+    A helper function to create a frame of bounding boxes which jitter around a few fixed positions.
+
+    @param generator:   A numpy.random.Generator object used to create the boxes.
+    @return:            A BoxList object which holds the boxes of the frame.
+    """
+    frame = BoxList()
+    for position in range(6):
+        if generator.random() < 0.8:
+            left_edge = 0.15 * position + generator.normal(0.0, 0.01)
+            frame.add(Box(left_edge, left_edge + 0.1, 0.2, 0.4, float(generator.random()),
+                          "test" + str(position % 3)))
+    return frame
+
+
+class TrackerPoolTests(unittest.TestCase):
+    def test_pool_matches_separate_trackers(self):
+        """
+        Tests that stepping several streams together gives the same tracks as a separate Tracker for each stream.
+
+        @return:
+        """
+        for assignment in ("greedy", "hungarian"):
+            pool = TrackerPool(iou_threshold=0.5, assignment=assignment, min_frames=2, allowed_absence=2)
+            separate_trackers = dict()
+            for stream_id in ("front", "back", "side"):
+                pool.add_stream(stream_id)
+                separate_trackers[stream_id] = Tracker(iou_threshold=0.5, assignment=assignment, min_frames=2,
+                                                       allowed_absence=2)
+
+            generator = numpy.random.default_rng(3)
+            for _ in range(20):
+                frames = {stream_id: random_frame(generator) for stream_id in separate_trackers}
+                for stream_id, frame in frames.items():
+                    separate_trackers[stream_id].add_new_frame(frame.snapshot())
+                pool.add_new_frames(frames)
+
+            pool_tracks = pool.get_current_tracks()
+            for stream_id, tracker in separate_trackers.items():
+                boxes, uids = tracker.get_current_tracks()
+                pool_boxes, pool_uids = pool_tracks[stream_id]
+                self.assertEqual(uids, pool_uids)
+                self.assertEqual(boxes, pool_boxes)
+
+    def test_streams_are_kept_separate(self):
+        """
+        Tests that a box in one stream never continues a track in another stream, and that streams which are not given
+        a frame are not changed.
+
+        @return:
+        """
+        pool = TrackerPool(allowed_absence=5)
+        pool.add_stream(1)
+        pool.add_stream(2)
+
+        first_frame = BoxList()
+        first_frame.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test1"))
+        pool.add_new_frames({1: first_frame})
+        second_frame = BoxList()
+        second_frame.add(Box(0.1, 0.4, 0.1, 0.6, 0.5, "test1"))
+        pool.add_new_frames({2: second_frame})
+
+        self.assertEqual([0], pool.get_current_tracks()[1][1])
+        self.assertEqual([0], pool.get_current_tracks()[2][1])
+        self.assertEqual([1, 1], [event.frame for event in pool.get_tracker(1).get_track_events()])
+
+    def test_unknown_and_duplicate_streams(self):
+        """
+        Tests that frames cannot be added for streams which are not in the pool, and that a stream cannot be added
+        twice.
+
+        @return:
+        """
+        pool = TrackerPool()
+        pool.add_stream("front")
+
+        with self.assertRaises(ValueError):
+            pool.add_stream("front")
+        with self.assertRaises(KeyError):
+            pool.add_new_frames({"back": BoxList()})
+        with self.assertRaises(KeyError):
+            pool.add_new_frames({"front": BoxList()}, {"back": numpy.empty((0, 2))})
+
+        pool.remove_stream("front")
+        self.assertNotIn("front", pool)
+        self.assertEqual(0, len(pool))
+
+    def test_lost_track_is_reidentified_in_its_stream(self):
+        """
+        Tests that the appearances given for each stream are used to bring back a lost track with its old UID.
+
+        @return:
+        """
+        pool = TrackerPool(min_frames=3, reidentify=True)
+        pool.add_stream("front")
+        pool.add_stream("back")
+        red = numpy.array([[1.0, 0.0]])
+        for _ in range(3):
+            frame = BoxList()
+            frame.add(Box(0.1, 0.3, 0.1, 0.3, 0.5, "test1"))
+            pool.add_new_frames({"front": frame, "back": BoxList()}, {"front": red, "back": numpy.empty((0, 2))})
+        pool.add_new_frames({"front": BoxList()}, {"front": numpy.empty((0, 2))})
+
+        frame = BoxList()
+        frame.add(Box(0.6, 0.8, 0.1, 0.3, 0.5, "test1"))
+        pool.add_new_frames({"front": frame}, {"front": red})
+
+        self.assertEqual([0], pool.get_current_tracks()["front"][1])
+        self.assertEqual([TrackEvent.REIDENTIFIED, TrackEvent.CONFIRMED],
+                         [event.kind for event in pool.get_tracker("front").get_track_events()])
+
+    def test_bad_frame_does_not_start_any_stream(self):
+        """
+        Tests that if the frame of one stream is rejected, no stream is left with a frame that was started but never
+        finished, so every stream can carry on.
+
+        @return:
+        """
+        pool = TrackerPool(reidentify=True)
+        pool.add_stream("front")
+        pool.add_stream("back")
+        frames = dict()
+        for stream_id in ("front", "back"):
+            frames[stream_id] = BoxList()
+            frames[stream_id].add(Box(0.1, 0.3, 0.1, 0.3, 0.5, "test1"))
+
+        with self.assertRaises(ValueError):
+            pool.add_new_frames(frames, {"front": numpy.array([[1.0, 0.0]]), "back": numpy.empty((0, 2))})
+
+        pool.add_new_frames(frames, {"front": numpy.array([[1.0, 0.0]]), "back": numpy.array([[1.0, 0.0]])})
+        self.assertEqual([0], pool.get_current_tracks()["front"][1])
+        self.assertEqual([0], pool.get_current_tracks()["back"][1])